@@ -13,6 +13,8 @@ from threading import Thread
 from pathlib import Path
 import os, requests, random, time
 
+from modules.moneyflow_engine import MoneyFlowEngine
+
 # ------------------------------------------------------------
 # ENV
 # ------------------------------------------------------------
@@ -32,7 +34,7 @@ app.mount("/static", StaticFiles(directory=str(BASE_DIR / "static")), name="stat
 # ------------------------------------------------------------
 REFRESH_INTERVAL = 60
 FEED_CACHE = []
-START_ODDS = {}
+FLOW = MoneyFlowEngine(labels=("1","X","2"))  # start/current odds ανά match
 LAST_REFRESH = None
 
 # ------------------------------------------------------------
@@ -47,19 +49,6 @@ def safe_float(x):
     try: return float(x)
     except: return None
 
-def dec_to_imp(o): return 1/o if o and o>1 else 0
-def norm3(a,b,c):
-    s=a+b+c
-    return (a/s,b/s,c/s) if s>0 else (0,0,0)
-def flow(start,cur):
-    p1s,pxs,p2s = norm3(*[dec_to_imp(start[k]) for k in ["1","X","2"]])
-    p1c,pxc,p2c = norm3(*[dec_to_imp(cur[k]) for k in ["1","X","2"]])
-    d=(abs(p1c-p1s)+abs(pxc-pxs)+abs(p2c-p2s))/3
-    return round(min(100,100*d*3.5),1)
-def trend(start,cur):
-    d={k:start[k]-cur[k] for k in ["1","X","2"]}
-    k=max(d,key=lambda x:abs(d[x]))
-    return f"{k}{'↑' if d[k]>0 else '↓'}"
 def match_key(h,a): return f"{h.strip()} - {a.strip()}"
 
 # ------------------------------------------------------------
@@ -127,20 +116,7 @@ def enrich(items):
         o=it.get("odds") or {}
         if not all(k in o for k in ["1","X","2"]): continue
         merged[mk]=o
-    out=[]
-    for mk,o in merged.items():
-        START_ODDS.setdefault(mk,o.copy())
-        s=START_ODDS[mk]
-        out.append({
-            "match":mk,
-            "market":"1X2",
-            "start_odds":s,
-            "current_odds":o,
-            "movement":trend(s,o),
-            "money_flow":flow(s,o),
-            "timestamp":now
-        })
-    return out
+    return FLOW.feed(merged,now)
 
 def refresh_once():
     items=fetch_apifootball()
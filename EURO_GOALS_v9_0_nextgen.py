@@ -9,21 +9,26 @@
 # - Compatible with Render, keeps v8.9n UI
 # ============================================================
 
-import os, sys, time, json, threading, logging
+import os, sys, io, csv, time, json, base64, threading, logging
 from logging.handlers import RotatingFileHandler
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
+from itertools import islice
+from types import GeneratorType
 from typing import Optional, List, Dict, Any
 
 import requests
 from requests.adapters import HTTPAdapter, Retry
 
-from fastapi import FastAPI, Query, HTTPException
-from fastapi.responses import JSONResponse, PlainTextResponse
+from fastapi import FastAPI, Query, HTTPException, Response
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Text, Boolean, ForeignKey, Index
+from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Text, Boolean, ForeignKey, Index, insert, update, select, func, or_, and_
 from sqlalchemy.orm import declarative_base, sessionmaker, relationship
+from sqlalchemy.dialects import sqlite as sqlite_dialect, postgresql as pg_dialect
+
+from modules.odds_tickstore import OddsTickStore
 
 # ------------- CONFIG ---------------------------------------------------------
 BASE_DIR = Path(__file__).resolve().parent
@@ -40,6 +45,13 @@ ASIAN_BASE       = os.getenv("ASIAN_BASE", "https://api.example-asian-odds.com")
 
 ENABLE_SMARTMONEY = os.getenv("EG_ENABLE_SMARTMONEY", "1") == "1"
 
+# Odds tick store: ο πίνακας odds κρατά μόνο τις τελευταίες ώρες (hot),
+# το ιστορικό πάει σε ημερήσια shards + 1m/15m OHLC bars
+ODDS_TICKS_DIR           = os.getenv("ODDS_TICKS_DIR", str(BASE_DIR / "data" / "odds_ticks"))
+ODDS_HOT_HOURS           = int(os.getenv("ODDS_HOT_HOURS", "6"))
+ODDS_RAW_RETENTION_DAYS  = int(os.getenv("ODDS_RAW_RETENTION_DAYS", "7"))
+ODDS_ROLLUP_INTERVAL     = int(os.getenv("ODDS_ROLLUP_INTERVAL", "60"))
+
 # ------------- LOGGING --------------------------------------------------------
 logger = logging.getLogger("EURO_GOALS_V9")
 logger.setLevel(logging.INFO)
@@ -70,9 +82,13 @@ class Match(Base):
     odds = relationship("Odds", back_populates="match", cascade="all, delete-orphan", lazy="selectin")
 
 Index("ix_matches_unique", Match.provider_id, Match.kickoff_utc, unique=False)
+# Απαραίτητο για INSERT ... ON CONFLICT (provider_id) στο bulk ingestion
+Index("ux_matches_provider_id", Match.provider_id, unique=True)
 
 class Odds(Base):
     __tablename__ = "odds"
+    # Το drain στο tick store κρατά watermark στο id → τα ids δεν πρέπει να ξαναχρησιμοποιούνται
+    __table_args__ = {"sqlite_autoincrement": True}
     id = Column(Integer, primary_key=True)
     match_id = Column(Integer, ForeignKey("matches.id"), index=True)
     book = Column(String, index=True)  # Pinnacle/SBO/188
@@ -92,8 +108,35 @@ class Alert(Base):
     payload = Column(Text)              # JSON string
     created_at = Column(DateTime, default=datetime.utcnow, index=True)
 
+_provider_id_unique = False  # True όταν υπάρχει το ux_matches_provider_id (ON CONFLICT upsert)
+
+def _ensure_provider_id_unique() -> bool:
+    """Unique index στο provider_id μόνο αν ο πίνακας δεν έχει ήδη διπλά provider_id."""
+    ix = next(i for i in Match.__table__.indexes if i.name == "ux_matches_provider_id")
+    dupes = select(Match.provider_id).where(Match.provider_id.isnot(None)) \
+        .group_by(Match.provider_id).having(func.count() > 1).subquery()
+    with engine.connect() as conn:
+        n_dupes = conn.execute(select(func.count()).select_from(dupes)).scalar()
+    if n_dupes:
+        logger.warning("[DB] %d duplicate provider_id value(s) in matches – skipping %s, "
+                       "bulk upsert falls back to select + update", n_dupes, ix.name)
+        return False
+    try:
+        ix.create(engine, checkfirst=True)
+        return True
+    except Exception as e:
+        logger.warning("[DB] could not create %s: %s", ix.name, e)
+        return False
+
 def init_db():
+    global _provider_id_unique
     Base.metadata.create_all(engine)
+    # create_all δεν προσθέτει indexes σε πίνακες που υπάρχουν ήδη
+    for table in Base.metadata.sorted_tables:
+        for ix in table.indexes:
+            if ix.name != "ux_matches_provider_id":
+                ix.create(engine, checkfirst=True)
+    _provider_id_unique = _ensure_provider_id_unique()
 
 # ------------- HTTP CLIENT (retry) -------------------------------------------
 def make_session() -> requests.Session:
@@ -109,6 +152,8 @@ def make_session() -> requests.Session:
 
 http = make_session()
 
+ticks = OddsTickStore(ODDS_TICKS_DIR, raw_retention_days=ODDS_RAW_RETENTION_DAYS)
+
 # ------------- PROVIDERS (SKELETONS) -----------------------------------------
 def besoccer_get(endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -146,6 +191,99 @@ def upsert_match(session, provider_id: str, league: str, home: str, away: str, k
 def insert_odds(session, match: Match, book: str, market: str, price: float, line: Optional[float]):
     session.add(Odds(match=match, book=book, market=market, price=price, line=line, ts=datetime.utcnow()))
 
+# ---- Bulk ingestion (ένα statement ανά batch αντί για N+1 round trips) --------
+ODDS_COPY_THRESHOLD = 5_000  # Postgres: από εδώ και πάνω τα odds μπαίνουν με COPY
+_ODDS_COLUMNS = ("match_id", "book", "market", "price", "line", "ts")
+
+def _dialect_insert(session, table):
+    name = session.get_bind().dialect.name
+    if name == "postgresql":
+        return pg_dialect.insert(table)
+    if name == "sqlite":
+        return sqlite_dialect.insert(table)
+    raise RuntimeError(f"Bulk upsert not supported for dialect '{name}'")
+
+def bulk_upsert_matches(session, rows: List[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Upsert όλων των matches ενός provider payload με ένα INSERT ... ON CONFLICT (provider_id).
+    rows: dicts με provider_id, league, home, away, kickoff_utc, status.
+    Επιστρέφει {provider_id: match id}.
+    """
+    if not rows:
+        return {}
+    now = datetime.utcnow()
+    batch = {}
+    for r in rows:  # διπλό provider_id στο ίδιο statement σπάει το ON CONFLICT στο Postgres
+        batch[str(r["provider_id"])] = {
+            "provider_id": str(r["provider_id"]),
+            "league": r.get("league"), "home": r.get("home"), "away": r.get("away"),
+            "kickoff_utc": r.get("kickoff_utc"), "status": r.get("status") or "scheduled",
+            "created_at": now, "updated_at": now,
+        }
+    if not _provider_id_unique:
+        return _upsert_matches_without_index(session, batch)
+    stmt = _dialect_insert(session, Match.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Match.provider_id],
+        set_={c: stmt.excluded[c] for c in ("league", "home", "away", "kickoff_utc", "status", "updated_at")},
+    ).returning(Match.provider_id, Match.id)
+    return {pid: mid for pid, mid in session.execute(stmt, list(batch.values()))}
+
+def _upsert_matches_without_index(session, batch: Dict[str, Dict[str, Any]]) -> Dict[str, int]:
+    """Fallback χωρίς ux_matches_provider_id: ένα SELECT, bulk UPDATE στα υπάρχοντα, bulk INSERT στα νέα."""
+    existing = dict(session.execute(
+        select(Match.provider_id, func.min(Match.id)).where(Match.provider_id.in_(list(batch))).group_by(Match.provider_id)
+    ).all())
+    if existing:
+        session.execute(update(Match), [
+            {"id": existing[pid], **{k: v for k, v in row.items() if k != "created_at"}}
+            for pid, row in batch.items() if pid in existing
+        ])
+    new_rows = [row for pid, row in batch.items() if pid not in existing]
+    if new_rows:
+        stmt = insert(Match.__table__).returning(Match.provider_id, Match.id)
+        existing.update(session.execute(stmt, new_rows).all())
+    return existing
+
+def _copy_odds(session, rows: List[Dict[str, Any]]):
+    buf = io.StringIO()
+    w = csv.writer(buf)
+    for r in rows:
+        w.writerow(["" if r.get(c) is None else r[c] for c in _ODDS_COLUMNS])
+    buf.seek(0)
+    raw = session.connection().connection  # ίδιο transaction με το session
+    with raw.cursor() as cur:
+        cur.copy_expert(f"COPY odds ({', '.join(_ODDS_COLUMNS)}) FROM STDIN WITH (FORMAT csv)", buf)
+
+def bulk_insert_odds(session, rows: List[Dict[str, Any]]) -> int:
+    """Odds μέσω Core executemany (ή COPY στο Postgres για μεγάλα batches)."""
+    if not rows:
+        return 0
+    now = datetime.utcnow()
+    rows = [{c: r.get(c) for c in _ODDS_COLUMNS} | {"ts": r.get("ts") or now} for r in rows]
+    if session.get_bind().dialect.name == "postgresql" and len(rows) >= ODDS_COPY_THRESHOLD:
+        _copy_odds(session, rows)
+    else:
+        session.execute(insert(Odds), rows)
+    return len(rows)
+
+def ingest_payload(session, matches: List[Dict[str, Any]], odds: List[Dict[str, Any]] = ()) -> Dict[str, int]:
+    """
+    Batch ingestion ολόκληρου provider payload.
+    Τα odds μπορούν να αναφέρονται σε match με match_id ή με provider_id.
+    """
+    ids = bulk_upsert_matches(session, matches)
+    missing = {str(o["provider_id"]) for o in odds if o.get("match_id") is None and str(o.get("provider_id")) not in ids}
+    if missing:
+        ids.update(session.execute(select(Match.provider_id, Match.id).where(Match.provider_id.in_(missing))).all())
+    rows = []
+    for o in odds:
+        mid = o.get("match_id") or ids.get(str(o.get("provider_id")))
+        if mid is not None:
+            rows.append({**o, "match_id": mid})
+    n_odds = bulk_insert_odds(session, rows)
+    return {"matches": len(ids), "odds": n_odds}
+
 def create_alert(session, level: str, kind: str, message: str, payload: Dict[str, Any]):
     session.add(Alert(level=level, kind=kind, message=message, payload=json.dumps(payload), created_at=datetime.utcnow()))
 
@@ -169,17 +307,16 @@ def worker_fetch_besoccer_recent():
             # Example placeholder call (adjust endpoint/params to real Besoccer docs)
             # data = besoccer_get("matches", {"day": datetime.utcnow().strftime("%Y-%m-%d")})
             data = {"matches":[{"id":"DUMMY123","league":"EPL","home":"Chelsea","away":"Arsenal","kickoff":"2025-11-02T16:30:00Z","status":"scheduled"}]}
+            rows = [{
+                "provider_id": str(row["id"]),
+                "league": row.get("league","UNK"),
+                "home": row.get("home","UNK"),
+                "away": row.get("away","UNK"),
+                "kickoff_utc": datetime.fromisoformat(row["kickoff"].replace("Z","+00:00")),
+                "status": row.get("status","scheduled"),
+            } for row in data.get("matches", [])]
             with SessionLocal() as s:
-                for row in data.get("matches", []):
-                    m = upsert_match(
-                        s,
-                        provider_id=str(row["id"]),
-                        league=row.get("league","UNK"),
-                        home=row.get("home","UNK"),
-                        away=row.get("away","UNK"),
-                        kickoff=datetime.fromisoformat(row["kickoff"].replace("Z","+00:00")),
-                        status=row.get("status","scheduled"),
-                    )
+                ingest_payload(s, rows)
                 s.commit()
             logger.info("[BESOCCER] schedule sync OK")
         except Exception as e:
@@ -195,11 +332,12 @@ def worker_fetch_asian_odds():
                 time.sleep(30); continue
             with SessionLocal() as s:
                 matches = s.query(Match).filter(Match.kickoff_utc >= datetime.utcnow() - timedelta(hours=6)).all()
+                odds_rows = []
                 for m in matches:
                     # Placeholder: simulate odds for AH -0.5 from Pinnacle
                     prev = prev_prices.get(m.provider_id, 1.92)
                     curr = round(max(1.5, prev - 0.02), 2)  # simulate drop
-                    insert_odds(s, m, book="Pinnacle", market="AH -0.5", price=curr, line=-0.5)
+                    odds_rows.append({"match_id": m.id, "book": "Pinnacle", "market": "AH -0.5", "price": curr, "line": -0.5})
                     if detect_smart_move(prev, curr):
                         create_alert(
                             s, "critical", "smartmoney",
@@ -207,12 +345,52 @@ def worker_fetch_asian_odds():
                             {"match_id": m.provider_id, "market": "AH -0.5", "book":"Pinnacle", "prev": prev, "curr": curr}
                         )
                     prev_prices[m.provider_id] = curr
+                bulk_insert_odds(s, odds_rows)
                 s.commit()
             logger.info("[ASIAN] odds polling OK")
         except Exception as e:
             logger.warning("[ASIAN] odds polling failed: %s", e)
         time.sleep(30)
 
+def drain_odds_to_ticks(batch_size: int = 20_000) -> int:
+    """Μεταφέρει τα νέα odds rows στο tick store και κόβει τον πίνακα odds στις hot ώρες."""
+    moved = 0
+    last_id = int(ticks.get_state("odds_drained_id", 0))
+    with SessionLocal() as s:
+        while True:
+            rows = s.execute(
+                select(Odds.id, Odds.match_id, Odds.book, Odds.market, Odds.line, Odds.price, Odds.ts)
+                .where(Odds.id > last_id).order_by(Odds.id).limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            ticks.append([r._asdict() for r in rows])
+            last_id = rows[-1].id
+            ticks.set_state("odds_drained_id", last_id)
+            moved += len(rows)
+        cutoff = datetime.utcnow() - timedelta(hours=ODDS_HOT_HOURS)
+        s.query(Odds).filter(Odds.ts < cutoff, Odds.id <= last_id).delete(synchronize_session=False)
+        # Σε SQLite πίνακα χωρίς AUTOINCREMENT (παλιές βάσεις) το επόμενο id είναι max(id)+1:
+        # αν το trim έσβησε τα μεγαλύτερα ids, κατεβάζουμε το watermark στο max που έμεινε
+        # (όλα ≤ last_id έχουν ήδη μεταφερθεί), μέσα στην ίδια write transaction
+        max_id = s.execute(select(func.max(Odds.id))).scalar() or 0
+        if max_id < last_id:
+            ticks.set_state("odds_drained_id", max_id)
+        s.commit()
+    return moved
+
+def worker_odds_rollup():
+    """Drain odds → ημερήσια shards, rollup σε 1m/15m OHLC και retention."""
+    while not _stop.is_set():
+        try:
+            moved = drain_odds_to_ticks()
+            bars = ticks.rollup()
+            dropped = ticks.apply_retention()
+            logger.info("[TICKS] drained %d ticks, %d bars updated, %d shard(s) dropped", moved, bars, len(dropped))
+        except Exception as e:
+            logger.warning("[TICKS] rollup failed: %s", e)
+        _stop.wait(ODDS_ROLLUP_INTERVAL)
+
 def start_workers():
     threads = []
     t1 = threading.Thread(target=worker_fetch_besoccer_recent, name="BesoccerSync", daemon=True)
@@ -220,6 +398,8 @@ def start_workers():
     if ENABLE_SMARTMONEY:
         t2 = threading.Thread(target=worker_fetch_asian_odds, name="AsianOdds", daemon=True)
         threads.append(t2); t2.start()
+    t3 = threading.Thread(target=worker_odds_rollup, name="OddsRollup", daemon=True)
+    threads.append(t3); t3.start()
     return threads
 
 # ------------- FASTAPI --------------------------------------------------------
@@ -240,47 +420,157 @@ def on_shutdown():
     _stop.set()
     logger.info("👋 v9.0 shutdown")
 
+# ---- Pagination / streaming -------------------------------------------------
+# Keyset pagination: το cursor κωδικοποιεί το (ts, id) της τελευταίας γραμμής και
+# επιστρέφεται στο header X-Next-Cursor. Με format=ndjson οι γραμμές γράφονται
+# μία-μία από server-side cursor (σταθερή μνήμη, άμεσο πρώτο byte).
+PAGE_MAX = 1000
+STREAM_BATCH = 1000
+STREAM_MAX = 1_000_000   # ανώτατο limit για format=ndjson (το json κόβεται στο PAGE_MAX)
+
+def parse_dt(value: Optional[str]) -> Optional[datetime]:
+    """ISO 8601 → naive UTC (όπως αποθηκεύονται τα DateTime columns)."""
+    if not value:
+        return None
+    dt = datetime.fromisoformat(value)
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+def encode_cursor(key) -> str:
+    ts, id_ = key
+    ts = ts.isoformat() if isinstance(ts, datetime) else ts
+    return base64.urlsafe_b64encode(json.dumps([ts, id_]).encode()).decode()
+
+def decode_cursor(cursor: Optional[str], as_datetime: bool = False):
+    if not cursor:
+        return None
+    try:
+        ts, id_ = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return (datetime.fromisoformat(ts) if as_datetime else float(ts)), int(id_)
+    except Exception:
+        raise HTTPException(400, "Invalid 'cursor'")
+
+def _keyset(stmt, ts_col, id_col, after, desc: bool = True):
+    if after is not None:
+        ts, id_ = after
+        if desc:
+            stmt = stmt.where(or_(ts_col < ts, and_(ts_col == ts, id_col < id_)))
+        else:
+            stmt = stmt.where(or_(ts_col > ts, and_(ts_col == ts, id_col > id_)))
+    if desc:
+        return stmt.order_by(ts_col.desc(), id_col.desc())
+    return stmt.order_by(ts_col.asc(), id_col.asc())
+
+def _iter_rows(stmt, key, serialize):
+    """(key, row) από SELECT με yield_per – στο Postgres γίνεται server-side cursor."""
+    with SessionLocal() as s:
+        for r in s.execute(stmt.execution_options(yield_per=STREAM_BATCH)):
+            yield key(r), serialize(r)
+
+def _respond(rows, response: Response, fmt: str, limit: Optional[int], default_limit: int):
+    if fmt == "ndjson":
+        if limit:
+            rows = islice(rows, limit)
+        return StreamingResponse((json.dumps(row, ensure_ascii=False) + "\n" for _, row in rows),
+                                 media_type="application/x-ndjson")
+    limit = min(limit or default_limit, PAGE_MAX)
+    page = list(islice(rows, limit))
+    if isinstance(rows, GeneratorType):
+        rows.close()
+    if len(page) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(page[-1][0])
+    return [row for _, row in page]
+
 # ---- API: Matches ------------------------------------------------------------
+def _match_row(r):
+    return {"id": r.id, "provider_id": r.provider_id, "league": r.league, "home": r.home, "away": r.away,
+            "kickoff_utc": r.kickoff_utc.isoformat() if r.kickoff_utc else None, "status": r.status}
+
 @app.get("/api/matches")
-def api_matches(since: Optional[str] = Query(None), league: Optional[str] = Query(None)):
+def api_matches(response: Response, since: Optional[str] = Query(None), league: Optional[str] = Query(None),
+                cursor: Optional[str] = Query(None), limit: Optional[int] = Query(None, ge=1, le=STREAM_MAX),
+                format: str = Query("json", pattern="^(json|ndjson)$")):
     try:
-        dt_since = datetime.fromisoformat(since) if since else datetime.utcnow() - timedelta(days=2)
+        dt_since = parse_dt(since) or datetime.utcnow() - timedelta(days=2)
     except Exception:
         raise HTTPException(400, "Invalid 'since' (use ISO 8601)")
-    with SessionLocal() as s:
-        q = s.query(Match).filter(Match.updated_at >= dt_since)
-        if league: q = q.filter(Match.league == league)
-        rows = q.order_by(Match.kickoff_utc.asc()).all()
-        return [{"id": r.id, "provider_id": r.provider_id, "league": r.league, "home": r.home, "away": r.away,
-                 "kickoff_utc": r.kickoff_utc.isoformat(), "status": r.status} for r in rows]
+    stmt = select(Match.id, Match.provider_id, Match.league, Match.home, Match.away,
+                  Match.kickoff_utc, Match.status).where(Match.updated_at >= dt_since)
+    if league: stmt = stmt.where(Match.league == league)
+    stmt = _keyset(stmt, Match.kickoff_utc, Match.id, decode_cursor(cursor, as_datetime=True), desc=False)
+    rows = _iter_rows(stmt, lambda r: (r.kickoff_utc, r.id), _match_row)
+    return _respond(rows, response, format, limit, PAGE_MAX)
 
 # ---- API: Odds ---------------------------------------------------------------
+def _odds_row(r):
+    return {"match_id": r.match_id, "book": r.book, "market": r.market, "price": r.price,
+            "line": r.line, "ts": r.ts.isoformat()}
+
 @app.get("/api/odds")
-def api_odds(match_id: Optional[int] = Query(None), provider_id: Optional[str] = Query(None), limit: int = 200):
-    with SessionLocal() as s:
-        q = s.query(Odds).join(Match)
-        if match_id: q = q.filter(Odds.match_id == match_id)
-        if provider_id: q = q.filter(Match.provider_id == provider_id)
-        q = q.order_by(Odds.ts.desc()).limit(max(1, min(limit, 1000)))
-        rows = q.all()
-        return [{"match_id": r.match_id, "book": r.book, "market": r.market, "price": r.price,
-                 "line": r.line, "ts": r.ts.isoformat()} for r in rows]
+def api_odds(response: Response, match_id: Optional[int] = Query(None), provider_id: Optional[str] = Query(None),
+             limit: Optional[int] = Query(None, ge=1, le=STREAM_MAX),
+             since: Optional[str] = Query(None), until: Optional[str] = Query(None),
+             resolution: str = Query("auto", pattern="^(auto|raw|1m|15m)$"),
+             cursor: Optional[str] = Query(None), format: str = Query("json", pattern="^(json|ndjson)$")):
+    """
+    Χωρίς since/until: τα odds των τελευταίων ODDS_HOT_HOURS από τον πίνακα odds.
+    Χωρίς since: το παράθυρο είναι ODDS_HOT_HOURS πριν το until.
+    Μεγαλύτερα εύρη διαβάζουν OHLC bars (1m έως 2 ημέρες, αλλιώς 15m)
+    ή raw ticks από τα ημερήσια shards με resolution=raw.
+    """
+    now = datetime.utcnow()
+    hot_from = now - timedelta(hours=ODDS_HOT_HOURS)
+    try:
+        dt_until = parse_dt(until) or now
+        dt_since = parse_dt(since) or dt_until - timedelta(hours=ODDS_HOT_HOURS)
+    except Exception:
+        raise HTTPException(400, "Invalid 'since'/'until' (use ISO 8601)")
+    # hot/cold μόνο από το τελικό παράθυρο: χωρίς until, since = hot_from
+    hot = dt_since >= hot_from
+
+    match_ids = [match_id] if match_id else None
+    if provider_id:
+        with SessionLocal() as s:
+            ids = [i for (i,) in s.query(Match.id).filter(Match.provider_id == provider_id)]
+        match_ids = [i for i in ids if not match_ids or i in match_ids]
+        if not match_ids:
+            return _respond(iter(()), response, format, limit, 200)
+
+    if resolution in ("1m", "15m") or (resolution == "auto" and not hot):
+        if resolution == "auto":
+            resolution = "1m" if dt_until - dt_since <= timedelta(days=2) else "15m"
+        rows = ticks.iter_bars(resolution, dt_since, dt_until, match_ids=match_ids, before=decode_cursor(cursor))
+    elif not hot:
+        rows = ticks.iter_ticks(dt_since, dt_until, match_ids=match_ids, before=decode_cursor(cursor))
+    else:
+        stmt = select(Odds.id, Odds.match_id, Odds.book, Odds.market, Odds.price, Odds.line, Odds.ts) \
+            .where(Odds.ts >= dt_since, Odds.ts <= dt_until)
+        if match_ids: stmt = stmt.where(Odds.match_id.in_(match_ids))
+        stmt = _keyset(stmt, Odds.ts, Odds.id, decode_cursor(cursor, as_datetime=True))
+        rows = _iter_rows(stmt, lambda r: (r.ts, r.id), _odds_row)
+    return _respond(rows, response, format, limit, 200)
 
 # ---- API: Alerts -------------------------------------------------------------
+def _alert_row(r):
+    return {"id": r.id, "level": r.level, "kind": r.kind, "message": r.message,
+            "payload": json.loads(r.payload or "{}"), "created_at": r.created_at.isoformat()}
+
 @app.get("/api/alerts")
-def api_alerts(level: Optional[str] = Query(None), kind: Optional[str] = Query(None), since: Optional[str] = Query(None), limit: int = 200):
+def api_alerts(response: Response, level: Optional[str] = Query(None), kind: Optional[str] = Query(None),
+               since: Optional[str] = Query(None), limit: Optional[int] = Query(None, ge=1, le=STREAM_MAX),
+               cursor: Optional[str] = Query(None), format: str = Query("json", pattern="^(json|ndjson)$")):
     try:
-        dt_since = datetime.fromisoformat(since) if since else datetime.utcnow() - timedelta(days=7)
+        dt_since = parse_dt(since) or datetime.utcnow() - timedelta(days=7)
     except Exception:
         raise HTTPException(400, "Invalid 'since'")
-    with SessionLocal() as s:
-        q = s.query(Alert).filter(Alert.created_at >= dt_since)
-        if level: q = q.filter(Alert.level == level)
-        if kind: q = q.filter(Alert.kind == kind)
-        q = q.order_by(Alert.created_at.desc()).limit(max(1, min(limit, 1000)))
-        rows = q.all()
-        return [{"id": r.id, "level": r.level, "kind": r.kind, "message": r.message,
-                 "payload": json.loads(r.payload or "{}"), "created_at": r.created_at.isoformat()} for r in rows]
+    stmt = select(Alert.id, Alert.level, Alert.kind, Alert.message, Alert.payload, Alert.created_at) \
+        .where(Alert.created_at >= dt_since)
+    if level: stmt = stmt.where(Alert.level == level)
+    if kind: stmt = stmt.where(Alert.kind == kind)
+    stmt = _keyset(stmt, Alert.created_at, Alert.id, decode_cursor(cursor, as_datetime=True))
+    rows = _iter_rows(stmt, lambda r: (r.created_at, r.id), _alert_row)
+    return _respond(rows, response, format, limit, 200)
 
 # ---- Health ------------------------------------------------------------------
 @app.get("/health", response_class=PlainTextResponse)
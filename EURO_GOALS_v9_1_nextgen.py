@@ -8,7 +8,6 @@
 # ================================================================
 
 import os
-import json
 import time
 import threading
 import logging
@@ -19,6 +18,9 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from dotenv import load_dotenv
 
+from modules.alert_journal import AlertJournal
+from modules.status_registry import StatusRegistry
+
 # ---------------------------------------------------------------
 # 1. Φόρτωση .env
 # ---------------------------------------------------------------
@@ -31,6 +33,8 @@ DUAL_ENGINE_MODE = os.getenv("DUAL_ENGINE_MODE", "ON")
 
 SYSTEM_STATUS_FILE = os.getenv("SYSTEM_STATUS_FILE", "data/system_status.json")
 ALERT_HISTORY_FILE = os.getenv("ALERT_HISTORY_FILE", "data/alert_history.json")
+ALERT_JOURNAL_DIR = os.getenv("ALERT_JOURNAL_DIR", "data/alerts")
+STATUS_FLUSH_INTERVAL = float(os.getenv("STATUS_FLUSH_INTERVAL", 5))
 
 # ---------------------------------------------------------------
 # 2. Logging
@@ -46,6 +50,12 @@ logging.basicConfig(
 )
 logger = logging.getLogger("EURO_GOALS_v9_1")
 
+# Append-only journal· το παλιό alert_history.json εισάγεται μία φορά
+alert_journal = AlertJournal(ALERT_JOURNAL_DIR, legacy_file=ALERT_HISTORY_FILE)
+
+# Κατάσταση engines στη μνήμη· το system_status.json είναι μόνο snapshot
+status_registry = StatusRegistry(SYSTEM_STATUS_FILE, flush_interval=STATUS_FLUSH_INTERVAL)
+
 # ---------------------------------------------------------------
 # 3. FastAPI App + UI
 # ---------------------------------------------------------------
@@ -55,41 +65,19 @@ app.mount("/static", StaticFiles(directory="static"), name="static")
 templates = Jinja2Templates(directory="templates")
 
 # ---------------------------------------------------------------
-# 4. Utility: update system_status.json & alert_history.json
+# 4. Utility: update system_status.json & alert journal
 # ---------------------------------------------------------------
 def update_status(engine_name: str, state: str):
-    """Ενημερώνει το system_status.json"""
+    """Ενημερώνει την κατάσταση στο status registry (snapshot στο system_status.json)"""
     try:
-        os.makedirs(os.path.dirname(SYSTEM_STATUS_FILE), exist_ok=True)
-        data = {}
-        if os.path.exists(SYSTEM_STATUS_FILE):
-            with open(SYSTEM_STATUS_FILE, "r", encoding="utf-8") as f:
-                data = json.load(f)
-        data[engine_name] = {
-            "status": state,
-            "last_update": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
-        with open(SYSTEM_STATUS_FILE, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
+        status_registry.set(engine_name, state)
     except Exception as e:
-        logger.error(f"Σφάλμα ενημέρωσης system_status.json: {e}")
+        logger.error(f"Σφάλμα ενημέρωσης status registry: {e}")
 
 def append_alert(source: str, message: str):
-    """Καταγραφή νέας ειδοποίησης"""
+    """Καταγραφή νέας ειδοποίησης (append-only journal)"""
     try:
-        os.makedirs(os.path.dirname(ALERT_HISTORY_FILE), exist_ok=True)
-        data = []
-        if os.path.exists(ALERT_HISTORY_FILE):
-            with open(ALERT_HISTORY_FILE, "r", encoding="utf-8") as f:
-                data = json.load(f)
-        entry = {
-            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "source": source,
-            "message": message
-        }
-        data.insert(0, entry)
-        with open(ALERT_HISTORY_FILE, "w", encoding="utf-8") as f:
-            json.dump(data[:500], f, indent=4, ensure_ascii=False)
+        alert_journal.append(source, message)
     except Exception as e:
         logger.error(f"Σφάλμα καταγραφής ειδοποίησης: {e}")
 
@@ -141,19 +129,16 @@ def home(request: Request):
 @app.get("/status")
 def get_status():
     try:
-        if os.path.exists(SYSTEM_STATUS_FILE):
-            with open(SYSTEM_STATUS_FILE, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            return JSONResponse(content=data)
+        if status_registry:
+            return JSONResponse(content=status_registry.snapshot())
         return JSONResponse(content={"status": "no data yet"})
     except Exception as e:
         return JSONResponse(content={"error": str(e)})
 
 @app.get("/alerts")
-def get_alerts():
-    if os.path.exists(ALERT_HISTORY_FILE):
-        with open(ALERT_HISTORY_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
+def get_alerts(limit: int = 500):
+    data = alert_journal.latest(max(1, limit))
+    if data:
         return JSONResponse(content=data)
     return JSONResponse(content={"alerts": []})
 
@@ -164,11 +149,10 @@ def get_alerts():
 def health_dual():
     """Επιστρέφει συνοπτική εικόνα λειτουργίας SmartMoney + GoalMatrix"""
     try:
-        if not os.path.exists(SYSTEM_STATUS_FILE):
-            return JSONResponse(content={"status": "FAIL", "summary": "No system_status.json found"})
+        if not status_registry:
+            return JSONResponse(content={"status": "FAIL", "summary": "No engine status reported yet"})
 
-        with open(SYSTEM_STATUS_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        data = status_registry.snapshot()
 
         smart = data.get("SmartMoney", {}).get("status", "unknown")
         goal = data.get("GoalMatrix", {}).get("status", "unknown")
@@ -209,8 +193,10 @@ def start_engines():
         logger.warning("⚠️ Dual Engine Mode απενεργοποιημένο")
         return
     logger.info("🚀 Εκκίνηση Dual Data Engine...")
+    status_registry.start()
     threading.Thread(target=smartmoney_engine, daemon=True).start()
     threading.Thread(target=goalmatrix_engine, daemon=True).start()
+    threading.Thread(target=alert_journal.compaction_loop, daemon=True).start()
     update_status("SmartMoney", "initializing")
     update_status("GoalMatrix", "initializing")
 
@@ -220,6 +206,10 @@ def startup_event():
     start_engines()
     logger.info("✅ Dual Engine ενεργό και συγχρονισμένο.")
 
+@app.on_event("shutdown")
+def shutdown_event():
+    status_registry.stop()
+
 # ---------------------------------------------------------------
 # 9. Run
 # ---------------------------------------------------------------
@@ -3,7 +3,7 @@
 # SmartMoney + GoalMatrix Integration + Unified Monitoring
 # ==============================================================
 
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Query, Request
 from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy import create_engine, text
@@ -11,6 +11,9 @@ from datetime import datetime
 import requests
 import os
 from dotenv import load_dotenv
+from modules.goal_hazard import GOALMATRIX_ALERT_THRESHOLD
+from modules.goal_matrix import get_goal_matrix_data
+from modules.probe_scheduler import ProbeScheduler
 
 # --------------------------------------------------------------
 # LOAD ENVIRONMENT
@@ -23,7 +26,6 @@ FOOTBALLDATA_API_KEY = os.getenv("FOOTBALLDATA_API_KEY", "")
 SPORTMONKS_API_KEY = os.getenv("SPORTMONKS_API_KEY", "")
 BESOCCER_API_KEY = os.getenv("BESOCCER_API_KEY", "")
 GOALMATRIX_SOURCES = os.getenv("GOALMATRIX_SOURCES", "SOFASCORE,FLASHCORE,BESOCCER").split(",")
-GOALMATRIX_ALERT_THRESHOLD = os.getenv("GOALMATRIX_ALERT_THRESHOLD", "0.82")
 
 # --------------------------------------------------------------
 # FASTAPI & DB INIT
@@ -103,6 +105,18 @@ def check_goalmatrix_sources():
             results[source] = "❌ Unknown"
     return results
 
+# --------------------------------------------------------------
+# HEALTH PROBES (background, παράλληλα, cached snapshot)
+# --------------------------------------------------------------
+probes = (
+    ProbeScheduler()
+    .register("db", check_database, interval=30)
+    .register("render", check_render, interval=60)
+    .register("footballdata", check_footballdata, interval=300)
+    .register("sportmonks", check_sportmonks, interval=300)
+    .register("besoccer", check_besoccer, interval=300)
+)
+
 # --------------------------------------------------------------
 # ROUTES
 # --------------------------------------------------------------
@@ -117,14 +131,12 @@ def system_status_page(request: Request):
 @app.get("/system_status_data")
 def system_status_data():
     goalmatrix_overall = "✅ Active" if all(v.startswith("✅") for v in check_goalmatrix_sources().values()) else "⚠️ Partial"
+    snapshot = probes.snapshot()
     data = {
-        "db": check_database(),
-        "render": check_render(),
-        "footballdata": check_footballdata(),
-        "sportmonks": check_sportmonks(),
-        "besoccer": check_besoccer(),
+        **snapshot["status"],
         "smartmoney": check_smartmoney(),
         "goalmatrix": goalmatrix_overall,
+        "probes": snapshot["probes"],
         "last_update": datetime.now().strftime("%d/%m/%Y %H:%M:%S")
     }
     return JSONResponse(content=data)
@@ -134,11 +146,15 @@ def goalmatrix_page(request: Request):
     return templates.TemplateResponse("goalmatrix.html", {"request": request})
 
 @app.get("/goalmatrix_data")
-def goalmatrix_data():
+def goalmatrix_data(league: str = None, limit: int = Query(None, ge=1)):
     sources = check_goalmatrix_sources()
+    matrix = get_goal_matrix_data(league=league, limit=limit)
     data = {
         "sources": sources,
         "alert_threshold": GOALMATRIX_ALERT_THRESHOLD,
+        "teams": len(matrix["rows"]),
+        "rows": matrix["rows"],
+        "matrix_timestamp": matrix["timestamp"],
         "last_update": datetime.now().strftime("%d/%m/%Y %H:%M:%S")
     }
     return JSONResponse(content=data)
@@ -159,3 +175,9 @@ def startup_event():
     print("[EURO_GOALS v9.2.1] 🚀 Starting Dual Data Engine...")
     print("[EURO_GOALS v9.2.1] ✅ SmartMoney Monitor Active")
     print("[EURO_GOALS v9.2.1] ✅ GoalMatrix Engine Initialized")
+    probes.start()
+    print(f"[EURO_GOALS v9.2.1] ✅ Health probes scheduled ({len(probes.snapshot()['status'])} checks)")
+
+@app.on_event("shutdown")
+def shutdown_event():
+    probes.stop()
@@ -3,7 +3,7 @@
 # Combines System Status + SmartMoney + GoalMatrix Panels
 # ==============================================================
 
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Query, Request
 from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy import create_engine, text
@@ -11,6 +11,9 @@ from datetime import datetime
 import requests
 import os
 from dotenv import load_dotenv
+from modules.goal_hazard import GOALMATRIX_ALERT_THRESHOLD
+from modules.goal_matrix import get_goal_matrix_data
+from modules.probe_scheduler import ProbeScheduler
 
 # --------------------------------------------------------------
 # LOAD ENVIRONMENT
@@ -23,7 +26,6 @@ FOOTBALLDATA_API_KEY = os.getenv("FOOTBALLDATA_API_KEY", "")
 SPORTMONKS_API_KEY = os.getenv("SPORTMONKS_API_KEY", "")
 BESOCCER_API_KEY = os.getenv("BESOCCER_API_KEY", "")
 GOALMATRIX_SOURCES = os.getenv("GOALMATRIX_SOURCES", "SOFASCORE,FLASHCORE,BESOCCER").split(",")
-GOALMATRIX_ALERT_THRESHOLD = os.getenv("GOALMATRIX_ALERT_THRESHOLD", "0.82")
 
 # --------------------------------------------------------------
 # FASTAPI INIT
@@ -98,6 +100,18 @@ def check_goalmatrix_sources():
             results[s] = "❌ Unknown"
     return results
 
+# --------------------------------------------------------------
+# HEALTH PROBES (background, παράλληλα, cached snapshot)
+# --------------------------------------------------------------
+probes = (
+    ProbeScheduler()
+    .register("db", check_database, interval=30)
+    .register("render", check_render, interval=60)
+    .register("footballdata", check_footballdata, interval=300)
+    .register("sportmonks", check_sportmonks, interval=300)
+    .register("besoccer", check_besoccer, interval=300)
+)
+
 # --------------------------------------------------------------
 # ROUTES
 # --------------------------------------------------------------
@@ -112,14 +126,12 @@ def unified_monitor_page(request: Request):
 @app.get("/system_status_data")
 def system_status_data():
     goalmatrix_overall = "✅ Active" if all(v.startswith("✅") for v in check_goalmatrix_sources().values()) else "⚠️ Partial"
+    snapshot = probes.snapshot()
     data = {
-        "db": check_database(),
-        "render": check_render(),
-        "footballdata": check_footballdata(),
-        "sportmonks": check_sportmonks(),
-        "besoccer": check_besoccer(),
+        **snapshot["status"],
         "smartmoney": check_smartmoney(),
         "goalmatrix": goalmatrix_overall,
+        "probes": snapshot["probes"],
         "last_update": datetime.now().strftime("%d/%m/%Y %H:%M:%S")
     }
     return JSONResponse(content=data)
@@ -136,14 +148,24 @@ def smartmoney_data():
     return JSONResponse(content=data)
 
 @app.get("/goalmatrix_data")
-def goalmatrix_data():
+def goalmatrix_data(league: str = None, limit: int = Query(None, ge=1)):
+    matrix = get_goal_matrix_data(league=league, limit=limit)
     data = {
         "sources": check_goalmatrix_sources(),
         "threshold": GOALMATRIX_ALERT_THRESHOLD,
+        "teams": len(matrix["rows"]),
+        "rows": matrix["rows"],
+        "matrix_timestamp": matrix["timestamp"],
         "last_update": datetime.now().strftime("%H:%M:%S")
     }
     return JSONResponse(content=data)
 
 @app.on_event("startup")
 def startup_event():
+    probes.start()
     print("[EURO_GOALS v9.3] 🚀 Unified Monitoring initialized.")
+    print(f"[EURO_GOALS v9.3] ✅ Health probes scheduled ({len(probes.snapshot()['status'])} checks)")
+
+@app.on_event("shutdown")
+def shutdown_event():
+    probes.stop()
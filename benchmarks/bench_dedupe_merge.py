@@ -0,0 +1,127 @@
+# ============================================================
+# benchmarks/bench_dedupe_merge.py
+# eurogoals_data.dedupe_merge: row-wise apply (calc_flags / season_of)
+# vs column-wise derivations σε συνθετικό multi-season frame
+# ============================================================
+# Run:  python benchmarks/bench_dedupe_merge.py [--rows 200000] [--new 5000]
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import eurogoals_data as ed
+
+
+def _frame(n, seed, start="2015-07-01"):
+    rng = np.random.default_rng(seed)
+    codes = list(ed.FLASH_LEAGUES)
+    dates = pd.Timestamp(start) + pd.to_timedelta(rng.integers(0, 365 * 10, n), unit="D")
+    hg = rng.poisson(1.5, n).astype("float64")
+    ag = rng.poisson(1.1, n).astype("float64")
+    hg[rng.random(n) < 0.03] = np.nan  # fixtures χωρίς σκορ
+    league = rng.integers(0, len(codes), n)
+    return pd.DataFrame({
+        "Date": dates.strftime("%Y-%m-%d"),
+        "Country": [ed.FLASH_LEAGUES[codes[i]]["country"] for i in league],
+        "LeagueCode": [codes[i] for i in league],
+        "LeagueName": [ed.FLASH_LEAGUES[codes[i]]["name"] for i in league],
+        "HomeTeam": [f"Team{i}" for i in rng.integers(0, 2000, n)],
+        "AwayTeam": [f"Team{i}" for i in rng.integers(0, 2000, n)],
+        "HomeGoals": hg,
+        "AwayGoals": ag,
+    })
+
+
+def legacy_dedupe_merge(existing, new):
+    """Η υλοποίηση πριν τη vectorization (row-wise apply)."""
+    if existing is None or existing.empty:
+        base = new.copy()
+    else:
+        key_cols = ["Date", "LeagueCode", "HomeTeam", "AwayTeam"]
+        base = pd.concat([existing, new], ignore_index=True)
+        base.sort_values(by=["Date", "LeagueCode"], inplace=True, kind="stable")
+        base.drop_duplicates(subset=key_cols, keep="last", inplace=True)
+
+    for gcol in ["HomeGoals", "AwayGoals"]:
+        if gcol in base.columns:
+            base[gcol] = pd.to_numeric(base[gcol], errors="coerce")
+
+    def calc_flags(row):
+        hg = row.get("HomeGoals", None)
+        ag = row.get("AwayGoals", None)
+        if pd.isna(hg) or pd.isna(ag):
+            return pd.Series({"BTTS": None, "Over1_5": None, "Over2_5": None, "Over3_5": None})
+        total = int(hg) + int(ag)
+        return pd.Series({
+            "BTTS": 1 if (hg > 0 and ag > 0) else 0,
+            "Over1_5": 1 if total >= 2 else 0,
+            "Over2_5": 1 if total >= 3 else 0,
+            "Over3_5": 1 if total >= 4 else 0,
+        })
+
+    flags = base.apply(calc_flags, axis=1)
+    for col in ["BTTS", "Over1_5", "Over2_5", "Over3_5"]:
+        base[col] = flags[col]
+
+    if "Season" not in base.columns:
+        base["Season"] = None
+
+    def season_of(dstr):
+        try:
+            d = pd.to_datetime(dstr).date()
+            yr = d.year
+            if d.month >= 7:
+                return f"{yr}-{str(yr + 1)[-2:]}"
+            else:
+                return f"{yr - 1}-{str(yr)[-2:]}"
+        except Exception:
+            return None
+    base["Season"] = base["Season"].fillna(base["Date"].apply(season_of))
+    return base
+
+
+def _same(a, b, cols):
+    for col in cols:
+        x = a[col].astype(object).where(a[col].notna(), None).tolist()
+        y = b[col].astype(object).where(b[col].notna(), None).tolist()
+        if [None if v is None else (int(v) if col in ed.FLAG_COLUMNS else v) for v in x] != \
+           [None if v is None else (int(v) if col in ed.FLAG_COLUMNS else v) for v in y]:
+            return False
+    return True
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=200_000)
+    ap.add_argument("--new", type=int, default=5_000)
+    args = ap.parse_args()
+
+    existing = _frame(args.rows, seed=1)
+    new = _frame(args.new, seed=2, start="2024-07-01")
+    print(f"existing: {len(existing):,} rows  new: {len(new):,} rows")
+
+    t0 = time.perf_counter()
+    old = legacy_dedupe_merge(existing.copy(), new.copy())
+    t_old = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    cur = ed.dedupe_merge(existing.copy(), new.copy())
+    t_new = time.perf_counter() - t0
+
+    print(f"{'implementation':>14} | {'time (s)':>8}")
+    print("-" * 27)
+    print(f"{'row-wise':>14} | {t_old:>8.2f}")
+    print(f"{'column-wise':>14} | {t_new:>8.2f}")
+    print(f"speedup: {t_old / t_new:.1f}x  identical flags/season: "
+          f"{_same(old, cur, ed.FLAG_COLUMNS + ['Season', 'Date', 'HomeTeam'])}")
+    print(f"schema: {dict(cur.dtypes.astype(str))}")
+
+
+if __name__ == "__main__":
+    main()
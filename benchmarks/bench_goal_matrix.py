@@ -0,0 +1,107 @@
+# ============================================================
+# benchmarks/bench_goal_matrix.py
+# GoalMatrix engine σε συνθετικό πίνακα `matches` (SQLite):
+# full build του goal_matrix_cache, incremental refresh μετά από
+# μία αγωνιστική μέρα και serving του /goalmatrix_data
+# ============================================================
+# Run:  python benchmarks/bench_goal_matrix.py [--teams 4000] [--matches 200000] [--window 10]
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def _matches(n, teams, seed, start="2019-07-01", days=365 * 6):
+    rng = np.random.default_rng(seed)
+    home = rng.integers(0, teams, n)
+    away = (home + rng.integers(1, teams, n)) % teams
+    dates = pd.Timestamp(start) + pd.to_timedelta(rng.integers(0, days, n), unit="D")
+    hg, ag = rng.poisson(1.5, n), rng.poisson(1.1, n)
+    return pd.DataFrame({
+        "league": [f"League {t // 20}" for t in home],
+        "season": "",
+        "date": dates.strftime("%Y-%m-%d"),
+        "home_team": [f"Team{t}" for t in home],
+        "away_team": [f"Team{t}" for t in away],
+        "score": [f"{h}-{a}" for h, a in zip(hg, ag)],
+    })
+
+
+def _insert(engine, df):
+    with engine.begin() as conn:
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS matches (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                league TEXT, season TEXT, date TEXT, home_team TEXT, away_team TEXT, score TEXT
+            )
+        """))
+        conn.execute(text("""
+            INSERT INTO matches (league, season, date, home_team, away_team, score)
+            VALUES (:league, :season, :date, :home_team, :away_team, :score)
+        """), df.to_dict("records"))
+
+
+def _cache(engine):
+    with engine.connect() as conn:
+        result = conn.execute(text("SELECT * FROM goal_matrix_cache ORDER BY team"))
+        return pd.DataFrame.from_records(result.fetchall(), columns=list(result.keys())).drop(columns="updated_at")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--teams", type=int, default=4000)
+    ap.add_argument("--matches", type=int, default=200_000)
+    ap.add_argument("--window", type=int, default=10)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        os.environ["GOALMATRIX_SOURCE"] = "db"
+        os.environ["GOALMATRIX_WINDOW"] = str(args.window)
+        os.environ["GOALMATRIX_REFRESH"] = "3600"
+        from modules import goal_matrix as gm
+
+        history = _matches(args.matches, args.teams, seed=1)
+        _insert(gm.engine, history)
+        last_day = (pd.Timestamp(history["date"].max()) + pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+        matchday = _matches(args.teams // 4, args.teams, seed=2, start=last_day, days=1)
+        print(f"matches: {len(history):,}  teams: {args.teams:,}  window: {args.window}  new results: {len(matchday):,}")
+
+        full = gm.refresh_cache(full=True)
+        _insert(gm.engine, matchday)
+        inc = gm.refresh_cache()
+
+        t0 = time.perf_counter()
+        data = gm.get_goal_matrix_data()
+        t_first = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        for _ in range(100):
+            data = gm.get_goal_matrix_data()
+        t_serve = (time.perf_counter() - t0) / 100
+
+        # έλεγχος: incremental == full rebuild
+        after_inc = _cache(gm.engine)
+        gm.refresh_cache(full=True)
+        after_full = _cache(gm.engine)
+        gm.engine.dispose()
+
+    print(f"{'step':>22} | {'time (ms)':>9} | {'teams':>6}")
+    print("-" * 44)
+    print(f"{'full build':>22} | {full['seconds'] * 1000:>9.1f} | {full['teams']:>6}")
+    print(f"{'incremental refresh':>22} | {inc['seconds'] * 1000:>9.1f} | {inc['teams']:>6}")
+    print(f"{'serve (first)':>22} | {t_first * 1000:>9.2f} | {len(data['rows']):>6}")
+    print(f"{'serve (cached)':>22} | {t_serve * 1000:>9.3f} | {len(data['rows']):>6}")
+    print(f"incremental identical to full rebuild: {after_inc.equals(after_full)}")
+
+
+if __name__ == "__main__":
+    main()
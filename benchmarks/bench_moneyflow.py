@@ -0,0 +1,70 @@
+# ============================================================
+# benchmarks/bench_moneyflow.py
+# Scalar (_money_flow / _movement_label) vs batch MoneyFlowEngine
+# για 10k και 100k matches – ελέγχει και ότι τα αποτελέσματα ταυτίζονται
+# ============================================================
+# Run:  python benchmarks/bench_moneyflow.py [--sizes 10000,100000]
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.smartmoney_monitor import _money_flow, _movement_label
+from modules.moneyflow_engine import MoneyFlowEngine
+
+
+def _slate(n, seed):
+    rnd = random.Random(seed)
+    start, cur = {}, {}
+    for i in range(n):
+        mk = f"Home{i} - Away{i}"
+        s = {k: round(rnd.uniform(1.05, 9.0), 2) for k in ("1", "X", "2")}
+        c = {k: round(max(1.01, v + rnd.uniform(-0.6, 0.6)), 2) for k, v in s.items()}
+        if i % 97 == 0:
+            c = dict(s)  # καμία κίνηση
+        start[mk], cur[mk] = s, c
+    return start, cur
+
+
+def run(n):
+    start, cur = _slate(n, n)
+
+    t0 = time.perf_counter()
+    scalar = [(_money_flow(start[mk], cur[mk]), _movement_label(start[mk], cur[mk])) for mk in cur]
+    t_scalar = time.perf_counter() - t0
+
+    eng = MoneyFlowEngine(capacity=n)
+    eng.update(start)  # πρώτο snapshot = start
+    eng.update(cur)
+    t0 = time.perf_counter()
+    _, _, _, mfi, mov = eng.compute()
+    t_batch = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    rows = eng.feed(cur, "bench")
+    t_feed = time.perf_counter() - t0
+
+    mismatches = sum(1 for (m, l), a, b in zip(scalar, mfi, mov) if m != a or l != b)
+    mismatches += sum(1 for (m, l), r in zip(scalar, rows) if m != r["money_flow"] or l != r["movement"])
+    return t_scalar, t_batch, t_feed, mismatches
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", default="10000,100000")
+    args = ap.parse_args()
+
+    # batch = μόνο ο υπολογισμός, feed = update + υπολογισμός + dict γραμμές για το API
+    print(f"{'matches':>8} | {'scalar (s)':>10} | {'batch (s)':>9} | {'speedup':>7} | {'feed (s)':>8} | {'mismatches':>10}")
+    print("-" * 69)
+    for n in [int(x) for x in args.sizes.split(",")]:
+        t_s, t_b, t_f, bad = run(n)
+        print(f"{n:>8} | {t_s:>10.3f} | {t_b:>9.3f} | {t_s / t_b:>6.1f}x | {t_f:>8.3f} | {bad:>10}")
+
+
+if __name__ == "__main__":
+    main()
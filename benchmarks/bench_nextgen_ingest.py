@@ -0,0 +1,86 @@
+# ============================================================
+# benchmarks/bench_nextgen_ingest.py
+# NextGen v9.0 ingestion: ORM path (upsert_match + insert_odds)
+# vs bulk path (ingest_payload) – rows/sec για 1k / 10k / 100k odds
+# ============================================================
+# Run:  python benchmarks/bench_nextgen_ingest.py [--db-url postgresql://...]
+# Χωρίς --db-url χρησιμοποιεί προσωρινό SQLite αρχείο.
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PRICES_PER_MATCH = 10
+
+
+def _payload(n_odds, seed):
+    n_matches = max(1, n_odds // PRICES_PER_MATCH)
+    kickoff = datetime(2025, 11, 2, 16, 30)
+    matches = [{
+        "provider_id": f"B{seed}_{i}", "league": "EPL", "home": f"Home{i}", "away": f"Away{i}",
+        "kickoff_utc": kickoff + timedelta(minutes=i), "status": "scheduled",
+    } for i in range(n_matches)]
+    odds = [{
+        "provider_id": f"B{seed}_{i % n_matches}", "book": "Pinnacle", "market": "AH -0.5",
+        "price": 1.5 + (i % 50) / 100, "line": -0.5,
+    } for i in range(n_odds)]
+    return matches, odds
+
+
+def _orm_path(ng, matches, odds):
+    with ng.SessionLocal() as s:
+        objs = {}
+        for r in matches:
+            objs[r["provider_id"]] = ng.upsert_match(s, r["provider_id"], r["league"], r["home"], r["away"],
+                                                     r["kickoff_utc"], r["status"])
+        for o in odds:
+            ng.insert_odds(s, objs[o["provider_id"]], o["book"], o["market"], o["price"], o["line"])
+        s.commit()
+
+
+def _bulk_path(ng, matches, odds):
+    with ng.SessionLocal() as s:
+        ng.ingest_payload(s, matches, odds)
+        s.commit()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--db-url", default="")
+    ap.add_argument("--sizes", default="1000,10000,100000")
+    args = ap.parse_args()
+
+    tmpdir = None
+    if not args.db_url:
+        tmpdir = tempfile.mkdtemp(prefix="eg_bench_")
+        args.db_url = f"sqlite:///{os.path.join(tmpdir, 'bench.db')}"
+    os.environ["DATABASE_URL"] = args.db_url
+    os.environ.setdefault("ODDS_TICKS_DIR", tempfile.mkdtemp(prefix="eg_bench_ticks_"))
+
+    import EURO_GOALS_v9_0_nextgen as ng
+    ng.Base.metadata.drop_all(ng.engine)
+    ng.init_db()
+
+    print(f"db: {ng.engine.dialect.name}")
+    print(f"{'odds rows':>9} | {'ORM (rows/s)':>12} | {'bulk (rows/s)':>13} | {'speedup':>7}")
+    print("-" * 52)
+    for n in [int(x) for x in args.sizes.split(",")]:
+        results = []
+        for i, path in enumerate((_orm_path, _bulk_path)):
+            matches, odds = _payload(n, seed=f"{n}_{i}")
+            t0 = time.perf_counter()
+            path(ng, matches, odds)
+            results.append(n / (time.perf_counter() - t0))
+        orm, bulk = results
+        print(f"{n:>9} | {orm:>12,.0f} | {bulk:>13,.0f} | {bulk / orm:>6.1f}x")
+
+    ng.Base.metadata.drop_all(ng.engine)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+# ============================================================
+# benchmarks/bench_openfootball_sync.py
+# openfootball_importer απέναντι σε τοπικό stand-in HTTP server
+# (contents API + raw en.1.json με ETag / Last-Modified / 304):
+# παλιό σειριακό import (πλήρες GET + json.dump indent=2) vs
+# conditional GET + content-addressed cache + παράλληλες λίγκες
+# ============================================================
+# Run:  python benchmarks/bench_openfootball_sync.py [--matches 380] [--latency 0.05] [--workers 8]
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules import openfootball_importer as of
+
+SEASON = "2025-26"
+
+
+def _payloads(n_matches):
+    out = {}
+    for league in of.LEAGUES:
+        listing = [{"name": s, "type": "dir"} for s in ("2023-24", "2024-25", SEASON)] + \
+                  [{"name": "README.md", "type": "file"}]
+        data = {"name": f"{league} {SEASON}", "matches": [
+            {"round": f"Matchday {1 + i // 10}", "date": "2025-08-16", "team1": f"T{i % 20}",
+             "team2": f"T{(i + 7) % 20}", "score": {"ft": [i % 4, i % 3]}} for i in range(n_matches)]}
+        out[f"/api/{league}/contents"] = json.dumps(listing).encode()
+        out[f"/raw/{league}/master/{SEASON}/en.1.json"] = json.dumps(data).encode()
+    return out
+
+
+def _server(payloads, latency):
+    stamp = formatdate(time.time() - 3600, usegmt=True)
+    stats = {"200": 0, "304": 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            body = payloads.get(self.path)
+            if body is None:
+                self.send_response(404)
+                self.end_headers()
+                return
+            etag = '"%s"' % hashlib.md5(body).hexdigest()
+            if self.headers.get("If-None-Match") == etag:
+                with lock:
+                    stats["304"] += 1
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            with lock:
+                stats["200"] += 1
+            self.send_response(200)
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", stamp)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd, stats
+
+
+def legacy_import(cache_dir):
+    """Η υλοποίηση πριν τον conditional-GET cache (σειριακά, πάντα πλήρες download)."""
+    total = 0
+    for league in of.LEAGUES:
+        r = requests.get(f"{of.GITHUB_API_BASE}/{league}/contents", timeout=10)
+        folders = sorted((f["name"] for f in r.json() if f["type"] == "dir" and "-" in f["name"]), reverse=True)
+        r = requests.get(f"{of.RAW_BASE}/{league}/master/{folders[0]}/en.1.json", timeout=10)
+        data = r.json()
+        with open(os.path.join(cache_dir, f"{league}_{folders[0]}.json"), "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        total += len(data.get("matches", []))
+    return total
+
+
+def _mtimes(root):
+    out = {}
+    for dirpath, _, files in os.walk(root):
+        for name in files:
+            path = os.path.join(dirpath, name)
+            out[path] = os.stat(path).st_mtime_ns
+    return out
+
+
+def _timed(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--matches", type=int, default=380)
+    ap.add_argument("--latency", type=float, default=0.05)
+    ap.add_argument("--workers", type=int, default=8)
+    args = ap.parse_args()
+
+    httpd, stats = _server(_payloads(args.matches), args.latency)
+    base = f"http://127.0.0.1:{httpd.server_address[1]}"
+    of.GITHUB_API_BASE, of.RAW_BASE = f"{base}/api", f"{base}/raw"
+
+    devnull = open(os.devnull, "w")
+    with tempfile.TemporaryDirectory() as legacy_dir, tempfile.TemporaryDirectory() as cache_dir:
+        old_stdout, sys.stdout = sys.stdout, devnull
+        try:
+            total_old, t_old = _timed(legacy_import, legacy_dir)
+            total_cold, t_cold = _timed(of.main, workers=args.workers, cache_dir=cache_dir)
+            before = _mtimes(cache_dir)
+            stats.update({"200": 0, "304": 0})
+            total_warm, t_warm = _timed(of.main, workers=args.workers, cache_dir=cache_dir)
+            rewritten = sum(1 for p, m in _mtimes(cache_dir).items() if before.get(p) != m)
+        finally:
+            sys.stdout = old_stdout
+    httpd.shutdown()
+
+    print(f"leagues: {len(of.LEAGUES)}  matches/league: {args.matches}  latency: {args.latency * 1000:.0f} ms")
+    print(f"{'run':>22} | {'time (s)':>8} | {'matches':>7}")
+    print("-" * 44)
+    print(f"{'legacy (sequential)':>22} | {t_old:>8.3f} | {total_old:>7}")
+    print(f"{'cache cold':>22} | {t_cold:>8.3f} | {total_cold:>7}")
+    print(f"{'cache no-change':>22} | {t_warm:>8.3f} | {total_warm:>7}")
+    print(f"no-change run: {stats['304']} × 304, {stats['200']} × 200, files rewritten: {rewritten}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# ============================================================
+# benchmarks/bench_smartmoney_fetch.py
+# Wall-clock refresh για 40 leagues σε διάφορα concurrency levels
+# ενάντια σε τοπικό stub του API-Football (/odds)
+# ============================================================
+# Run:  python benchmarks/bench_smartmoney_fetch.py [--latency 0.25] [--leagues 40]
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.smartmoney_monitor import SmartMoneyMonitor, TARGET_LEAGUES
+
+
+def _fake_payload(lid, n=10):
+    rnd = random.Random(lid)
+    resp = []
+    for i in range(n):
+        home, away = f"Home{lid}_{i}", f"Away{lid}_{i}"
+        resp.append({
+            "teams": {"home": {"name": home}, "away": {"name": away}},
+            "odds": [{"markets": [{"name": "1X2", "outcomes": [
+                {"name": "Home", "price": round(rnd.uniform(1.5, 4.0), 2)},
+                {"name": "Draw", "price": round(rnd.uniform(2.8, 4.2), 2)},
+                {"name": "Away", "price": round(rnd.uniform(1.5, 6.0), 2)},
+            ]}]}],
+        })
+    return {"response": resp}
+
+
+def make_handler(latency, jitter):
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+
+        def do_GET(self):
+            q = parse_qs(urlparse(self.path).query)
+            lid = int((q.get("league") or ["0"])[0])
+            time.sleep(max(0.0, latency + random.uniform(-jitter, jitter)))
+            body = json.dumps(_fake_payload(lid)).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return StubHandler
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--latency", type=float, default=0.25, help="server latency per league (s)")
+    ap.add_argument("--jitter", type=float, default=0.05)
+    ap.add_argument("--leagues", type=int, default=40)
+    ap.add_argument("--levels", default="1,4,8,16,40")
+    args = ap.parse_args()
+
+    server = StubServer(("127.0.0.1", 0), make_handler(args.latency, args.jitter))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    leagues = (TARGET_LEAGUES * 2)[:args.leagues]
+    print(f"{'concurrency':>11} | {'wall (s)':>8} | {'matches':>7} | {'p50 league (s)':>14} | {'max league (s)':>14}")
+    print("-" * 68)
+    for level in [int(x) for x in args.levels.split(",")]:
+        mon = SmartMoneyMonitor(60, "bench-key", max_concurrency=level, cycle_deadline=120,
+                                leagues=leagues, base_url=base, history_path=None)
+        t0 = time.perf_counter()
+        items = mon._fetch_apifootball()
+        wall = time.perf_counter() - t0
+        lat = sorted(v["seconds"] for v in mon.league_latency().values() if v["seconds"] is not None)
+        p50 = lat[len(lat) // 2] if lat else 0.0
+        mx = lat[-1] if lat else 0.0
+        print(f"{level:>11} | {wall:>8.2f} | {len(items):>7} | {p50:>14.3f} | {mx:>14.3f}")
+        mon.close()
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
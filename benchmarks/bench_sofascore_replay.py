@@ -0,0 +1,132 @@
+# ============================================================
+# benchmarks/bench_sofascore_replay.py
+# Replay ενός Sofascore /events/live payload: παλιό write path
+# (ένα INSERT ... ON CONFLICT ανά event) vs write_sofascore_events
+# (digest + ένα multi-row upsert ανά poll)
+# ============================================================
+# Run:  python benchmarks/bench_sofascore_replay.py [--payload file.json] [--scale 8] [--polls 60]
+# Default payload: benchmarks/data/sofascore_live_sample.json (64 live events).
+# --scale κλωνοποιεί τα events (νέα ids) για να προσομοιώσει Σάββατο με εκατοντάδες αγώνες.
+
+import argparse
+import copy
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DEFAULT_PAYLOAD = os.path.join(ROOT, "benchmarks", "data", "sofascore_live_sample.json")
+
+
+def _load_events(path, scale):
+    with open(path, "r", encoding="utf-8") as f:
+        base = json.load(f)["events"]
+    events = []
+    for k in range(scale):
+        for e in base:
+            e = copy.deepcopy(e)
+            e["id"] = e["id"] + k * 10_000_000
+            events.append(e)
+    return events
+
+
+def _polls(events, n_polls, change_rate, seed):
+    """Κάθε poll: ~change_rate των events αλλάζει σκορ ή status, τα υπόλοιπα μένουν ίδια."""
+    rnd = random.Random(seed)
+    cur = copy.deepcopy(events)
+    out = []
+    for _ in range(n_polls):
+        for e in rnd.sample(cur, max(1, int(len(cur) * change_rate))):
+            if rnd.random() < 0.8:
+                side = rnd.choice(("homeScore", "awayScore"))
+                e[side]["current"] = e[side].get("current", 0) + 1
+            else:
+                e["status"]["type"] = "finished" if e["status"]["type"] == "inprogress" else "inprogress"
+        out.append(copy.deepcopy(cur))
+    return out
+
+
+def _legacy_write(lf, events):
+    """Το write path πριν το batching (ένα statement ανά event)."""
+    from sqlalchemy import text
+    with lf.engine.begin() as conn:
+        for e in events:
+            conn.execute(text("""
+                INSERT INTO matches (match_id, home, away, score, status, source, updated_at)
+                VALUES (:match_id, :home, :away, :score, :status, 'Sofascore', :updated_at)
+                ON CONFLICT(match_id) DO UPDATE SET
+                    score=:score,
+                    status=:status,
+                    updated_at=:updated_at
+            """), {
+                "match_id": f"sofa_{e['id']}",
+                "home": e["homeTeam"]["name"],
+                "away": e["awayTeam"]["name"],
+                "score": f"{e.get('homeScore', {}).get('current', 0)}-{e.get('awayScore', {}).get('current', 0)}",
+                "status": e["status"]["type"],
+                "updated_at": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),
+            })
+    return len(events)
+
+
+def _reset(lf):
+    from sqlalchemy import text
+    with lf.engine.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS matches"))
+        conn.execute(text("""
+            CREATE TABLE matches (
+                match_id TEXT PRIMARY KEY, home TEXT, away TEXT, score TEXT,
+                status TEXT, source TEXT, updated_at TEXT
+            )
+        """))
+    lf.reset_sofascore_digest()
+
+
+def _snapshot(lf):
+    from sqlalchemy import text
+    with lf.engine.connect() as conn:
+        return conn.execute(text("SELECT match_id, home, away, score, status FROM matches ORDER BY match_id")).all()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--payload", default=DEFAULT_PAYLOAD)
+    ap.add_argument("--scale", type=int, default=8)
+    ap.add_argument("--polls", type=int, default=60)
+    ap.add_argument("--change-rate", type=float, default=0.05)
+    args = ap.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix="eg_bench_")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmpdir, 'bench.db')}"
+    import live_feeds as lf
+
+    events = _load_events(args.payload, args.scale)
+    polls = _polls(events, args.polls, args.change_rate, seed=42)
+    print(f"events/poll: {len(events)}  polls: {len(polls)}  change rate: {args.change_rate:.0%}")
+
+    results = {}
+    for name, write in (("per-event", lambda ev: _legacy_write(lf, ev)), ("batched", lf.write_sofascore_events)):
+        _reset(lf)
+        lat, rows = [], 0
+        for ev in [events] + polls:
+            t0 = time.perf_counter()
+            rows += write(ev)
+            lat.append(time.perf_counter() - t0)
+        results[name] = (sum(lat), rows, sorted(lat)[len(lat) // 2], _snapshot(lf))
+
+    print(f"{'path':>9} | {'total (s)':>9} | {'p50 poll (ms)':>13} | {'rows written':>12}")
+    print("-" * 53)
+    for name, (total, rows, p50, _) in results.items():
+        print(f"{name:>9} | {total:>9.3f} | {p50 * 1000:>13.2f} | {rows:>12,}")
+    old, new = results["per-event"], results["batched"]
+    print(f"speedup: {old[0] / new[0]:.1f}x  identical table: {old[3] == new[3]}")
+
+
+if __name__ == "__main__":
+    main()
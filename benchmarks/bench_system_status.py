@@ -0,0 +1,64 @@
+# ============================================================
+# benchmarks/bench_system_status.py
+# /system_status_data: σειριακά checks ανά request (παλιά υλοποίηση)
+# vs ProbeScheduler (παράλληλα στο background + cached snapshot),
+# με stand-in probes που κοιμούνται `latency` δευτερόλεπτα
+# ============================================================
+# Run:  python benchmarks/bench_system_status.py [--probes 5] [--latency 0.5] [--requests 1000]
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.probe_scheduler import ProbeScheduler
+
+
+def _probe(latency):
+    def check():
+        time.sleep(latency)
+        return "✅ OK"
+    return check
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--probes", type=int, default=5)
+    ap.add_argument("--latency", type=float, default=0.5)
+    ap.add_argument("--requests", type=int, default=1000)
+    args = ap.parse_args()
+    checks = {f"probe{i}": _probe(args.latency) for i in range(args.probes)}
+
+    # παλιά υλοποίηση: όλα τα checks σειριακά σε κάθε request
+    t0 = time.perf_counter()
+    json.dumps({name: fn() for name, fn in checks.items()})
+    t_legacy = time.perf_counter() - t0
+
+    scheduler = ProbeScheduler()
+    for name, fn in checks.items():
+        scheduler.register(name, fn, interval=3600)
+    t0 = time.perf_counter()
+    scheduler.start()
+    while any(p["runs"] == 0 for p in scheduler.snapshot()["probes"].values()):
+        time.sleep(0.005)
+    t_warm = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for _ in range(args.requests):
+        json.dumps(scheduler.snapshot())
+    t_serve = (time.perf_counter() - t0) / args.requests
+    scheduler.stop()
+
+    print(f"probes: {args.probes}  latency/probe: {args.latency * 1000:.0f} ms")
+    print(f"{'step':>28} | {'time (ms)':>10}")
+    print("-" * 42)
+    print(f"{'legacy request (sequential)':>28} | {t_legacy * 1000:>10.1f}")
+    print(f"{'first snapshot (parallel)':>28} | {t_warm * 1000:>10.1f}")
+    print(f"{'cached request':>28} | {t_serve * 1000:>10.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,12 +5,47 @@
 
 import os
 import json
+import math
+import threading
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import List, Dict, Any
+from requests.adapters import HTTPAdapter
 
 BETFAIR_JSONRPC_URL = "https://api.betfair.com/exchange/betting/json-rpc/v1"
 
+# Betfair request weighting: sum(weight των priceData) * αριθμός markets <= 200 ανά request
+BETFAIR_MAX_WEIGHT = 200
+PRICE_DATA_WEIGHTS = {
+    "SP_AVAILABLE": 3,
+    "SP_TRADED": 7,
+    "EX_BEST_OFFERS": 5,
+    "EX_ALL_OFFERS": 17,
+    "EX_TRADED": 17,
+}
+BETFAIR_MAX_CONCURRENCY = int(os.getenv("BETFAIR_MAX_CONCURRENCY", 4))
+
+def request_weight(price_projection: Dict[str, Any] | None) -> int:
+    """Weight ενός market για το δοσμένο priceProjection (βλ. Betfair 'Market Data Request Limits')."""
+    price_data = set((price_projection or {}).get("priceData") or [])
+    if not price_data:
+        return 2
+    # EX_ALL_OFFERS + EX_TRADED μετράνε μαζί όσο το ένα
+    if {"EX_ALL_OFFERS", "EX_TRADED"} <= price_data:
+        price_data -= {"EX_TRADED"}
+    weight = sum(PRICE_DATA_WEIGHTS.get(p, 0) for p in price_data)
+    depth = (price_projection.get("exBestOffersOverrides") or {}).get("bestPricesDepth")
+    if "EX_BEST_OFFERS" in price_data and depth:
+        # το EX_BEST_OFFERS ζυγίζει 5 για depth 3 και κλιμακώνεται αναλογικά με το depth
+        weight += math.ceil(PRICE_DATA_WEIGHTS["EX_BEST_OFFERS"] * int(depth) / 3) - PRICE_DATA_WEIGHTS["EX_BEST_OFFERS"]
+    return max(1, weight)
+
+def chunk_market_ids(market_ids: List[str], price_projection: Dict[str, Any] | None) -> List[List[str]]:
+    """Χωρίζει τα market ids σε chunks που χωράνε στο BETFAIR_MAX_WEIGHT."""
+    per_request = max(1, BETFAIR_MAX_WEIGHT // request_weight(price_projection))
+    return [market_ids[i:i + per_request] for i in range(0, len(market_ids), per_request)]
+
 class BetfairClient:
     """
     Απλός JSON-RPC client για Betfair Exchange.
@@ -18,7 +53,7 @@ class BetfairClient:
       - BETFAIR_APP_KEY     (X-Application)
       - BETFAIR_SESSION     (X-Authentication) = SSO session token
     """
-    def __init__(self, app_key: str = None, session_token: str = None):
+    def __init__(self, app_key: str = None, session_token: str = None, max_concurrency: int = None):
         self.app_key = app_key or os.getenv("BETFAIR_APP_KEY")
         self.session = session_token or os.getenv("BETFAIR_SESSION")
         self.headers = {
@@ -26,6 +61,36 @@ class BetfairClient:
             "X-Authentication": self.session or "",
             "content-type": "application/json"
         }
+        self.max_concurrency = max(1, int(max_concurrency or BETFAIR_MAX_CONCURRENCY))
+        self._http = None
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _get_http(self) -> requests.Session:
+        """Κοινό keep-alive session (connection pool) για όλα τα RPC calls."""
+        with self._lock:
+            if self._http is None:
+                http = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_concurrency)
+                http.mount("https://", adapter)
+                http.headers.update(self.headers)
+                self._http = http
+            return self._http
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="betfair-rpc")
+            return self._pool
+
+    def close(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False)
+                self._pool = None
+            if self._http is not None:
+                self._http.close()
+                self._http = None
 
     def is_configured(self) -> bool:
         return bool(self.app_key and self.session)
@@ -40,7 +105,7 @@ class BetfairClient:
             "params": params,
             "id": 1
         }]
-        resp = requests.post(BETFAIR_JSONRPC_URL, headers=self.headers, data=json.dumps(payload), timeout=12)
+        resp = self._get_http().post(BETFAIR_JSONRPC_URL, data=json.dumps(payload), timeout=12)
         resp.raise_for_status()
         data = resp.json()
         if isinstance(data, list) and "result" in data[0]:
@@ -76,20 +141,35 @@ class BetfairClient:
     # -----------------------------
     # Get prices & volumes για markets
     # -----------------------------
-    def list_market_book(self, market_ids: List[str]) -> List[Dict[str, Any]]:
+    def list_market_book(self, market_ids: List[str], price_projection: Dict[str, Any] = None) -> List[Dict[str, Any]]:
         """
         Επιστρέφει live prices (best available) και totalMatched ανά market.
+        Τα market ids σπάνε σε chunks με βάση το request weight και τα chunks
+        τρέχουν παράλληλα (έως max_concurrency)· η σειρά των αποτελεσμάτων
+        ακολουθεί τη σειρά των chunks.
         """
         if not market_ids:
             return []
-        params = {
-            "marketIds": market_ids,
-            "priceProjection": {
-                "priceData": ["EX_BEST_OFFERS", "EX_TRADED"],
-                "virtualise": True
-            }
+        price_projection = price_projection or {
+            "priceData": ["EX_BEST_OFFERS", "EX_TRADED"],
+            "virtualise": True
         }
-        return self._rpc("listMarketBook", params)
+        chunks = chunk_market_ids(list(dict.fromkeys(market_ids)), price_projection)
+        call = lambda ids: self._rpc("listMarketBook", {"marketIds": ids, "priceProjection": price_projection})
+        if len(chunks) == 1:
+            return call(chunks[0])
+
+        futures = [self._get_pool().submit(call, ids) for ids in chunks]
+        books, errors = [], []
+        for ids, fut in zip(chunks, futures):
+            try:
+                books.extend(fut.result() or [])
+            except Exception as e:
+                errors.append(e)
+                print(f"[BETFAIR] ⚠️ listMarketBook chunk ({len(ids)} markets) failed: {e}")
+        if errors and len(errors) == len(chunks):
+            raise errors[0]
+        return books
 
     # -----------------------------
     # Βοηθητική: Best back price για κάθε runner
@@ -4,9 +4,11 @@
 # Συγκρίνει Sofascore & Flashscore από τον πίνακα `matches`
 # Αποθηκεύει αποτέλεσμα σε `verifier_state` (ΔΕΝ αλλάζει matches)
 # και γράφει διαγνωστικά logs για αποκλίσεις.
+# Incremental: high-water mark στο matches.updated_at (verifier_meta),
+# ξαναποφασίζει μόνο τα (home, away) που άλλαξαν από το τελευταίο run.
 # ==============================================
 
-from sqlalchemy import create_engine, text
+from sqlalchemy import bindparam, create_engine, inspect, text
 from datetime import datetime
 import os
 
@@ -17,6 +19,19 @@ engine = create_engine(
 )
 
 LIVE_STATUSES = ("live", "inprogress", "1st_half", "2nd_half", "extra_time")
+SOURCES = ("Sofascore", "Flashscore")
+KEY_CHUNK = 200  # (home, away) ζεύγη ανά SELECT των changed keys
+
+_UPSERT = text("""
+    INSERT INTO verifier_state (match_key, home, away, sofa_score, flash_score, decided, note, updated_at)
+    VALUES (:k, :h, :a, :sofa, :flash, :decided, :note, :ts)
+    ON CONFLICT(match_key) DO UPDATE SET
+        sofa_score = excluded.sofa_score,
+        flash_score = excluded.flash_score,
+        decided    = excluded.decided,
+        note       = excluded.note,
+        updated_at = excluded.updated_at
+""")
 
 def log(msg: str) -> None:
     print(f"[CROSS_VERIFIER] {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')} - {msg}")
@@ -36,6 +51,39 @@ def ensure_tables():
                 updated_at  TEXT
             )
         """))
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS verifier_meta (
+                name  TEXT PRIMARY KEY,
+                value TEXT
+            )
+        """))
+    ensure_indexes()
+
+def ensure_indexes():
+    """Indexes στο `matches` για το incremental scan και το lookup ανά (home, away, source)."""
+    try:
+        insp = inspect(engine)
+        if "matches" not in insp.get_table_names():
+            return
+        cols = {c["name"] for c in insp.get_columns("matches")}
+    except Exception as e:
+        log(f"⚠️ Αδυναμία ελέγχου πίνακα matches: {e}")
+        return
+    with engine.begin() as conn:
+        if {"status", "updated_at"} <= cols:
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_matches_status_updated ON matches (status, updated_at)"))
+        if {"home", "away", "source"} <= cols:
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_matches_home_away_source ON matches (home, away, source)"))
+
+def _get_watermark(conn) -> str | None:
+    row = conn.execute(text("SELECT value FROM verifier_meta WHERE name = 'high_water'")).first()
+    return row[0] if row else None
+
+def _set_watermark(conn, value: str) -> None:
+    conn.execute(text("""
+        INSERT INTO verifier_meta (name, value) VALUES ('high_water', :v)
+        ON CONFLICT(name) DO UPDATE SET value = excluded.value
+    """), {"v": value})
 
 def _mk_key(home: str, away: str) -> str:
     return f"{home.strip().lower()}__{away.strip().lower()}"
@@ -60,75 +108,117 @@ def _pick_decision(sofa_score: str | None, flash_score: str | None) -> tuple[str
     # Διαφέρουν → προτεραιότητα Sofascore (v1 απλός κανόνας)
     return sofa_score, f"disagree_sofa_pref (sofa={sofa_score}, flash={flash_score})"
 
-def verify_and_update():
+def _load_rows(conn, since: str | None):
     """
-    Φορτώνει τα πιο πρόσφατα live rows ανά (home, away) για κάθε source,
-    υπολογίζει απόφαση και ενημερώνει τον πίνακα verifier_state.
+    Πιο πρόσφατα live rows (Sofascore/Flashscore) για τα keys που άλλαξαν.
+    since=None → όλα τα live rows (πλήρες run).
     """
-    ensure_tables()
-
-    with engine.begin() as conn:
-        # Φέρνουμε τα πιο πρόσφατα live rows (τελευταίο update σε προτεραιότητα)
-        rows = conn.execute(text(f"""
+    if since is None:
+        return conn.execute(text("""
             SELECT home, away, score, source, updated_at
             FROM matches
-            WHERE status IN :st
+            WHERE status IN :st AND source IN :src
             ORDER BY updated_at DESC
-        """), {"st": LIVE_STATUSES}).mappings().all()
+        """).bindparams(bindparam("st", expanding=True), bindparam("src", expanding=True)),
+            {"st": LIVE_STATUSES, "src": SOURCES}).mappings().all()
+
+    # >= ώστε να μη χαθούν rows γραμμένα στο ίδιο δευτερόλεπτο με το watermark (η απόφαση είναι idempotent)
+    changed = conn.execute(text("""
+        SELECT DISTINCT home, away
+        FROM matches
+        WHERE status IN :st AND updated_at >= :since AND source IN :src
+    """).bindparams(bindparam("st", expanding=True), bindparam("src", expanding=True)),
+        {"st": LIVE_STATUSES, "since": since, "src": SOURCES}).all()
+
+    rows = []
+    for i in range(0, len(changed), KEY_CHUNK):
+        chunk = changed[i:i + KEY_CHUNK]
+        pairs = " OR ".join(f"(home = :h{j} AND away = :a{j})" for j in range(len(chunk)))
+        params = {"st": LIVE_STATUSES, "src": SOURCES}
+        for j, (home, away) in enumerate(chunk):
+            params[f"h{j}"], params[f"a{j}"] = home, away
+        rows += conn.execute(text(f"""
+            SELECT home, away, score, source, updated_at
+            FROM matches
+            WHERE ({pairs}) AND source IN :src AND status IN :st
+            ORDER BY updated_at DESC
+        """).bindparams(bindparam("st", expanding=True), bindparam("src", expanding=True)),
+            params).mappings().all()
+    rows.sort(key=lambda r: r["updated_at"] or "", reverse=True)
+    return rows
+
+def _known_state(conn, keys) -> dict[str, tuple]:
+    """match_key -> (sofa_score, flash_score) όπως είναι ήδη στο verifier_state."""
+    keys = list(keys)
+    out = {}
+    for i in range(0, len(keys), KEY_CHUNK):
+        out.update({r[0]: (r[1], r[2]) for r in conn.execute(text("""
+            SELECT match_key, sofa_score, flash_score FROM verifier_state WHERE match_key IN :keys
+        """).bindparams(bindparam("keys", expanding=True)), {"keys": keys[i:i + KEY_CHUNK]})})
+    return out
+
+def verify_and_update(full: bool = False):
+    """
+    Υπολογίζει απόφαση ανά (home, away) από τα πιο πρόσφατα live rows κάθε source
+    και ενημερώνει τον πίνακα verifier_state.
+    Incremental (default): μόνο τα keys με rows νεότερα από το high-water mark.
+    full=True (ή πρώτο run): ξαναποφασίζει όλα τα live keys.
+    """
+    ensure_tables()
+
+    with engine.begin() as conn:
+        since = None if full else _get_watermark(conn)
+        rows = _load_rows(conn, since)
+        known = _known_state(conn, {_mk_key(r["home"], r["away"]) for r in rows}) if since is not None else {}
 
     # Ομαδοποίηση: (home, away) -> { 'Sofascore': {...}, 'Flashscore': {...} }
     latest: dict[tuple[str, str], dict[str, dict]] = {}
     for r in rows:
         key = (r["home"], r["away"])
         src = (r["source"] or "").strip()
-        if src not in ("Sofascore", "Flashscore", "Verified"):
-            continue
         # Κρατάμε το πρώτο (είναι ήδη ταξινομημένα DESC κατά updated_at)
-        if key not in latest:
-            latest[key] = {}
-        if src not in latest[key]:
-            latest[key][src] = dict(r)
+        latest.setdefault(key, {}).setdefault(src, dict(r))
 
     # Υπολογισμός αποφάσεων & αποθήκευση κατάστασης
-    upserts = 0
     discrepancies = 0
     now = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
-
+    batch = []
+    for (home, away), sources in latest.items():
+        sofa_score = sources.get("Sofascore", {}).get("score")
+        flash_score = sources.get("Flashscore", {}).get("score")
+        match_key = _mk_key(home, away)
+        if known.get(match_key) == (sofa_score, flash_score):
+            continue  # rows στο όριο του watermark χωρίς πραγματική αλλαγή
+
+        decided, note = _pick_decision(sofa_score, flash_score)
+        if note.startswith("disagree"):
+            discrepancies += 1
+            log(f"⚠️ Διαφορά σκορ για {home} – {away}: Sofascore={sofa_score}, Flashscore={flash_score}")
+
+        batch.append({
+            "k": match_key,
+            "h": home,
+            "a": away,
+            "sofa": sofa_score,
+            "flash": flash_score,
+            "decided": decided,
+            "note": note,
+            "ts": now
+        })
+
+    stamps = [str(r["updated_at"]) for r in rows if r["updated_at"]]
+    high_water = max(stamps) if stamps else since
     with engine.begin() as conn:
-        for (home, away), sources in latest.items():
-            sofa_score = sources.get("Sofascore", {}).get("score")
-            flash_score = sources.get("Flashscore", {}).get("score")
-
-            decided, note = _pick_decision(sofa_score, flash_score)
-            if note.startswith("disagree"):
-                discrepancies += 1
-                log(f"⚠️ Διαφορά σκορ για {home} – {away}: Sofascore={sofa_score}, Flashscore={flash_score}")
-
-            match_key = _mk_key(home, away)
-            conn.execute(text("""
-                INSERT INTO verifier_state (match_key, home, away, sofa_score, flash_score, decided, note, updated_at)
-                VALUES (:k, :h, :a, :sofa, :flash, :decided, :note, :ts)
-                ON CONFLICT(match_key) DO UPDATE SET
-                    sofa_score = excluded.sofa_score,
-                    flash_score = excluded.flash_score,
-                    decided    = excluded.decided,
-                    note       = excluded.note,
-                    updated_at = excluded.updated_at
-            """), {
-                "k": match_key,
-                "h": home,
-                "a": away,
-                "sofa": sofa_score,
-                "flash": flash_score,
-                "decided": decided,
-                "note": note,
-                "ts": now
-            })
-            upserts += 1
-
-    log(f"🟢 Cross Verification ολοκληρώθηκε: {upserts} matches, {discrepancies} discrepancies.")
+        if batch:
+            conn.execute(_UPSERT, batch)  # ένα executemany για όλο το run
+        if high_water and high_water != since:
+            _set_watermark(conn, high_water)
+
+    mode = "full" if since is None else "incremental"
+    log(f"🟢 Cross Verification ({mode}) ολοκληρώθηκε: {len(batch)} matches, {discrepancies} discrepancies.")
     # Επιστρέφουμε μικρή σύνοψη για πιθανή χρήση από API/monitor
-    return {"processed": upserts, "discrepancies": discrepancies, "timestamp": now}
+    return {"processed": len(batch), "discrepancies": discrepancies, "mode": mode,
+            "high_water": high_water, "timestamp": now}
 
 if __name__ == "__main__":
     verify_and_update()
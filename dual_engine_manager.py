@@ -9,7 +9,6 @@
 # ================================================================
 
 import os
-import json
 import time
 import threading
 import logging
@@ -18,6 +17,11 @@ from fastapi import FastAPI
 from fastapi.responses import JSONResponse
 from dotenv import load_dotenv
 
+from modules.alert_journal import AlertJournal
+from modules.goal_hazard import shared_prior
+from modules.scoreline_model import upcoming_fixtures
+from modules.status_registry import StatusRegistry
+
 # ---------------------------------------------------------------
 # 1. Φόρτωση .env
 # ---------------------------------------------------------------
@@ -26,9 +30,14 @@ load_dotenv()
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///matches.db")
 SMARTMONEY_REFRESH = int(os.getenv("SMARTMONEY_REFRESH_INTERVAL", 60))
 GOALMATRIX_REFRESH = int(os.getenv("GOALMATRIX_REFRESH_INTERVAL", 45))
+GOALMATRIX_FIXTURE_DAYS = int(os.getenv("GOALMATRIX_FIXTURE_DAYS", 7))
 DUAL_ENGINE_MODE = os.getenv("DUAL_ENGINE_MODE", "ON")
 SYSTEM_STATUS_FILE = os.getenv("SYSTEM_STATUS_FILE", "data/system_status.json")
 
+ALERT_HISTORY_FILE = os.getenv("ALERT_HISTORY_FILE", "data/alert_history.json")
+ALERT_JOURNAL_DIR = os.getenv("ALERT_JOURNAL_DIR", "data/alerts")
+STATUS_FLUSH_INTERVAL = float(os.getenv("STATUS_FLUSH_INTERVAL", 5))
+
 SMARTMONEY_LOG = os.getenv("SMARTMONEY_LOG_FILE", "logs/smartmoney.log")
 GOALMATRIX_LOG = os.getenv("GOALMATRIX_LOG_FILE", "logs/goalmatrix.log")
 
@@ -46,6 +55,17 @@ logging.basicConfig(
 )
 logger = logging.getLogger("DualEngine")
 
+# Append-only journal· το παλιό alert_history.json εισάγεται μία φορά
+alert_journal = AlertJournal(ALERT_JOURNAL_DIR, legacy_file=ALERT_HISTORY_FILE)
+
+# Κατάσταση engines στη μνήμη· το system_status.json είναι μόνο snapshot
+status_registry = StatusRegistry(SYSTEM_STATUS_FILE, flush_interval=STATUS_FLUSH_INTERVAL)
+
+# Προϋπολογισμένοι πίνακες σκορ (Dixon-Coles) ανά fixture id· ίδιο cache / fit
+# με τα in-play goal hazards (shared_prior), ώστε να γίνεται ένα refit ανά process
+scoreline_prior = shared_prior()
+scorelines = scoreline_prior.cache
+
 # ---------------------------------------------------------------
 # 3. SmartMoney Engine
 # ---------------------------------------------------------------
@@ -69,18 +89,27 @@ def smartmoney_engine():
 # ---------------------------------------------------------------
 # 4. GoalMatrix Engine
 # ---------------------------------------------------------------
+def refresh_scorelines():
+    """Refit (κάθε GOALMATRIX_MODEL_REFIT) + batch πίνακες για τα νέα fixtures"""
+    info = scoreline_prior.maybe_refit(wait=True)
+    if info:
+        logger.info(f"⚽ [GoalMatrix] Model fit: {info['leagues']} λίγκες, {info['teams']} ομάδες (v{info['version']})")
+    fixtures = upcoming_fixtures(GOALMATRIX_FIXTURE_DAYS)
+    added = scorelines.precompute(fixtures)
+    scorelines.retain(fixtures["fixture_id"])
+    return added
+
 def goalmatrix_engine():
-    """Ανάλυση ρυθμού και πιθανότητας επόμενου γκολ"""
+    """Μοντέλο σκορ (Poisson / Dixon-Coles) για τα επερχόμενα fixtures"""
     while True:
         try:
-            logger.info("⚽ [GoalMatrix] Ανάλυση ρυθμού αγώνων...")
-            time.sleep(3)
-            prediction = True  # Placeholder
-            if prediction:
-                msg = f"[GoalMatrix] Πιθανό γκολ εντός 5’ ({datetime.now().strftime('%H:%M:%S')})"
+            logger.info("⚽ [GoalMatrix] Ενημέρωση πινάκων σκορ...")
+            added = refresh_scorelines()
+            if added:
+                msg = f"[GoalMatrix] Scoreline matrices: +{added} fixtures ({len(scorelines)} σύνολο)"
                 logger.info(msg)
                 append_alert("GOALMATRIX", msg)
-                update_status("GoalMatrix", "active")
+            update_status("GoalMatrix", "active")
         except Exception as e:
             logger.error(f"[GoalMatrix] Σφάλμα: {e}")
             update_status("GoalMatrix", "error")
@@ -90,39 +119,16 @@ def goalmatrix_engine():
 # 5. Καταγραφή Κατάστασης & Ειδοποιήσεων
 # ---------------------------------------------------------------
 def update_status(engine_name: str, state: str):
-    """Ενημερώνει το system_status.json"""
+    """Ενημερώνει την κατάσταση στο status registry (snapshot στο system_status.json)"""
     try:
-        os.makedirs(os.path.dirname(SYSTEM_STATUS_FILE), exist_ok=True)
-        data = {}
-        if os.path.exists(SYSTEM_STATUS_FILE):
-            with open(SYSTEM_STATUS_FILE, "r", encoding="utf-8") as f:
-                data = json.load(f)
-        data[engine_name] = {
-            "status": state,
-            "last_update": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
-        with open(SYSTEM_STATUS_FILE, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
+        status_registry.set(engine_name, state)
     except Exception as e:
-        logger.error(f"Σφάλμα ενημέρωσης system_status.json: {e}")
+        logger.error(f"Σφάλμα ενημέρωσης status registry: {e}")
 
 def append_alert(source: str, message: str):
-    """Καταγράφει νέα ειδοποίηση στο alert_history.json"""
+    """Καταγράφει νέα ειδοποίηση στο alert journal (append-only)"""
     try:
-        os.makedirs("data", exist_ok=True)
-        alert_file = os.getenv("ALERT_HISTORY_FILE", "data/alert_history.json")
-        data = []
-        if os.path.exists(alert_file):
-            with open(alert_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
-        entry = {
-            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "source": source,
-            "message": message
-        }
-        data.insert(0, entry)
-        with open(alert_file, "w", encoding="utf-8") as f:
-            json.dump(data[:500], f, indent=4, ensure_ascii=False)
+        alert_journal.append(source, message)
     except Exception as e:
         logger.error(f"Σφάλμα καταγραφής ειδοποίησης: {e}")
 
@@ -135,25 +141,35 @@ app = FastAPI(title="EURO_GOALS Dual Engine API", version="9.1")
 def get_status():
     """Επιστρέφει την τρέχουσα κατάσταση των δύο μηχανών"""
     try:
-        if os.path.exists(SYSTEM_STATUS_FILE):
-            with open(SYSTEM_STATUS_FILE, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            return JSONResponse(content=data)
+        if status_registry:
+            return JSONResponse(content=status_registry.snapshot())
         else:
             return JSONResponse(content={"status": "no data yet"})
     except Exception as e:
         return JSONResponse(content={"error": str(e)})
 
 @app.get("/alerts")
-def get_alerts():
-    """Επιστρέφει το ιστορικό ειδοποιήσεων"""
-    alert_file = os.getenv("ALERT_HISTORY_FILE", "data/alert_history.json")
-    if os.path.exists(alert_file):
-        with open(alert_file, "r", encoding="utf-8") as f:
-            data = json.load(f)
+def get_alerts(limit: int = 500):
+    """Επιστρέφει τις πιο πρόσφατες ειδοποιήσεις (νεότερες πρώτα)"""
+    data = alert_journal.latest(max(1, limit))
+    if data:
         return JSONResponse(content=data)
     return JSONResponse(content={"alerts": []})
 
+@app.get("/goalmatrix/fixture/{fixture_id}")
+def get_fixture_probabilities(fixture_id: str, score: str = None):
+    """O/U, BTTS, 1X2 και correct score ενός fixture από τον προϋπολογισμένο πίνακα"""
+    data = scorelines.probabilities(fixture_id)
+    if data is None:
+        return JSONResponse(status_code=404, content={"error": f"fixture {fixture_id} not in scoreline cache"})
+    if score:
+        try:
+            h, a = (int(x) for x in score.split("-"))
+            data["score"] = {"score": f"{h}-{a}", "p": scorelines.correct_score(fixture_id, h, a)}
+        except ValueError:
+            return JSONResponse(status_code=400, content={"error": "score must look like 2-1"})
+    return JSONResponse(content=data)
+
 # ---------------------------------------------------------------
 # 7. Εκκίνηση Threads
 # ---------------------------------------------------------------
@@ -164,8 +180,10 @@ def start_engines():
 
     logger.info("🚀 Εκκίνηση Dual Data Engine...")
 
+    status_registry.start()
     threading.Thread(target=smartmoney_engine, daemon=True).start()
     threading.Thread(target=goalmatrix_engine, daemon=True).start()
+    threading.Thread(target=alert_journal.compaction_loop, daemon=True).start()
 
     update_status("SmartMoney", "initializing")
     update_status("GoalMatrix", "initializing")
@@ -179,6 +197,10 @@ def on_startup():
     start_engines()
     logger.info("✅ Dual Engine ενεργό και συγχρονισμένο.")
 
+@app.on_event("shutdown")
+def on_shutdown():
+    status_registry.stop()
+
 # ---------------------------------------------------------------
 # 8.5 Dual Engine Health Route
 # ---------------------------------------------------------------
@@ -186,12 +208,10 @@ def on_startup():
 def health_dual():
     """Επιστρέφει συνοπτική εικόνα λειτουργίας SmartMoney + GoalMatrix"""
     try:
-        status_path = os.getenv("SYSTEM_STATUS_FILE", "data/system_status.json")
-        if not os.path.exists(status_path):
-            return {"status": "FAIL", "summary": "No system_status.json found"}
+        if not status_registry:
+            return {"status": "FAIL", "summary": "No engine status reported yet"}
 
-        with open(status_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        data = status_registry.snapshot()
 
         smart_status = data.get("SmartMoney", {}).get("status", "unknown")
         goal_status = data.get("GoalMatrix", {}).get("status", "unknown")
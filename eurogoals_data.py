@@ -3,12 +3,19 @@ import os
 import sys
 import time
 import json
+import queue
 import random
+import asyncio
+import threading
+from concurrent.futures import Future
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 
+import numpy as np
 import pandas as pd
 
+from modules.match_store import MatchStore
+
 # --- Optional JS-capable HTTP client for Flashscore (falls back if not available)
 try:
     from requests_html import HTMLSession
@@ -18,6 +25,8 @@ except Exception:
 
 EXCEL_PATH = r"C:\EURO_GOALS\EURO_GOALS_v6d.xlsx"
 MATCHES_SHEET = "Matches"
+# Parquet store (Season / LeagueCode partitions)· το Excel βγαίνει μόνο με --export-excel
+MATCH_STORE_DIR = os.getenv("MATCH_STORE_DIR", r"C:\EURO_GOALS\match_store")
 
 # Countries & leagues to fetch (Flashscore league paths).
 # We focus on: England (all), Germany 1-3, Greece 1-3, and Europe 1-2 divisions.
@@ -83,97 +92,232 @@ def read_existing_matches(excel_path: str) -> pd.DataFrame:
                 "Odd_H","Odd_D","Odd_A","Odd_Over2_5","Odd_Btts"]
         return pd.DataFrame(columns=cols)
 
-def save_matches(excel_path: str, df_matches: pd.DataFrame) -> None:
-    # Preserve sheet names if they exist by replacing Matches only
-    try:
-        with pd.ExcelWriter(excel_path, engine="openpyxl", mode="a", if_sheet_exists="replace") as writer:
-            df_matches.to_excel(writer, sheet_name=MATCHES_SHEET, index=False)
-        print(f"[OK] Saved {len(df_matches)} total matches to Excel.")
-    except Exception as e:
-        # If the file does not exist yet, create new
-        with pd.ExcelWriter(excel_path, engine="openpyxl") as writer:
-            df_matches.to_excel(writer, sheet_name=MATCHES_SHEET, index=False)
-        print(f"[OK] Created Excel and saved {len(df_matches)} matches. Detail: {e}")
-
 def polite_sleep(a=1.0, b=2.0):
     time.sleep(random.uniform(a, b))
 
 # --- Flashscore scraping (best-effort) -------------------------------------------------------
 
-def fetch_league_week(code: str, info: Dict, days: int = 7) -> pd.DataFrame:
+FIXTURE_COLUMNS = ["Date","Country","LeagueCode","LeagueName","HomeTeam","AwayTeam","HomeGoals","AwayGoals"]
+# Παράλληλοι Chromium renderers (ο καθένας με δικό του HTMLSession / browser)
+RENDER_WORKERS = int(os.getenv("FLASH_RENDER_WORKERS", 3))
+
+class RenderPool:
     """
-    Best-effort fetch of a league for the next `days` from Flashscore.
-    Requires requests_html for JS rendering. If not present, returns empty and warns.
+    Μικρό pool από render workers. Κάθε worker thread έχει δικό του event loop και
+    HTMLSession (ένας Chromium ανά worker, επαναχρησιμοποιείται ανάμεσα σε leagues).
+    submit(url, parse) → Future με το parse(r.html) μετά το render.
     """
-    if not JS_ENABLED:
-        print(f"[WARN] requests_html not installed; skip Flashscore for {code} ({info['name']}).")
-        return pd.DataFrame(columns=["Date","Country","LeagueCode","LeagueName","HomeTeam","AwayTeam","HomeGoals","AwayGoals"])
 
-    session = HTMLSession()
-    headers = {"User-Agent": USER_AGENT, "Accept-Language": "en-US,en;q=0.9"}
-
-    all_rows = []
-    today = datetime.now().date()
-    for offset in range(0, days+1):
-        d = today + timedelta(days=offset)
-        # League fixtures page
-        url = BASE + info["path"] + "fixtures/"
+    def __init__(self, workers: int = RENDER_WORKERS, render_timeout: int = 30, render_sleep: int = 2):
+        self.render_timeout = render_timeout
+        self.render_sleep = render_sleep
+        self._tasks = queue.Queue()
+        self._threads = [threading.Thread(target=self._worker, name=f"render-{i}", daemon=True)
+                         for i in range(max(1, int(workers)))]
+        for t in self._threads:
+            t.start()
+
+    @staticmethod
+    def _open_session():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        session = HTMLSession()
+        session.loop = loop
         try:
-            r = session.get(url, headers=headers, timeout=20)
-            # Render JS to populate matches
-            r.html.render(timeout=30, sleep=2)
+            # Εκτός main thread το pyppeteer δεν μπορεί να βάλει signal handlers
+            import pyppeteer
+            session._browser = loop.run_until_complete(pyppeteer.launch(
+                headless=True, args=["--no-sandbox"],
+                handleSIGINT=False, handleSIGTERM=False, handleSIGHUP=False))
         except Exception as e:
-            print(f"[WARN] Render failed for {code} {info['name']}: {e}")
-            continue
-
-        try:
-            # Flashscore typically groups matches by day in blocks with class 'event__day'
-            date_blocks = r.html.find("div.event__day")
-
-            # Build human-readable date as shown on the site (approx)
-            active_date_str = d.strftime("%d %b %Y").lower()  # e.g., '11 Oct 2025'
-
-            for block in date_blocks:
-                header = block.find("div.event__title--name", first=True)
-                if header:
-                    if active_date_str not in header.text.lower():
-                        continue  # skip other dates
-
-                matches = block.find("div.event__match")
-                for m in matches:
-                    home = m.find("div.event__participant--home", first=True)
-                    away = m.find("div.event__participant--away", first=True)
-                    hg_el = m.find("div.event__score--home", first=True)
-                    ag_el = m.find("div.event__score--away", first=True)
-
-                    home_team = home.text.strip() if home else ""
-                    away_team = away.text.strip() if away else ""
-                    hg = int(hg_el.text.strip()) if (hg_el and hg_el.text.strip().isdigit()) else None
-                    ag = int(ag_el.text.strip()) if (ag_el and ag_el.text.strip().isdigit()) else None
-
-                    if not home_team or not away_team:
-                        continue
-
-                    all_rows.append({
-                        "Date": d.strftime("%Y-%m-%d"),
-                        "Country": info["country"],
-                        "LeagueCode": code,
-                        "LeagueName": info["name"],
-                        "HomeTeam": home_team,
-                        "AwayTeam": away_team,
-                        "HomeGoals": hg,
-                        "AwayGoals": ag,
-                    })
+            print(f"[WARN] Could not pre-launch Chromium for render worker: {e}")
+        return session
+
+    def _worker(self):
+        session = None
+        headers = {"User-Agent": USER_AGENT, "Accept-Language": "en-US,en;q=0.9"}
+        while True:
+            task = self._tasks.get()
+            if task is None:
+                break
+            url, parse, fut = task
+            if not fut.set_running_or_notify_cancel():
+                continue
+            try:
+                session = session or self._open_session()
+                r = session.get(url, headers=headers, timeout=20)
+                r.html.render(timeout=self.render_timeout, sleep=self.render_sleep)
+                fut.set_result(parse(r.html))
+            except Exception as e:
+                fut.set_exception(e)
             polite_sleep(1.0, 2.0)
-        except Exception as e:
-            print(f"[WARN] Parse failed for {code} {info['name']} on {d}: {e}")
+        if session is not None:
+            try:
+                session.close()
+            except Exception:
+                pass
+
+    def submit(self, url: str, parse):
+        fut = Future()
+        self._tasks.put((url, parse, fut))
+        return fut
+
+    def close(self):
+        for _ in self._threads:
+            self._tasks.put(None)
+        for t in self._threads:
+            t.join(timeout=60)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def parse_fixtures(html, code: str, info: Dict, days: int = 7) -> List[Dict]:
+    """
+    Ένα πέρασμα στη rendered σελίδα fixtures/: κρατά τα day blocks που πέφτουν
+    μέσα στο παράθυρο [σήμερα, σήμερα + days].
+    """
+    today = datetime.now().date()
+    # Human-readable date όπως στο site (approx), π.χ. '11 oct 2025'
+    window = {(today + timedelta(days=o)).strftime("%d %b %Y").lower(): today + timedelta(days=o)
+              for o in range(0, days + 1)}
+
+    rows = []
+    # Flashscore typically groups matches by day in blocks with class 'event__day'
+    for block in html.find("div.event__day"):
+        header = block.find("div.event__title--name", first=True)
+        if not header:
             continue
+        text = header.text.lower()
+        d = next((day for label, day in window.items() if label in text), None)
+        if d is None:
+            continue  # εκτός παραθύρου
+
+        for m in block.find("div.event__match"):
+            home = m.find("div.event__participant--home", first=True)
+            away = m.find("div.event__participant--away", first=True)
+            hg_el = m.find("div.event__score--home", first=True)
+            ag_el = m.find("div.event__score--away", first=True)
+
+            home_team = home.text.strip() if home else ""
+            away_team = away.text.strip() if away else ""
+            hg = int(hg_el.text.strip()) if (hg_el and hg_el.text.strip().isdigit()) else None
+            ag = int(ag_el.text.strip()) if (ag_el and ag_el.text.strip().isdigit()) else None
+
+            if not home_team or not away_team:
+                continue
+
+            rows.append({
+                "Date": d.strftime("%Y-%m-%d"),
+                "Country": info["country"],
+                "LeagueCode": code,
+                "LeagueName": info["name"],
+                "HomeTeam": home_team,
+                "AwayTeam": away_team,
+                "HomeGoals": hg,
+                "AwayGoals": ag,
+            })
+    return rows
+
+def fetch_league_week(code: str, info: Dict, days: int = 7, pool: Optional[RenderPool] = None) -> pd.DataFrame:
+    """
+    Best-effort fetch of a league for the next `days` from Flashscore.
+    Ένα render της σελίδας fixtures/ ανά league (όχι ένα ανά ημέρα).
+    Requires requests_html for JS rendering. If not present, returns empty and warns.
+    """
+    if not JS_ENABLED:
+        print(f"[WARN] requests_html not installed; skip Flashscore for {code} ({info['name']}).")
+        return pd.DataFrame(columns=FIXTURE_COLUMNS)
+
+    own_pool = pool is None
+    pool = pool or RenderPool(workers=1)
+    try:
+        rows = pool.submit(BASE + info["path"] + "fixtures/",
+                           lambda html: parse_fixtures(html, code, info, days)).result()
+    except Exception as e:
+        print(f"[WARN] Render/parse failed for {code} {info['name']}: {e}")
+        rows = []
+    finally:
+        if own_pool:
+            pool.close()
+    return pd.DataFrame(rows, columns=FIXTURE_COLUMNS)
+
+def fetch_all_leagues(leagues: Dict[str, Dict], days: int = 7, workers: int = RENDER_WORKERS) -> List[pd.DataFrame]:
+    """Όλα τα leagues μέσα από κοινό RenderPool (bounded parallelism)."""
+    frames = []
+    with RenderPool(workers=workers) as pool:
+        futures = {code: pool.submit(BASE + info["path"] + "fixtures/",
+                                     lambda html, code=code, info=info: parse_fixtures(html, code, info, days))
+                   for code, info in leagues.items()}
+        for code, fut in futures.items():
+            info = leagues[code]
+            try:
+                df = pd.DataFrame(fut.result(), columns=FIXTURE_COLUMNS)
+            except Exception as e:
+                print(f"[WARN] Render/parse failed for {code} {info['name']}: {e}")
+                continue
+            print(f"[OK] {code} — {info['country']} / {info['name']}: fetched {len(df)} rows.")
+            if not df.empty:
+                frames.append(df)
+    return frames
+
+# Output schema του Matches sheet (σταθερά dtypes ανεξάρτητα από το input)
+MATCH_COLUMNS = ["Date","Season","Country","LeagueCode","LeagueName","HomeTeam","AwayTeam",
+                 "HomeGoals","AwayGoals","BTTS","Over1_5","Over2_5","Over3_5",
+                 "Odd_H","Odd_D","Odd_A","Odd_Over2_5","Odd_Btts"]
+FLAG_COLUMNS = ["BTTS","Over1_5","Over2_5","Over3_5"]
+ODDS_COLUMNS = ["Odd_H","Odd_D","Odd_A","Odd_Over2_5","Odd_Btts"]
+MATCH_DTYPES = {
+    **{c: "string" for c in ["Date","Season","Country","LeagueCode","LeagueName","HomeTeam","AwayTeam"]},
+    "HomeGoals": "Int64", "AwayGoals": "Int64",
+    **{c: "Int8" for c in FLAG_COLUMNS},
+    **{c: "Float64" for c in ODDS_COLUMNS},
+}
 
-    return pd.DataFrame(all_rows)
+def derive_flags(home_goals: pd.Series, away_goals: pd.Series) -> pd.DataFrame:
+    """BTTS / Over1_5 / Over2_5 / Over3_5 column-wise (NA όπου λείπει κάποιο σκορ)."""
+    hg = pd.to_numeric(home_goals, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+    ag = pd.to_numeric(away_goals, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+    missing = np.isnan(hg) | np.isnan(ag)
+    total = np.trunc(hg) + np.trunc(ag)
+    out = {}
+    for col, values in (("BTTS", (hg > 0) & (ag > 0)), ("Over1_5", total >= 2),
+                        ("Over2_5", total >= 3), ("Over3_5", total >= 4)):
+        out[col] = pd.arrays.IntegerArray(values.astype("int8"), missing)
+    return pd.DataFrame(out, index=home_goals.index)
+
+def parse_dates(values: pd.Series) -> pd.Series:
+    """Ένα vectorized parse· μόνο ό,τι δεν ταιριάζει στο κοινό format ξαναδοκιμάζεται ένα-ένα."""
+    dates = pd.to_datetime(values, errors="coerce")
+    retry = dates.isna() & values.notna()
+    if retry.any():
+        dates[retry] = pd.to_datetime(values[retry].astype(str), errors="coerce", format="mixed")
+    return dates
+
+def iso_dates(values: pd.Series) -> pd.Series:
+    """Date ως 'YYYY-MM-DD' string είτε ήρθε ως string (Flashscore) είτε ως Timestamp (Excel)."""
+    dates = parse_dates(values)
+    return dates.dt.strftime("%Y-%m-%d").astype("string").fillna(values.astype("string"))
+
+def season_from_dates(dates: pd.Series) -> pd.Series:
+    """Σεζόν Ιουλίου–Ιουνίου ως 'YYYY-YY' (π.χ. 2025-08-01 → '2025-26')."""
+    start = (dates.dt.year - (dates.dt.month < 7)).astype("Int64")
+    season = start.astype("string") + "-" + ((start + 1) % 100).astype("string").str.zfill(2)
+    return season.astype("string")
 
 def dedupe_merge(existing: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+    # Αντίγραφα: τα frames του caller δεν αλλάζουν
+    existing = existing.copy() if existing is not None else None
+    new = new.copy()
+    # Ενιαία μορφή Date ώστε το key να ταιριάζει ανάμεσα σε Excel και νέα δεδομένα
+    for df in (existing, new):
+        if df is not None and "Date" in df.columns:
+            df["Date"] = iso_dates(df["Date"])
+
     if existing is None or existing.empty:
-        base = new.copy()
+        base = new
     else:
         # Uniqueness key
         key_cols = ["Date","LeagueCode","HomeTeam","AwayTeam"]
@@ -184,86 +328,81 @@ def dedupe_merge(existing: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
                 new[col] = ""
 
         base = pd.concat([existing, new], ignore_index=True)
-        base.sort_values(by=["Date","LeagueCode"], inplace=True)
+        # stable sort ώστε το keep="last" να κρατά πάντα τη νεότερη εγγραφή
+        base.sort_values(by=["Date","LeagueCode"], inplace=True, kind="stable")
         base.drop_duplicates(subset=key_cols, keep="last", inplace=True)
 
-    # Normalize numeric
+    for col in MATCH_COLUMNS:
+        if col not in base.columns:
+            base[col] = None
+
+    # Normalize numeric (μη αριθμητικά κελιά, π.χ. '-', γίνονται NA αντί να σπάσουν το cast)
     for gcol in ["HomeGoals","AwayGoals"]:
-        if gcol in base.columns:
-            base[gcol] = pd.to_numeric(base[gcol], errors="coerce")
+        base[gcol] = np.trunc(pd.to_numeric(base[gcol], errors="coerce"))
+    for ocol in ODDS_COLUMNS:
+        base[ocol] = pd.to_numeric(base[ocol], errors="coerce")
 
     # Derive flags
-    def calc_flags(row):
-        hg = row.get("HomeGoals", None)
-        ag = row.get("AwayGoals", None)
-        if pd.isna(hg) or pd.isna(ag):
-            return pd.Series({"BTTS": None, "Over1_5": None, "Over2_5": None, "Over3_5": None})
-        total = int(hg) + int(ag)
-        return pd.Series({
-            "BTTS": 1 if (hg > 0 and ag > 0) else 0,
-            "Over1_5": 1 if total >= 2 else 0,
-            "Over2_5": 1 if total >= 3 else 0,
-            "Over3_5": 1 if total >= 4 else 0,
-        })
-
-    flags = base.apply(calc_flags, axis=1)
-    for col in ["BTTS","Over1_5","Over2_5","Over3_5"]:
+    flags = derive_flags(base["HomeGoals"], base["AwayGoals"])
+    for col in FLAG_COLUMNS:
         base[col] = flags[col]
 
-    # Ensure odds columns exist
-    for col in ["Odd_H","Odd_D","Odd_A","Odd_Over2_5","Odd_Btts"]:
-        if col not in base.columns:
-            base[col] = None
-
-    # Season guess
-    if "Season" not in base.columns:
-        base["Season"] = None
-    def season_of(dstr):
-        try:
-            d = pd.to_datetime(dstr).date()
-            yr = d.year
-            if d.month >= 7:
-                return f"{yr}-{str(yr+1)[-2:]}"
-            else:
-                return f"{yr-1}-{str(yr)[-2:]}"
-        except Exception:
-            return None
-    base["Season"] = base["Season"].fillna(base["Date"].apply(season_of))
-
-    # Order columns
-    required_cols = ["Date","Season","Country","LeagueCode","LeagueName","HomeTeam","AwayTeam",
-                     "HomeGoals","AwayGoals","BTTS","Over1_5","Over2_5","Over3_5",
-                     "Odd_H","Odd_D","Odd_A","Odd_Over2_5","Odd_Btts"]
-    for col in required_cols:
-        if col not in base.columns:
-            base[col] = None
-    base = base[required_cols]
-    return base
+    # Season guess (μόνο όπου λείπει)
+    season = base["Season"].astype("string")
+    if season.isna().any():
+        season = season.fillna(season_from_dates(parse_dates(base["Date"])))
+    base["Season"] = season
+
+    # Order columns + σταθερά dtypes
+    base = base[MATCH_COLUMNS]
+    return base.astype(MATCH_DTYPES)
+
+def open_store() -> MatchStore:
+    """Ανοίγει το match store· την πρώτη φορά μεταφέρει εκεί το υπάρχον Matches sheet."""
+    store = MatchStore(MATCH_STORE_DIR, MATCH_DTYPES)
+    if not store.partitions() and os.path.exists(EXCEL_PATH):
+        existing = read_existing_matches(EXCEL_PATH)
+        if not existing.empty:
+            store.append(dedupe_merge(None, existing))
+            store.compact()
+            print(f"[OK] Migrated {len(existing)} matches from Excel to {MATCH_STORE_DIR}.")
+    return store
+
+def main(argv: Optional[List[str]] = None):
+    argv = sys.argv[1:] if argv is None else argv
+    export_excel = "--export-excel" in argv or "--export-only" in argv
 
-def main():
     print("[INFO] EURO_GOALS v6d_auto — Flashscore weekly updater")
-    print(f"[INFO] Excel path: {EXCEL_PATH}")
+    print(f"[INFO] Match store: {MATCH_STORE_DIR}")
+    store = open_store()
+
+    if "--export-only" in argv:
+        n = store.export_excel(EXCEL_PATH, MATCHES_SHEET)
+        print(f"[OK] Exported {n} matches to {EXCEL_PATH}.")
+        return
+
     if not JS_ENABLED:
         print("[WARN] 'requests_html' not installed. Install first:  pip install requests-html  ")
         print("[WARN] Skipping Flashscore fetching. Exiting.")
         sys.exit(1)
 
-    existing = read_existing_matches(EXCEL_PATH)
-
-    collected = []
-    for code, info in FLASH_LEAGUES.items():
-        print(f"[FETCH] {code} — {info['country']} / {info['name']}")
-        df = fetch_league_week(code, info, days=7)
-        print(f"[OK] {code}: fetched {len(df)} rows.")
-        if not df.empty:
-            collected.append(df)
+    print(f"[FETCH] {len(FLASH_LEAGUES)} leagues, {RENDER_WORKERS} render workers")
+    collected = fetch_all_leagues(FLASH_LEAGUES, days=7)
     if not collected:
         print("[WARN] No data collected from Flashscore.")
         sys.exit(0)
 
     new_all = pd.concat(collected, ignore_index=True)
-    merged = dedupe_merge(existing, new_all)
-    save_matches(EXCEL_PATH, merged)
+    # Μόνο το delta της εβδομάδας: το key index του store κρατά inserts / πραγματικά updates
+    batch = dedupe_merge(None, new_all)
+    touched = store.append(batch)
+    store.compact()
+    stats = store.last_append
+    print(f"[OK] {stats['inserted']} new, {stats['updated']} updated, {stats['unchanged']} unchanged "
+          f"matches ({len(touched)} partitions rewritten).")
+    if export_excel:
+        n = store.export_excel(EXCEL_PATH, MATCHES_SHEET)
+        print(f"[OK] Exported {n} matches to {EXCEL_PATH}.")
     print("[DONE] Update complete.")
 
 if __name__ == "__main__":
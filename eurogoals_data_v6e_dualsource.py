@@ -8,9 +8,13 @@ from typing import Dict, List, Optional
 
 import pandas as pd
 
+from eurogoals_data import MATCH_DTYPES, dedupe_merge
+from modules.match_store import MatchStore
+
 LOG_PATH = "log_dualsource.txt"
 EXCEL_PATH = r"C:\Users\pierr\Desktop\EURO_GOALS\EURO_GOALS_v6d.xlsx"
 SHEET = "Matches"
+MATCH_STORE_DIR = os.getenv("MATCH_STORE_DIR", r"C:\Users\pierr\Desktop\EURO_GOALS\match_store")
 
 FS_LEAGUES = {
     "ENG1":{"country":"England","name":"Premier League","path":"/football/england/premier-league/"},
@@ -235,17 +239,14 @@ def unify(df: pd.DataFrame) -> pd.DataFrame:
             "Odd_H","Odd_D","Odd_A","Odd_Over2_5","Odd_Btts"]
     return df[cols]
 
-def merge_into(existing: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
-    if existing is None or existing.empty:
-        return new.copy()
-    key = ["Date","LeagueCode","HomeTeam","AwayTeam"]
-    both = pd.concat([existing, new], ignore_index=True)
-    both.drop_duplicates(subset=key, keep="last", inplace=True)
-    return both
-
 def main():
     print("[INFO] EURO_GOALS v6e_dualsource — start (FS + SS, 7 days)")
-    existing = read_existing()
+    store = MatchStore(MATCH_STORE_DIR, MATCH_DTYPES)
+    if not store.partitions():
+        existing = read_existing()  # μία φορά: μετάπτωση του Excel στο store
+        if not existing.empty:
+            store.append(dedupe_merge(None, existing))
+            store.compact()
     frames = []
 
     # Flashscore sweep
@@ -267,8 +268,12 @@ def main():
         sys.exit(0)
 
     unified = unify(pd.concat(frames, ignore_index=True))
-    merged = merge_into(existing, unified)
-    save_excel(merged)
+    store.append(unified)
+    store.compact()
+    stats = store.last_append
+    log(f"[OK] {stats['inserted']} new, {stats['updated']} updated, {stats['unchanged']} unchanged rows.")
+    if "--export-excel" in sys.argv[1:]:
+        save_excel(store.read())
     print("[DONE] v6e_dualsource update complete.")
 
 if __name__ == "__main__":
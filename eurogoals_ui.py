@@ -1,4 +1,5 @@
 
+import json
 import os
 import subprocess
 from datetime import datetime
@@ -15,49 +16,56 @@ def get_live_odds(bundle: str = "europe_1_2"):
     """
     Διαβάζει live αποδόσεις από το Render API (TheOddsAPI)
     Π.χ. bundles: england_all, greece_1_2_3, germany_1_2_3, europe_1_2
+    Με ?stream=1 ο server στέλνει NDJSON ανά πρωτάθλημα, οπότε η πρόοδος
+    εμφανίζεται σταδιακά· παλιός server (σκέτο JSON) υποστηρίζεται κανονικά.
     """
     try:
         url = f"https://euro-goals.onrender.com/odds_bundle/{bundle}"
-        response = requests.get(url, timeout=10)
-        if response.status_code == 200:
-            data = response.json()
-            st.success(f"✅ Φορτώθηκαν {data.get('count', 0)} αγώνες από {bundle}")
-            return data
+        with requests.get(url, params={"stream": 1}, timeout=(5, 30), stream=True) as response:
+            if response.status_code != 200:
+                st.warning(f"⚠️ Σφάλμα {response.status_code} από {url}")
+                return None
+            if "ndjson" not in response.headers.get("content-type", ""):
+                data = response.json()
+            else:
+                data = _read_bundle_stream(response, bundle)
+        msg = f"✅ Φορτώθηκαν {data.get('count', 0)} αγώνες από {bundle}"
+        if data.get("partial"):
+            st.warning(f"{msg} (χωρίς: {', '.join(data.get('missing', []))})")
         else:
-            st.warning(f"⚠️ Σφάλμα {response.status_code} από {url}")
-            return None
+            st.success(msg)
+        return data
     except Exception as e:
         st.error(f"❌ Σφάλμα κατά τη λήψη αποδόσεων: {e}")
         return None
 
 
-EXCEL_PATH = r"C:\EURO_GOALS\EURO_GOALS_v6d.xlsx"
-MATCHES_SHEET = "Matches"
+def _read_bundle_stream(response, bundle):
+    """Συνθέτει το αποτέλεσμα από τα NDJSON events, ανανεώνοντας την πρόοδο ανά πρωτάθλημα."""
+    progress = st.empty()
+    data = {"count": 0, "events": [], "missing": [], "partial": False}
+    total, loaded = 0, 0
+    for line in response.iter_lines(decode_unicode=True):
+        if not line:
+            continue
+        event = json.loads(line)
+        if event["type"] == "start":
+            total = len(event.get("leagues", []))
+        elif event["type"] == "league":
+            loaded += 1
+            data["events"].extend(event.get("events", []))
+            data["count"] += event.get("count", 0)
+            progress.info(f"⏳ {bundle}: {loaded}/{total} πρωταθλήματα – {data['count']} αγώνες")
+        elif event["type"] == "done":
+            data["missing"] = event.get("missing", [])
+            data["partial"] = event.get("partial", False)
+    progress.empty()
+    return data
 
-# =======================================
-# LIVE ODDS API (Render integration)
-# =======================================
-import requests
-
-def get_live_odds(bundle: str = "europe_1_2"):
-    """
-    Διαβάζει live αποδόσεις από το Render API (TheOddsAPI)
-    Π.χ. bundles: england_all, greece_1_2_3, germany_1_2_3, europe_1_2
-    """
-    try:
-        url = f"https://euro-goals.onrender.com/odds_bundle/{bundle}"
-        response = requests.get(url, timeout=10)
-        if response.status_code == 200:
-            data = response.json()
-            st.success(f"✅ Φορτώθηκαν {data.get('count', 0)} αγώνες από {bundle}")
-            return data
-        else:
-            st.warning(f"⚠️ Σφάλμα {response.status_code} από {url}")
-            return None
-    except Exception as e:
-        st.error(f"❌ Σφάλμα κατά τη λήψη αποδόσεων: {e}")
-        return None
 
+EXCEL_PATH = r"C:\EURO_GOALS\EURO_GOALS_v6d.xlsx"
+MATCHES_SHEET = "Matches"
+MATCH_STORE_DIR = os.getenv("MATCH_STORE_DIR", r"C:\EURO_GOALS\match_store")
 
 # --- Streamlit page config (dark mode friendly) ---
 st.set_page_config(
@@ -115,6 +123,17 @@ with st.sidebar:
 
 # --- Load matches ---
 def load_matches():
+    # Κύρια πηγή: Parquet match store· το Excel μόνο αν δεν έχει γίνει ακόμη η μετάπτωση
+    if os.path.isdir(MATCH_STORE_DIR):
+        try:
+            from eurogoals_data import MATCH_DTYPES
+            from modules.match_store import MatchStore
+            df = MatchStore(MATCH_STORE_DIR, MATCH_DTYPES).read()
+            if not df.empty:
+                df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
+                return df
+        except Exception as e:
+            st.warning(f"Σφάλμα ανάγνωσης match store ({e}) – χρήση Excel.")
     if not os.path.exists(EXCEL_PATH):
         st.warning("Δεν βρέθηκε το Excel. Βεβαιώσου ότι υπάρχει στο C:\\EURO_GOALS\\")
         return pd.DataFrame()
@@ -150,9 +169,9 @@ if not view.empty:
     if date_to:
         view = view[view["Date"] <= pd.to_datetime(date_to)]
     if btts_only:
-        view = view[view["BTTS"] == 1]
+        view = view[view["BTTS"].eq(1).fillna(False)]
     if over25_only:
-        view = view[view["Over2_5"] == 1]
+        view = view[view["Over2_5"].eq(1).fillna(False)]
 
 # --- Main layout ---
 col_left, col_right = st.columns([3, 2])
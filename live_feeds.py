@@ -7,6 +7,7 @@
 
 import requests
 import json
+import threading
 import time
 from datetime import datetime
 from sqlalchemy import create_engine, text
@@ -21,6 +22,13 @@ engine = create_engine(
     connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
 )
 
+# Γραμμές ανά multi-row INSERT (7 params/γραμμή → κάτω από το όριο μεταβλητών του SQLite)
+UPSERT_CHUNK = 500
+
+# match_id -> (score, status) όπως γράφτηκε τελευταία φορά στη βάση
+_last_seen: dict[str, tuple[str, str]] = {}
+_last_seen_lock = threading.Lock()
+
 # ----------------------------------------------
 # Helper: Λήψη δεδομένων με User-Agent
 # ----------------------------------------------
@@ -63,36 +71,66 @@ def update_sofascore_data():
     print(f"[LIVE_FEEDS] ✅ Λήφθηκαν {len(events)} αγώνες από Sofascore.")
 
     try:
-        with engine.begin() as conn:
-            for e in events:
-                match_id = f"sofa_{e['id']}"
-                home = e["homeTeam"]["name"]
-                away = e["awayTeam"]["name"]
-                score_home = e.get("homeScore", {}).get("current", 0)
-                score_away = e.get("awayScore", {}).get("current", 0)
-                score = f"{score_home}-{score_away}"
-                status = e["status"]["type"]
-                updated_at = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
-
-                conn.execute(text("""
-                    INSERT INTO matches (match_id, home, away, score, status, source, updated_at)
-                    VALUES (:match_id, :home, :away, :score, :status, 'Sofascore', :updated_at)
-                    ON CONFLICT(match_id) DO UPDATE SET
-                        score=:score,
-                        status=:status,
-                        updated_at=:updated_at
-                """), {
-                    "match_id": match_id,
-                    "home": home,
-                    "away": away,
-                    "score": score,
-                    "status": status,
-                    "updated_at": updated_at
-                })
-        print("[LIVE_FEEDS] 🟢 Sofascore database updated.")
+        written = write_sofascore_events(events)
+        print(f"[LIVE_FEEDS] 🟢 Sofascore database updated ({written} αλλαγές / {len(events)} αγώνες).")
     except Exception as e:
         print(f"[LIVE_FEEDS] ❌ Σφάλμα ενημέρωσης Sofascore DB: {e}")
 
+def _sofascore_row(e, updated_at):
+    score_home = e.get("homeScore", {}).get("current", 0)
+    score_away = e.get("awayScore", {}).get("current", 0)
+    return {
+        "match_id": f"sofa_{e['id']}",
+        "home": e["homeTeam"]["name"],
+        "away": e["awayTeam"]["name"],
+        "score": f"{score_home}-{score_away}",
+        "status": e["status"]["type"],
+        "updated_at": updated_at,
+    }
+
+def _upsert_matches(conn, rows):
+    """Ένα multi-row INSERT ... ON CONFLICT ανά UPSERT_CHUNK γραμμές."""
+    for i in range(0, len(rows), UPSERT_CHUNK):
+        chunk = rows[i:i + UPSERT_CHUNK]
+        values, params = [], {}
+        for j, r in enumerate(chunk):
+            values.append(f"(:match_id{j}, :home{j}, :away{j}, :score{j}, :status{j}, 'Sofascore', :updated_at{j})")
+            params.update({f"{k}{j}": v for k, v in r.items()})
+        conn.execute(text(f"""
+            INSERT INTO matches (match_id, home, away, score, status, source, updated_at)
+            VALUES {", ".join(values)}
+            ON CONFLICT(match_id) DO UPDATE SET
+                score=excluded.score,
+                status=excluded.status,
+                updated_at=excluded.updated_at
+        """), params)
+
+def write_sofascore_events(events):
+    """
+    Γράφει μόνο τα events των οποίων άλλαξε το (score, status) από την
+    τελευταία επιτυχή εγγραφή, με ένα batched upsert ανά poll.
+    Επιστρέφει πόσες γραμμές γράφτηκαν.
+    """
+    updated_at = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+    # Ένα row ανά match_id (διπλό key στο ίδιο INSERT σπάει το ON CONFLICT στο Postgres)
+    rows = list({r["match_id"]: r for r in (_sofascore_row(e, updated_at) for e in events)}.values())
+
+    with _last_seen_lock:
+        changed = [r for r in rows if _last_seen.get(r["match_id"]) != (r["score"], r["status"])]
+        if changed:
+            with engine.begin() as conn:
+                _upsert_matches(conn, changed)
+        # Μόνο μετά το commit· κρατάμε μόνο τα τρέχοντα live ώστε το digest να μη μεγαλώνει
+        current = {r["match_id"]: (r["score"], r["status"]) for r in rows}
+        _last_seen.clear()
+        _last_seen.update(current)
+    return len(changed)
+
+def reset_sofascore_digest():
+    """Ξεχνά το last-seen digest (π.χ. μετά από reset της βάσης) ώστε το επόμενο poll να γράψει τα πάντα."""
+    with _last_seen_lock:
+        _last_seen.clear()
+
 # ----------------------------------------------
 # Flashscore Feed (προαιρετικό / placeholder)
 # ----------------------------------------------
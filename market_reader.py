@@ -5,26 +5,80 @@
 
 from datetime import datetime
 from betfair_client import BetfairClient
+from modules.betfair_market_cache import LocalDeltaFeed, MarketCache
+import os
 import random
+import threading
+
+# Markets ανά κύκλο· το list_market_book τα σπάει σε weighted chunks
+BETFAIR_MAX_MARKETS = int(os.getenv("BETFAIR_MAX_MARKETS", 200))
+
+# Delta feed: "off" = polling snapshots, "local" = τοπικός stand-in του Exchange Stream
+BETFAIR_STREAM = os.getenv("BETFAIR_STREAM", "off").lower()
+BETFAIR_STREAM_PRUNE = int(os.getenv("BETFAIR_STREAM_PRUNE", 6 * 3600))
 
 MARKET_CACHE = {
     "last_update": None,
     "markets": []
 }
 
+_client = None
+_client_lock = threading.Lock()
+
+# Incremental cache (ladders ανά runner) που ενημερώνεται in place από το delta feed
+MARKET_STREAM = MarketCache()
+_stream_thread = None
+
+def _get_client() -> BetfairClient:
+    """Ένας client ανά process ώστε να ξαναχρησιμοποιείται το connection pool."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = BetfairClient()
+        return _client
+
+def _consume_stream(feed):
+    applied = 0
+    for msg in feed:
+        MARKET_STREAM.apply(msg)
+        applied += 1
+        if applied % 1000 == 0:
+            MARKET_STREAM.prune(BETFAIR_STREAM_PRUNE)
+
+def start_market_stream(feed=None):
+    """
+    Ξεκινά (μία φορά) thread που εφαρμόζει τα mcm μηνύματα του feed στο MARKET_STREAM.
+    feed: iterable από mcm dicts· default ο LocalDeltaFeed.
+    """
+    global _stream_thread
+    with _client_lock:
+        if _stream_thread is None or not _stream_thread.is_alive():
+            feed = feed if feed is not None else LocalDeltaFeed(markets=BETFAIR_MAX_MARKETS, interval=0.5)
+            _stream_thread = threading.Thread(target=_consume_stream, args=(feed,), name="BetfairStream", daemon=True)
+            _stream_thread.start()
+    return _stream_thread
+
 def get_market_data():
     """
     Προσπαθεί να αντλήσει live markets από Betfair Exchange.
+    Με ενεργό delta feed διαβάζει snapshot από το incremental cache (χωρίς refetch).
     Αν δεν υπάρχουν credentials ή αποτύχει το API, γυρίζει mock δεδομένα.
     """
+    if BETFAIR_STREAM == "local":
+        start_market_stream()
+    if MARKET_STREAM:
+        MARKET_CACHE["last_update"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        MARKET_CACHE["markets"] = MARKET_STREAM.rows()
+        return MARKET_CACHE
+
     try:
-        bf = BetfairClient()
+        bf = _get_client()
         if not bf.is_configured():
             print("[MARKET READER] ⚠️ Betfair keys not found – using mock data.")
             return _generate_mock()
 
         print("[MARKET READER] 🔍 Fetching live Betfair markets...")
-        data = bf.get_match_odds_snapshot(max_results=6)
+        data = bf.get_match_odds_snapshot(max_results=BETFAIR_MAX_MARKETS)
 
         if not data:
             print("[MARKET READER] ⚠️ Empty response – fallback to mock.")
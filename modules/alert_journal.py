@@ -0,0 +1,174 @@
+# ============================================================
+# modules/alert_journal.py
+# Append-only alert journal (JSONL segments) + in-memory tail
+# ============================================================
+# - Κάθε alert γράφεται ως μία γραμμή JSON στο ενεργό segment
+#   (O(1) I/O ανά alert αντί για rewrite όλου του αρχείου)
+# - Rotation όταν το segment ξεπεράσει segment_max_bytes
+# - Τα τελευταία tail_size alerts μένουν στη μνήμη για το /alerts
+# - compact(): κρατά τα τελευταία `retain` alerts και ενώνει τα
+#   κλειστά segments σε ένα
+# ============================================================
+
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from itertools import islice
+
+_SEGMENT_RE = re.compile(r"^alerts_(\d{6})\.jsonl$")
+
+
+class AlertJournal:
+    def __init__(self, directory, segment_max_bytes: int = 1_000_000, tail_size: int = 500,
+                 retain: int = 5_000, legacy_file=None):
+        self.directory = str(directory)
+        self.segment_max_bytes = int(segment_max_bytes)
+        self.retain = int(retain)
+        self._lock = threading.Lock()
+        self._tail = deque(maxlen=max(1, int(tail_size)))
+        os.makedirs(self.directory, exist_ok=True)
+        if legacy_file and not self._segments():
+            self._import_legacy(legacy_file)
+        self._load_tail()
+
+    # -------- segments --------
+    def _segments(self):
+        seqs = []
+        for name in os.listdir(self.directory):
+            m = _SEGMENT_RE.match(name)
+            if m:
+                seqs.append(int(m.group(1)))
+        return sorted(seqs)
+
+    def _path(self, seq):
+        return os.path.join(self.directory, f"alerts_{seq:06d}.jsonl")
+
+    def _active(self):
+        segs = self._segments()
+        seq = segs[-1] if segs else 1
+        path = self._path(seq)
+        if os.path.exists(path) and os.path.getsize(path) >= self.segment_max_bytes:
+            path = self._path(seq + 1)
+        return path
+
+    @staticmethod
+    def _read(path):
+        out = []
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        out.append(json.loads(line))
+                    except ValueError:
+                        pass  # μισογραμμένη γραμμή από crash
+        except FileNotFoundError:
+            pass
+        return out
+
+    def _import_legacy(self, legacy_file):
+        """Μεταφέρει μία φορά το παλιό alert_history.json (νεότερα πρώτα) στο journal."""
+        if not os.path.exists(legacy_file):
+            return
+        try:
+            with open(legacy_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception:
+            return
+        if isinstance(data, list) and data:
+            with open(self._path(1), "a", encoding="utf-8") as f:
+                for entry in reversed(data):
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def _load_tail(self):
+        need = self._tail.maxlen
+        chunks = []
+        for seq in reversed(self._segments()):
+            entries = self._read(self._path(seq))
+            chunks.append(entries)
+            need -= len(entries)
+            if need <= 0:
+                break
+        for entries in reversed(chunks):
+            self._tail.extend(entries)
+
+    # -------- write --------
+    def append(self, source: str, message: str, **extra):
+        entry = {
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "source": source,
+            "message": message,
+            **extra,
+        }
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            with open(self._active(), "a", encoding="utf-8") as f:
+                f.write(line)
+            self._tail.append(entry)
+        return entry
+
+    # -------- read --------
+    def iter_newest(self):
+        """Όλα τα alerts από το νεότερο στο παλαιότερο (segment-by-segment)."""
+        with self._lock:
+            segs = self._segments()
+        for seq in reversed(segs):
+            yield from reversed(self._read(self._path(seq)))
+
+    def latest(self, n: int = 50):
+        """Τα n νεότερα alerts· από τη μνήμη όταν χωράνε στο tail."""
+        with self._lock:
+            if n <= len(self._tail) or len(self._tail) < self._tail.maxlen:
+                return list(islice(reversed(self._tail), n))
+        return list(islice(self.iter_newest(), n))
+
+    # -------- compaction --------
+    def compact(self, retain=None):
+        """
+        Κρατά τα τελευταία `retain` alerts: σβήνει ολόκληρα τα παλιά segments
+        και ενώνει τα υπόλοιπα κλειστά segments σε ένα (write + rename).
+        Το ενεργό segment δεν αγγίζεται.
+        """
+        retain = self.retain if retain is None else int(retain)
+        with self._lock:
+            segs = self._segments()
+            if len(segs) < 2:
+                return {"segments": len(segs), "removed": 0}
+            active, sealed = segs[-1], segs[:-1]
+            budget = retain - len(self._read(self._path(active)))
+
+            keep, entries = [], []
+            for seq in reversed(sealed):
+                if budget <= 0:
+                    break
+                chunk = self._read(self._path(seq))
+                entries = chunk[-budget:] + entries
+                budget -= len(chunk)
+                keep.append(seq)
+
+            removed = [seq for seq in sealed if seq not in keep]
+            if keep:
+                target = self._path(min(keep))
+                tmp = f"{target}.tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    for entry in entries:
+                        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                os.replace(tmp, target)
+                removed += [seq for seq in keep if seq != min(keep)]
+            for seq in removed:
+                os.remove(self._path(seq))
+            return {"segments": len(self._segments()), "removed": len(removed)}
+
+    def compaction_loop(self, interval: float = 3600, stop=None):
+        """Background compaction job (τρέχει σε daemon thread)."""
+        stop = stop or threading.Event()
+        while not stop.wait(interval):
+            try:
+                self.compact()
+            except Exception as e:
+                print("[ALERTS] ⚠️ Compaction failed:", e)
@@ -1,11 +1,16 @@
 # ==============================================
 # EURO_GOALS – API Aggregator (v1)
 # ==============================================
+# Όλες οι πηγές κανονικοποιούνται σε ένα schema (fixture, teams,
+# league, kickoff) και γίνονται upsert σε ένα columnar dataset
+# (Parquet, partition ανά ημερομηνία, key = source + fixture_id)
+# αντί για ένα νέο timestamped CSV ανά run.
+# ==============================================
 import os
 import pandas as pd
 from dotenv import load_dotenv
-from datetime import datetime
 from modules.health_check import log_message
+from modules.match_store import MatchStore
 
 # --------------------------------------------------
 # 1. Εισαγωγή επιμέρους readers
@@ -19,20 +24,138 @@ from modules.apifootball_reader import get_fixtures as af_fixtures
 load_dotenv()
 DATA_DIR = "data"
 os.makedirs(DATA_DIR, exist_ok=True)
+FIXTURE_STORE_DIR = os.getenv("FIXTURE_STORE_DIR", os.path.join(DATA_DIR, "fixtures_store"))
+
+# --------------------------------------------------
+# Normalized schema
+# --------------------------------------------------
+FIXTURE_DTYPES = {
+    "source": "string",
+    "fixture_id": "Int64",
+    "Date": "string",            # YYYY-MM-DD (UTC) – partition
+    "kickoff_utc": "string",     # ISO 8601, π.χ. 2025-08-16T14:00:00Z
+    "status": "string",          # SCHEDULED / LIVE / FINISHED / POSTPONED / CANCELLED / OTHER
+    "status_raw": "string",
+    "league_id": "Int64",
+    "league_name": "string",
+    "country": "string",
+    "season": "string",
+    "round": "string",
+    "home_team_id": "Int64",
+    "home_team": "string",
+    "away_team_id": "Int64",
+    "away_team": "string",
+    "home_goals": "Int64",
+    "away_goals": "Int64",
+    "venue": "string",
+}
+FIXTURE_COLUMNS = list(FIXTURE_DTYPES)
+FIXTURE_KEY = ["source", "fixture_id"]
+
+STATUS_MAP = {
+    # Football-Data.org
+    "SCHEDULED": "SCHEDULED", "TIMED": "SCHEDULED", "IN_PLAY": "LIVE", "PAUSED": "LIVE",
+    "FINISHED": "FINISHED", "AWARDED": "FINISHED", "POSTPONED": "POSTPONED", "SUSPENDED": "POSTPONED",
+    "CANCELLED": "CANCELLED",
+    # API-Football (fixture.status.short)
+    "TBD": "SCHEDULED", "NS": "SCHEDULED", "1H": "LIVE", "HT": "LIVE", "2H": "LIVE", "ET": "LIVE",
+    "BT": "LIVE", "P": "LIVE", "LIVE": "LIVE", "INT": "LIVE", "FT": "FINISHED", "AET": "FINISHED",
+    "PEN": "FINISHED", "AWD": "FINISHED", "WO": "FINISHED", "PST": "POSTPONED", "SUSP": "POSTPONED",
+    "CANC": "CANCELLED", "ABD": "CANCELLED",
+}
+
+# API-Football nested payload → normalized στήλες (μετά το json_normalize)
+_APIFOOTBALL_COLUMNS = {
+    "fixture.id": "fixture_id",
+    "fixture.date": "kickoff_utc",
+    "fixture.status.short": "status_raw",
+    "fixture.venue.name": "venue",
+    "league.id": "league_id",
+    "league.name": "league_name",
+    "league.country": "country",
+    "league.season": "season",
+    "league.round": "round",
+    "teams.home.id": "home_team_id",
+    "teams.home.name": "home_team",
+    "teams.away.id": "away_team_id",
+    "teams.away.name": "away_team",
+    "goals.home": "home_goals",
+    "goals.away": "away_goals",
+}
+
+_FOOTBALLDATA_COLUMNS = {
+    "match_id": "fixture_id",
+    "utc_date": "kickoff_utc",
+    "status": "status_raw",
+    "competition": "league_name",
+    "score_home": "home_goals",
+    "score_away": "away_goals",
+}
+
+
+def _finish(df: pd.DataFrame, source: str) -> pd.DataFrame:
+    """Κοινά βήματα: kickoff σε UTC ISO, Date partition, status, schema/dtypes."""
+    df = df.copy()
+    df["source"] = source
+    for col in FIXTURE_COLUMNS:
+        if col not in df.columns:
+            df[col] = None
+    kickoff = pd.to_datetime(df["kickoff_utc"], utc=True, errors="coerce")
+    df["kickoff_utc"] = kickoff.dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+    df["Date"] = kickoff.dt.strftime("%Y-%m-%d")
+    df["status_raw"] = df["status_raw"].astype("string")
+    df["status"] = df["status_raw"].map(STATUS_MAP).fillna("OTHER")
+    df["season"] = df["season"].astype("string")
+    for col in ("fixture_id", "league_id", "home_team_id", "away_team_id", "home_goals", "away_goals"):
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+    df = df[FIXTURE_COLUMNS].astype(FIXTURE_DTYPES)
+    return df[df["fixture_id"].notna()]
+
+
+def normalize_football_data(rows) -> pd.DataFrame:
+    """Football-Data.org rows (ήδη flat από τον reader)."""
+    df = pd.DataFrame(list(rows or []))
+    return _finish(df.rename(columns=_FOOTBALLDATA_COLUMNS), "football-data")
+
+
+def normalize_api_football(items) -> pd.DataFrame:
+    """API-Football /fixtures response (nested dicts) με ένα json_normalize."""
+    df = pd.json_normalize(list(items or []))
+    df = df[[c for c in _APIFOOTBALL_COLUMNS if c in df.columns]].rename(columns=_APIFOOTBALL_COLUMNS)
+    return _finish(df, "api-football")
+
+
+def open_fixture_store() -> MatchStore:
+    return MatchStore(FIXTURE_STORE_DIR, FIXTURE_DTYPES, key=FIXTURE_KEY, partition_cols=["Date"])
+
+
+def read_fixtures(date_from=None, date_to=None, sources=None, columns=None) -> pd.DataFrame:
+    """
+    Ενιαίο read για downstream: τα όρια ημερομηνίας κλαδεύουν partitions,
+    π.χ. read_fixtures("2025-08-01", "2025-08-31", sources=["api-football"]).
+    """
+    filters = []
+    if date_from:
+        filters.append(("Date", ">=", str(date_from)))
+    if date_to:
+        filters.append(("Date", "<=", str(date_to)))
+    if sources:
+        filters.append(("source", "in", list(sources)))
+    return open_fixture_store().read(filters=filters or None, columns=columns)
 
 # --------------------------------------------------
 # 3. Συνάρτηση συλλογής δεδομένων
 # --------------------------------------------------
 def aggregate_all_data():
     log_message("[AGGREGATOR] 🚀 Starting full data aggregation...")
-    all_data = []
+    frames = []
 
     # --- Football-Data.org ---
     if os.getenv("FOOTBALLDATA_API_KEY"):
         try:
             fd_data = fd_fixtures()
             log_message(f"[AGGREGATOR] ⚽ Football-Data.org returned {len(fd_data)} fixtures.")
-            all_data.extend(fd_data)
+            frames.append(normalize_football_data(fd_data))
         except Exception as e:
             log_message(f"[AGGREGATOR] ❌ Football-Data.org error: {e}")
     else:
@@ -43,7 +166,7 @@ def aggregate_all_data():
         try:
             af_data = af_fixtures(league_id=39)
             log_message(f"[AGGREGATOR] 🏆 API-Football returned {len(af_data)} fixtures.")
-            all_data.extend(af_data)
+            frames.append(normalize_api_football(af_data))
         except Exception as e:
             log_message(f"[AGGREGATOR] ❌ API-Football error: {e}")
     else:
@@ -53,20 +176,24 @@ def aggregate_all_data():
     # Θα προστεθούν στη v2
 
     # --------------------------------------------------
-    # 4. Δημιουργία dataframe & αποθήκευση
+    # 4. Upsert στο fixtures dataset
     # --------------------------------------------------
     try:
-        if not all_data:
+        frames = [f for f in frames if not f.empty]
+        if not frames:
             log_message("[AGGREGATOR] ⚠️ No data collected from any source.")
             return
 
-        df = pd.DataFrame(all_data)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M")
-        csv_path = os.path.join(DATA_DIR, f"aggregated_fixtures_{timestamp}.csv")
-        df.to_csv(csv_path, index=False)
-        log_message(f"[AGGREGATOR] ✅ Aggregated data saved to {csv_path}")
+        df = pd.concat(frames, ignore_index=True)
+        store = open_fixture_store()
+        store.append(df)
+        stats = dict(store.last_append)
+        store.compact()
+        log_message(f"[AGGREGATOR] ✅ {len(df)} fixtures → {FIXTURE_STORE_DIR} "
+                    f"(+{stats['inserted']} new, {stats['updated']} updated, {stats['unchanged']} unchanged)")
+        return stats
     except Exception as e:
-        log_message(f"[AGGREGATOR] ❌ Error creating CSV: {e}")
+        log_message(f"[AGGREGATOR] ❌ Error writing fixtures dataset: {e}")
 
 
 # --------------------------------------------------
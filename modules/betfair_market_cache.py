@@ -0,0 +1,281 @@
+# ============================================================
+# modules/betfair_market_cache.py
+# Incremental Betfair market cache (Exchange Stream API deltas)
+# ============================================================
+# - Εφαρμόζει μηνύματα "mcm" (market change message) in place:
+#   img=True → πλήρης εικόνα market, αλλιώς delta ανά runner
+#   (atb / atl / trd ως [price, size], size 0 = αφαίρεση level)
+# - Markets με status CLOSED αφαιρούνται → η μνήμη μένει σταθερή
+#   όσο ανοίγουν/κλείνουν αγορές
+# - snapshot() / rows(): συνεπή αντίγραφα κάτω από lock
+# - LocalDeltaFeed: τοπικός stand-in του stream για tests / dev
+# ============================================================
+
+import random
+import threading
+import time
+
+_LADDERS = ("atb", "atl", "trd")
+
+
+def _apply_levels(ladder: dict, levels):
+    for price, size in levels or ():
+        if size:
+            ladder[price] = size
+        else:
+            ladder.pop(price, None)
+
+
+class _Runner:
+    __slots__ = ("id", "atb", "atl", "trd", "ltp", "tv", "status")
+
+    def __init__(self, selection_id):
+        self.id = selection_id
+        self.atb, self.atl, self.trd = {}, {}, {}
+        self.ltp = None
+        self.tv = 0.0
+        self.status = "ACTIVE"
+
+    def apply(self, rc):
+        for name in _LADDERS:
+            if name in rc:
+                _apply_levels(getattr(self, name), rc[name])
+        if "ltp" in rc:
+            self.ltp = rc["ltp"]
+        if "tv" in rc:
+            self.tv = rc["tv"]
+
+    def best_back(self):
+        return max(self.atb) if self.atb else None
+
+    def best_lay(self):
+        return min(self.atl) if self.atl else None
+
+    def to_dict(self):
+        return {
+            "selectionId": self.id,
+            "status": self.status,
+            "ltp": self.ltp,
+            "totalMatched": self.tv,
+            "availableToBack": [{"price": p, "size": self.atb[p]} for p in sorted(self.atb, reverse=True)],
+            "availableToLay": [{"price": p, "size": self.atl[p]} for p in sorted(self.atl)],
+            "tradedVolume": [{"price": p, "size": self.trd[p]} for p in sorted(self.trd)],
+        }
+
+
+class _Market:
+    __slots__ = ("id", "definition", "runners", "tv", "version", "updated")
+
+    def __init__(self, market_id):
+        self.id = market_id
+        self.definition = {}
+        self.runners = {}
+        self.tv = 0.0
+        self.version = 0
+        self.updated = 0.0
+
+    def apply(self, mc, now):
+        if mc.get("img"):
+            self.runners.clear()
+            self.tv = 0.0
+        definition = mc.get("marketDefinition")
+        if definition:
+            self.definition = definition
+            for rd in definition.get("runners", []):
+                runner = self.runners.get(rd["id"])
+                if runner is None:
+                    runner = self.runners[rd["id"]] = _Runner(rd["id"])
+                runner.status = rd.get("status", runner.status)
+        for rc in mc.get("rc", []):
+            runner = self.runners.get(rc["id"])
+            if runner is None:
+                runner = self.runners[rc["id"]] = _Runner(rc["id"])
+            runner.apply(rc)
+        if "tv" in mc:
+            self.tv = mc["tv"]
+        self.version += 1
+        self.updated = now
+
+    @property
+    def status(self):
+        return self.definition.get("status", "OPEN")
+
+    def to_dict(self):
+        return {
+            "marketId": self.id,
+            "status": self.status,
+            "eventName": self.definition.get("eventName"),
+            "marketTime": self.definition.get("marketTime"),
+            "inPlay": self.definition.get("inPlay", False),
+            "totalMatched": self.tv,
+            "version": self.version,
+            "runners": [r.to_dict() for r in self.runners.values()],
+        }
+
+
+class MarketCache:
+    def __init__(self, clock=time.time):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._markets = {}
+        self.clk = None
+        self.pt = None
+        self.stats = {"messages": 0, "images": 0, "deltas": 0, "closed": 0, "heartbeats": 0}
+
+    # -------- write --------
+    def apply(self, msg):
+        """Εφαρμόζει ένα mcm μήνυμα· επιστρέφει τα market ids που άλλαξαν."""
+        if msg.get("op") != "mcm":
+            return []
+        changed = []
+        now = self._clock()
+        with self._lock:
+            self.stats["messages"] += 1
+            if msg.get("clk"):
+                self.clk = msg["clk"]
+            self.pt = msg.get("pt", self.pt)
+            if msg.get("ct") == "HEARTBEAT":
+                self.stats["heartbeats"] += 1
+                return changed
+            if msg.get("ct") == "SUB_IMAGE" and not msg.get("segmentType"):
+                self._markets.clear()  # νέα πλήρης εικόνα της συνδρομής
+            for mc in msg.get("mc", []):
+                market = self._markets.get(mc["id"])
+                if market is None:
+                    market = self._markets[mc["id"]] = _Market(mc["id"])
+                market.apply(mc, now)
+                self.stats["images" if mc.get("img") else "deltas"] += 1
+                if market.status == "CLOSED":
+                    del self._markets[mc["id"]]
+                    self.stats["closed"] += 1
+                changed.append(mc["id"])
+        return changed
+
+    def prune(self, max_age: float):
+        """Αφαιρεί markets χωρίς update για max_age δευτ. (π.χ. χαμένο CLOSED)."""
+        cutoff = self._clock() - max_age
+        with self._lock:
+            stale = [mid for mid, m in self._markets.items() if m.updated < cutoff]
+            for mid in stale:
+                del self._markets[mid]
+        return stale
+
+    # -------- read --------
+    def __len__(self):
+        with self._lock:
+            return len(self._markets)
+
+    def market_ids(self):
+        with self._lock:
+            return list(self._markets)
+
+    def snapshot(self, market_ids=None):
+        """Συνεπές αντίγραφο (όλα ή τα ζητούμενα markets) τη στιγμή της κλήσης."""
+        with self._lock:
+            ids = list(self._markets) if market_ids is None else [m for m in market_ids if m in self._markets]
+            return {"clk": self.clk, "pt": self.pt,
+                    "markets": [self._markets[mid].to_dict() for mid in ids]}
+
+    def rows(self):
+        """Γραμμές στη μορφή του market_reader (match, 1-X-2 best back, total_volume, kickoff)."""
+        with self._lock:
+            out = []
+            for m in self._markets.values():
+                if m.status != "OPEN":
+                    continue
+                # MATCH_ODDS: sortPriority 1 = home, 2 = away, 3 = draw
+                by_sort = sorted(m.definition.get("runners", []), key=lambda rd: rd.get("sortPriority", 0))
+                ordered = [m.runners[rd["id"]].best_back() if rd["id"] in m.runners else None for rd in by_sort]
+                home, away, draw = (ordered + [None, None, None])[:3]
+                out.append({
+                    "match": m.definition.get("eventName", m.id),
+                    "home_odds": round(home, 2) if home else "-",
+                    "draw_odds": round(draw, 2) if draw else "-",
+                    "away_odds": round(away, 2) if away else "-",
+                    "total_volume": int(m.tv) if m.tv else 0,
+                    "kickoff": m.definition.get("marketTime"),
+                })
+            return out
+
+
+# ------------------------------------------------------------
+# Local stand-in delta feed (χωρίς Betfair credentials)
+# ------------------------------------------------------------
+class LocalDeltaFeed:
+    """
+    Παράγει mcm μηνύματα σαν το Exchange Stream API: ένα SUB_IMAGE για τα
+    αρχικά markets και μετά deltas τιμών/όγκων, νέα markets (img) και
+    κλεισίματα. Ντετερμινιστικό για δοσμένο seed.
+    """
+
+    TEAMS = ["Olympiacos", "AEK", "PAOK", "Aris", "Panathinaikos", "Lamia", "Man City", "Liverpool",
+             "Real Madrid", "Barcelona", "PSG", "Lyon", "Bayern", "Dortmund", "Juventus", "Inter",
+             "Porto", "Benfica", "Ajax", "PSV"]
+
+    def __init__(self, markets: int = 50, seed: int = 0, open_close_rate: float = 0.005, interval: float = 0.0):
+        self.rnd = random.Random(seed)
+        self.initial = int(markets)
+        self.open_close_rate = float(open_close_rate)
+        self.interval = float(interval)
+        self._seq = 0
+        self._clk = 0
+        self._open = {}
+
+    def _new_market(self):
+        self._seq += 1
+        mid = f"1.{200000000 + self._seq}"
+        home, away = self.rnd.sample(self.TEAMS, 2)
+        sel = [self._seq * 10 + k for k in range(3)]
+        base = [self.rnd.uniform(1.6, 3.2), self.rnd.uniform(2.9, 4.0), self.rnd.uniform(2.2, 5.0)]
+        self._open[mid] = {"sel": sel, "px": base}
+        definition = {
+            "status": "OPEN", "eventName": f"{home} v {away}", "inPlay": False,
+            "marketTime": time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime(time.time() + 3600 * self.rnd.randint(1, 48))),
+            "runners": [{"id": s, "sortPriority": k + 1, "status": "ACTIVE", "name": n}
+                        for k, (s, n) in enumerate(zip(sel, (home, away, "The Draw")))],
+        }
+        rc = []
+        for s, px in zip(sel, base):
+            p = round(px, 2)
+            rc.append({"id": s, "atb": [[p, 100.0], [round(p - 0.02, 2), 250.0]],
+                       "atl": [[round(p + 0.02, 2), 120.0], [round(p + 0.04, 2), 300.0]],
+                       "trd": [[p, 50.0]], "ltp": p, "tv": 50.0})
+        return {"id": mid, "img": True, "marketDefinition": definition, "rc": rc, "tv": 150.0}
+
+    def _delta(self, mid):
+        state = self._open[mid]
+        k = self.rnd.randrange(3)
+        old = round(state["px"][k], 2)
+        state["px"][k] = max(1.01, state["px"][k] + self.rnd.uniform(-0.05, 0.05))
+        new = round(state["px"][k], 2)
+        size = round(self.rnd.uniform(5, 500), 2)
+        rc = {"id": state["sel"][k], "atb": [[new, size]], "atl": [[round(new + 0.02, 2), size]],
+              "trd": [[new, size]], "ltp": new}
+        if new != old:
+            rc["atb"].append([old, 0])  # αφαίρεση των παλιών levels
+            rc["atl"].append([round(old + 0.02, 2), 0])
+        return {"id": mid, "rc": [rc], "tv": round(self.rnd.uniform(150, 1e6), 2)}
+
+    def _close(self, mid):
+        state = self._open.pop(mid)
+        return {"id": mid, "marketDefinition": {
+            "status": "CLOSED", "runners": [{"id": s, "status": "ACTIVE"} for s in state["sel"]]}}
+
+    def _msg(self, mc, ct=None):
+        self._clk += 1
+        msg = {"op": "mcm", "clk": str(self._clk), "pt": int(time.time() * 1000), "mc": mc}
+        if ct:
+            msg["ct"] = ct
+        return msg
+
+    def __iter__(self):
+        yield self._msg([self._new_market() for _ in range(self.initial)], ct="SUB_IMAGE")
+        while True:
+            mc = [self._delta(mid) for mid in self.rnd.sample(list(self._open), min(len(self._open), 5))]
+            if self.rnd.random() < self.open_close_rate * len(self._open) and self._open:
+                mc.append(self._close(self.rnd.choice(list(self._open))))
+            if self.rnd.random() < self.open_close_rate * max(1, self.initial):
+                mc.append(self._new_market())
+            yield self._msg(mc)
+            if self.interval:
+                time.sleep(self.interval)
@@ -0,0 +1,378 @@
+# ============================================================
+# modules/goal_hazard.py
+# In-play goal-hazard engine (struct-of-arrays, ένα vectorized βήμα ανά poll)
+# ============================================================
+# - InPlayTable: κατάσταση ανά live αγώνα (minute, score, red cards,
+#   pre-match λ/μ) σε NumPy στήλες με free-list γραμμών· ο αγώνας
+#   που λείπει από το poll (λήξη) αποδεσμεύει τη γραμμή του
+# - goal_hazard(): ένταση γκολ ανά λεπτό = base/90 · g(t) · red-card
+#   και score-state πολλαπλασιαστές, με g(t) γραμμικά αυξανόμενο
+#   (περισσότερα γκολ αργά στον αγώνα)· κλειστό ολοκλήρωμα στο
+#   [minute, minute + horizon] ∩ [minute, 90 + stoppage]
+# - GoalHazardEngine.poll(): ενημέρωση πίνακα + hazards για όλους
+#   τους αγώνες μαζί + alerts μόνο στα upward crossings του
+#   GOALMATRIX_ALERT_THRESHOLD (με hysteresis· η πρώτη εμφάνιση ενός
+#   αγώνα είναι baseline)
+# - ScorelinePrior: pre-match λ/μ ανά αγώνα από τα Dixon-Coles fits
+#   του scoreline_model (refit στο background)· shared_prior() = ένας
+#   ανά process (ένα fit για όλους τους engines και τον dual engine).
+#   Αγώνες με default λ/μ ξαναψάχνονται όταν έρθει νέο fit
+# ============================================================
+
+import os
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Το ίδιο setting δείχνουν και τα GoalMatrix dashboards. Εφαρμόζεται στο
+# P(γκολ στα επόμενα GOAL_HAZARD_HORIZON λεπτά): με τα default λ/μ το μέγιστο
+# είναι ~0.40 γύρω στο 80', με fitted priors ~0.2–0.55 ανάλογα με το fixture
+GOALMATRIX_ALERT_THRESHOLD = float(os.getenv("GOALMATRIX_ALERT_THRESHOLD", 0.38))
+GOAL_HAZARD_HORIZON = float(os.getenv("GOAL_HAZARD_HORIZON", 15))       # λεπτά μπροστά
+GOAL_HAZARD_STOPPAGE = float(os.getenv("GOAL_HAZARD_STOPPAGE", 5))      # καθυστερήσεις (λεπτά)
+GOAL_HAZARD_HYSTERESIS = float(os.getenv("GOAL_HAZARD_HYSTERESIS", 0.02))
+BASE_HOME = float(os.getenv("GOAL_HAZARD_BASE_HOME", 1.45))             # αναμενόμενα γκολ / 90'
+BASE_AWAY = float(os.getenv("GOAL_HAZARD_BASE_AWAY", 1.15))
+GOAL_HAZARD_PRIOR_REFIT = float(os.getenv("GOALMATRIX_MODEL_REFIT", 3600))
+
+TIME_SLOPE = 0.4   # g(t) = 1 + TIME_SLOPE · (t/90 − 0.5) → μέσος όρος 1 στο 0–90
+RED_OWN = 0.70     # ανά κόκκινη της ομάδας
+RED_OPP = 1.20     # ανά κόκκινη του αντιπάλου
+SCORE_STATE = 0.10 # ανά γκολ διαφορά (έως 2): ο πίσω πιέζει, ο μπροστά κατεβάζει ρυθμό
+
+
+# ------------------------------------------------------------
+# Vectorized hazard
+# ------------------------------------------------------------
+def _g_integral(t1, t2):
+    """∫ g(t) dt στο [t1, t2] (κλειστή μορφή, arrays)."""
+    return (t2 - t1) * (1 - 0.5 * TIME_SLOPE) + TIME_SLOPE * (t2 * t2 - t1 * t1) / 180.0
+
+
+def goal_hazard(minute, home_goals, away_goals, home_red, away_red, lam, mu,
+                horizon: float = GOAL_HAZARD_HORIZON, stoppage: float = GOAL_HAZARD_STOPPAGE):
+    """
+    Arrays (n,) → dict από arrays (n,):
+      p_goal      P(≥1 γκολ στα επόμενα `horizon` λεπτά)
+      p_home/away P(≥1 γκολ της ομάδας στο ίδιο διάστημα)
+      xg_rest     αναμενόμενα γκολ μέχρι το τέλος
+    """
+    minute = np.asarray(minute, np.float64)
+    end = 90.0 + stoppage
+    t1 = np.minimum(minute, end)
+    t2 = np.minimum(t1 + horizon, end)
+
+    home_red = np.asarray(home_red, np.float64)
+    away_red = np.asarray(away_red, np.float64)
+    diff = np.clip(np.asarray(home_goals, np.float64) - np.asarray(away_goals, np.float64), -2, 2)
+    home_mult = RED_OWN ** home_red * RED_OPP ** away_red * (1 - SCORE_STATE * diff)
+    away_mult = RED_OWN ** away_red * RED_OPP ** home_red * (1 + SCORE_STATE * diff)
+    home_rate = np.asarray(lam, np.float64) / 90.0 * home_mult
+    away_rate = np.asarray(mu, np.float64) / 90.0 * away_mult
+
+    window = _g_integral(t1, t2)
+    rest = _g_integral(t1, np.full_like(t1, end))
+    home_h, away_h = home_rate * window, away_rate * window
+    return {
+        "p_goal": 1.0 - np.exp(-(home_h + away_h)),
+        "p_home": 1.0 - np.exp(-home_h),
+        "p_away": 1.0 - np.exp(-away_h),
+        "xg_rest": (home_rate + away_rate) * rest,
+    }
+
+
+# ------------------------------------------------------------
+# Struct-of-arrays κατάσταση
+# ------------------------------------------------------------
+class InPlayTable:
+    _COLUMNS = {
+        "minute": np.float32, "home_goals": np.int16, "away_goals": np.int16,
+        "home_red": np.int8, "away_red": np.int8, "lam": np.float32, "mu": np.float32,
+        "p_goal": np.float32, "alerted": np.bool_, "active": np.bool_,
+        "fitted": np.bool_, "prior_version": np.int32,
+    }
+
+    def __init__(self, capacity: int = 256):
+        self.cols = {name: np.zeros(capacity, dt) for name, dt in self._COLUMNS.items()}
+        self.labels = [None] * capacity
+        self.row = {}
+        self._free = list(range(capacity - 1, -1, -1))
+
+    @property
+    def capacity(self):
+        return len(self.labels)
+
+    def __len__(self):
+        return len(self.row)
+
+    def _grow(self):
+        old = self.capacity
+        for name, arr in self.cols.items():
+            self.cols[name] = np.concatenate([arr, np.zeros(old, arr.dtype)])
+        self.labels.extend([None] * old)
+        self._free.extend(range(2 * old - 1, old - 1, -1))
+
+    def rows_for(self, ids, lam=None, mu=None):
+        """Γραμμές για τα ids + mask νέων (νέα ids παίρνουν ελεύθερη γραμμή με pre-match λ/μ)."""
+        out = np.empty(len(ids), np.intp)
+        new = np.zeros(len(ids), np.bool_)
+        c = self.cols
+        for k, mid in enumerate(ids):
+            r = self.row.get(mid)
+            if r is None:
+                if not self._free:
+                    self._grow()
+                    c = self.cols
+                r = self.row[mid] = self._free.pop()
+                c["lam"][r] = BASE_HOME if lam is None else lam[k]
+                c["mu"][r] = BASE_AWAY if mu is None else mu[k]
+                c["p_goal"][r] = 0.0
+                c["alerted"][r] = False
+                c["active"][r] = True
+                c["fitted"][r] = lam is not None
+                c["prior_version"][r] = -1
+                new[k] = True
+            out[k] = r
+        return out, new
+
+    def release(self, ids):
+        for mid in ids:
+            r = self.row.pop(mid, None)
+            if r is not None:
+                self.cols["active"][r] = False
+                self.labels[r] = None
+                self._free.append(r)
+
+    def set_prior(self, match_id, lam: float, mu: float):
+        r = self.row.get(match_id)
+        if r is not None:
+            self.cols["lam"][r], self.cols["mu"][r] = lam, mu
+            self.cols["fitted"][r] = True
+
+
+# ------------------------------------------------------------
+# Sofascore /events/live → στήλες
+# ------------------------------------------------------------
+def sofascore_columns(events, now=None):
+    """Live events → (ids, labels, minute, hg, ag, hred, ared, teams) · όχι-inprogress αγνοούνται."""
+    now = time.time() if now is None else now
+    ids, labels, minute, hg, ag, hred, ared, teams = [], [], [], [], [], [], [], []
+    for e in events:
+        status = e.get("status", {})
+        if status.get("type") != "inprogress":
+            continue
+        clock = e.get("time", {})
+        if status.get("code") == 31:  # Halftime
+            m = 45.0
+        elif clock.get("currentPeriodStartTimestamp"):
+            m = clock.get("initial", 0) / 60.0 + max(0.0, now - clock["currentPeriodStartTimestamp"]) / 60.0
+        else:
+            m = 0.0
+        home, away = e.get("homeTeam", {}).get("name", ""), e.get("awayTeam", {}).get("name", "")
+        ids.append(e.get("id"))
+        labels.append(f"{home} vs {away}")
+        teams.append((home, away))
+        minute.append(m)
+        hg.append(e.get("homeScore", {}).get("current", 0) or 0)
+        ag.append(e.get("awayScore", {}).get("current", 0) or 0)
+        hred.append(e.get("homeRedCards", 0) or 0)
+        ared.append(e.get("awayRedCards", 0) or 0)
+    return ids, labels, minute, hg, ag, hred, ared, teams
+
+
+# ------------------------------------------------------------
+# Pre-match priors (scoreline_model)
+# ------------------------------------------------------------
+class ScorelinePrior:
+    """
+    Callable (ids, teams) → (ids, λ, μ) για όσους αγώνες έχουν και τις δύο
+    ομάδες σε κάποιο league fit. Με refit_every το fit ξαναγίνεται στο
+    background από το goal_matrix.load_matches· με refit_every=None ο
+    cache ανανεώνεται αλλού (π.χ. το ScorelineCache του dual_engine_manager).
+    """
+
+    def __init__(self, cache=None, refit_every=GOAL_HAZARD_PRIOR_REFIT, load=None):
+        from modules.scoreline_model import ScorelineCache
+        self.cache = cache if cache is not None else ScorelineCache()
+        self.refit_every = refit_every
+        self.load = load
+        self._lock = threading.Lock()
+        self._refitting = False
+
+    @property
+    def version(self):
+        """Αλλάζει σε κάθε νέο fit (0 = κανένα fit ακόμα)."""
+        return self.cache.version
+
+    def _refit(self):
+        try:
+            if self.load is None:
+                from modules.goal_matrix import load_matches
+                self.load = load_matches
+            return self.cache.refit(self.load())
+        finally:
+            with self._lock:
+                self._refitting = False
+
+    def _refit_background(self):
+        try:
+            self._refit()
+        except Exception as e:
+            print(f"[GOAL HAZARD] ⚠️ Prior refit failed: {e}")
+            self.cache.fitted_at = time.time()  # όχι νέα προσπάθεια σε κάθε poll
+
+    def maybe_refit(self, wait: bool = False):
+        """
+        Refit όταν λήξει το refit_every (ένα τη φορά). wait=True: στο ίδιο
+        thread, επιστρέφει το info του fit και αφήνει τα σφάλματα να περάσουν.
+        """
+        if self.refit_every is None:
+            return None
+        fitted_at = self.cache.fitted_at
+        if fitted_at is not None and time.time() - fitted_at <= self.refit_every:
+            return None
+        with self._lock:
+            if self._refitting:
+                return None
+            self._refitting = True
+        if wait:
+            return self._refit()
+        threading.Thread(target=self._refit_background, name="goal-hazard-prior", daemon=True).start()
+        return None
+
+    def __call__(self, ids, teams):
+        from modules.scoreline_model import fixture_rates
+        import pandas as pd
+
+        self.maybe_refit()
+        fits = self.cache.fits
+        if not fits or not ids:
+            return [], np.empty(0), np.empty(0)
+        fixtures = pd.DataFrame({"fixture_id": ids, "home": [t[0] for t in teams], "away": [t[1] for t in teams]})
+        fids, lam, mu, _ = fixture_rates(fits, fixtures)
+        return fids, lam, mu
+
+
+_shared_prior = None
+_shared_lock = threading.Lock()
+
+
+def shared_prior():
+    """Ο ScorelinePrior του process: ένα ScorelineCache, ένα load_matches / refit."""
+    global _shared_prior
+    with _shared_lock:
+        if _shared_prior is None:
+            _shared_prior = ScorelinePrior()
+        return _shared_prior
+
+
+# ------------------------------------------------------------
+# Engine
+# ------------------------------------------------------------
+class GoalHazardEngine:
+    def __init__(self, threshold: float = GOALMATRIX_ALERT_THRESHOLD, horizon: float = GOAL_HAZARD_HORIZON,
+                 hysteresis: float = GOAL_HAZARD_HYSTERESIS, capacity: int = 256, prior=None):
+        self.threshold = float(threshold)
+        self.prior = prior  # callable (ids, teams) → (ids, λ, μ), π.χ. ScorelinePrior()
+        self.horizon = float(horizon)
+        self.hysteresis = float(hysteresis)
+        self.table = InPlayTable(capacity)
+        self._lock = threading.Lock()
+        self.stats = {"polls": 0, "live": 0, "alerts": 0, "last_poll_ms": 0.0}
+
+    def poll(self, ids, labels, minute, home_goals, away_goals, home_red=None, away_red=None, teams=None):
+        """
+        Ένα poll = η πλήρης λίστα των live αγώνων. Ενημερώνει τον πίνακα,
+        αποδεσμεύει όσους έλειψαν, υπολογίζει hazards για όλους μαζί και
+        επιστρέφει alerts για όσους πέρασαν το threshold προς τα πάνω.
+        teams: (home, away) ανά αγώνα· με prior οι αγώνες παίρνουν fitted λ/μ
+        (οι νέοι, και όσοι έμειναν στα default όταν έρθει νέο fit).
+        """
+        t0 = time.perf_counter()
+        n = len(ids)
+        zeros = np.zeros(n, np.int8)
+        with self._lock:
+            t = self.table
+            live = set(ids)
+            t.release([mid for mid in list(t.row) if mid not in live])
+            rows, new = t.rows_for(ids)
+            c = t.cols
+            if self.prior is not None and teams is not None:
+                self._apply_prior(ids, teams, rows)
+            c["minute"][rows] = minute
+            c["home_goals"][rows] = home_goals
+            c["away_goals"][rows] = away_goals
+            c["home_red"][rows] = zeros if home_red is None else home_red
+            c["away_red"][rows] = zeros if away_red is None else away_red
+            for r, label in zip(rows.tolist(), labels):
+                t.labels[r] = label
+
+            h = goal_hazard(c["minute"][rows], c["home_goals"][rows], c["away_goals"][rows],
+                            c["home_red"][rows], c["away_red"][rows], c["lam"][rows], c["mu"][rows],
+                            horizon=self.horizon)
+            p = h["p_goal"]
+            above = p >= self.threshold
+            alerted = c["alerted"][rows]
+            # πρώτη εμφάνιση = baseline (όχι crossing)· μετά μόνο upward crossings
+            fire = above & ~alerted & ~new
+            rearm = alerted & (p < self.threshold - self.hysteresis)
+            c["alerted"][rows[fire | (new & above)]] = True
+            c["alerted"][rows[rearm]] = False
+            c["p_goal"][rows] = p
+
+            ts = datetime.utcnow().isoformat()
+            alerts = [{
+                "type": "goal_hazard",
+                "match_id": ids[k],
+                "message": f"🔥 Goal likely – {labels[k]} ({int(home_goals[k])}-{int(away_goals[k])}, "
+                           f"{int(minute[k])}’): P(goal in {self.horizon:.0f}’) = {p[k]:.0%}",
+                "p_goal": round(float(p[k]), 4),
+                "xg_rest": round(float(h["xg_rest"][k]), 3),
+                "timestamp": ts,
+            } for k in np.flatnonzero(fire).tolist()]
+
+            self.stats["polls"] += 1
+            self.stats["live"] = len(t)
+            self.stats["alerts"] += len(alerts)
+            self.stats["last_poll_ms"] = round((time.perf_counter() - t0) * 1000, 3)
+        return alerts
+
+    def _apply_prior(self, ids, teams, rows):
+        """Prior lookup για όσους είναι ακόμα στα default λ/μ, μία φορά ανά fit version."""
+        refit = getattr(self.prior, "maybe_refit", None)
+        if refit is not None:
+            refit()
+        version = getattr(self.prior, "version", 0)
+        c = self.table.cols
+        todo = np.flatnonzero(~c["fitted"][rows] & (c["prior_version"][rows] != version)).tolist()
+        if not todo:
+            return
+        c["prior_version"][rows[todo]] = version
+        try:
+            fids, lam, mu = self.prior([ids[k] for k in todo], [teams[k] for k in todo])
+            for fid, l, m in zip(fids, lam, mu):
+                self.table.set_prior(fid, l, m)
+        except Exception as e:
+            print(f"[GOAL HAZARD] ⚠️ Prior lookup failed: {e}")
+
+    def poll_sofascore(self, events, now=None):
+        ids, labels, minute, hg, ag, hred, ared, teams = sofascore_columns(events, now)
+        return self.poll(ids, labels, minute, hg, ag, hred, ared, teams=teams)
+
+    def snapshot(self):
+        """Τρέχουσα κατάσταση όλων των live αγώνων (για API / debug)."""
+        with self._lock:
+            c = self.table.cols
+            return [{
+                "match_id": mid,
+                "match": self.table.labels[r],
+                "minute": round(float(c["minute"][r]), 1),
+                "score": f"{int(c['home_goals'][r])}-{int(c['away_goals'][r])}",
+                "red_cards": f"{int(c['home_red'][r])}-{int(c['away_red'][r])}",
+                "p_goal": round(float(c["p_goal"][r]), 4),
+            } for mid, r in self.table.row.items()]
@@ -1,57 +1,389 @@
 # ================================================================
-# EURO_GOALS – Goal Matrix Module (v1.0)
+# EURO_GOALS – Goal Matrix Module (v2.0)
 # ================================================================
-# Παρουσιάζει στατιστικά γκολ (Over/Under, BTTS, SmartMoney flags)
-# σε μορφή πίνακα. Αρχικά χρησιμοποιεί dummy δεδομένα.
+# Στατιστικά γκολ ανά ομάδα (avg GF/GA, BTTS%, Over 1.5/2.5/3.5%)
+# στα τελευταία GOALMATRIX_WINDOW παιχνίδια κάθε ομάδας.
+# - Πηγή: το columnar match store (αν υπάρχει) ή ο πίνακας `matches`
+# - Υπολογισμός: ένα grouped, vectorized aggregation (groupby.tail(N))
+# - Cache: πίνακας `goal_matrix_cache` + high-water mark στο
+#   `goal_matrix_meta`· κάθε refresh ξαναϋπολογίζει μόνο τις ομάδες
+#   που έπαιξαν από το watermark (μείον GOALMATRIX_LOOKBACK_DAYS)
+# - Serving: in-memory αντίγραφο του cache· κάθε GOALMATRIX_REFRESH
+#   δευτ. το refresh τρέχει σε background thread και τα requests απλώς
+#   βλέπουν τα νέα rows όταν ολοκληρωθεί (δεν περιμένουν ποτέ refresh)
 # ================================================================
 
-from datetime import datetime
+import os
+import threading
+import time
+from datetime import datetime, timedelta
 
-def get_goal_matrix_data():
+import pandas as pd
+from sqlalchemy import bindparam, create_engine, inspect, text
+
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///matches.db")
+engine = create_engine(
+    DATABASE_URL,
+    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
+)
+
+GOALMATRIX_WINDOW = int(os.getenv("GOALMATRIX_WINDOW", 10))
+GOALMATRIX_SOURCE = os.getenv("GOALMATRIX_SOURCE", "auto").lower()   # auto / store / db
+GOALMATRIX_REFRESH = float(os.getenv("GOALMATRIX_REFRESH", 300))
+GOALMATRIX_LOOKBACK_DAYS = int(os.getenv("GOALMATRIX_LOOKBACK_DAYS", 3))
+GOALMATRIX_FLAG_OVER25 = float(os.getenv("GOALMATRIX_FLAG_OVER25", 60))
+TEAM_CHUNK = 400  # ομάδες ανά SELECT του incremental refresh
+
+STAT_COLUMNS = ["matches", "avg_goals_for", "avg_goals_against", "btts_pct", "over15_pct", "over25_pct", "over35_pct"]
+
+_UPSERT = text("""
+    INSERT INTO goal_matrix_cache (team, league, matches, avg_goals_for, avg_goals_against,
+                                   btts_pct, over15_pct, over25_pct, over35_pct, window_start, last_match, updated_at)
+    VALUES (:team, :league, :matches, :avg_goals_for, :avg_goals_against,
+            :btts_pct, :over15_pct, :over25_pct, :over35_pct, :window_start, :last_match, :ts)
+    ON CONFLICT(team) DO UPDATE SET
+        league = excluded.league,
+        matches = excluded.matches,
+        avg_goals_for = excluded.avg_goals_for,
+        avg_goals_against = excluded.avg_goals_against,
+        btts_pct = excluded.btts_pct,
+        over15_pct = excluded.over15_pct,
+        over25_pct = excluded.over25_pct,
+        over35_pct = excluded.over35_pct,
+        window_start = excluded.window_start,
+        last_match = excluded.last_match,
+        updated_at = excluded.updated_at
+""")
+
+_lock = threading.Lock()
+_served = {"rows": [], "timestamp": None, "loaded": False, "refreshed_at": 0.0, "refreshing": False}
+
+
+# ------------------------------------------------
+# Schema
+# ------------------------------------------------
+def ensure_tables():
+    with engine.begin() as conn:
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS goal_matrix_cache (
+                team              TEXT PRIMARY KEY,
+                league            TEXT,
+                matches           INTEGER,
+                avg_goals_for     REAL,
+                avg_goals_against REAL,
+                btts_pct          REAL,
+                over15_pct        REAL,
+                over25_pct        REAL,
+                over35_pct        REAL,
+                window_start      TEXT,
+                last_match        TEXT,
+                updated_at        TEXT
+            )
+        """))
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS goal_matrix_meta (
+                name  TEXT PRIMARY KEY,
+                value TEXT
+            )
+        """))
+
+def ensure_indexes():
+    """Indexes στο `matches` για το incremental refresh (date range + lookup ανά ομάδα)."""
+    try:
+        cols = {c["name"] for c in inspect(engine).get_columns("matches")}
+    except Exception as e:
+        print(f"[GOALMATRIX] ⚠️ Αδυναμία ελέγχου πίνακα matches: {e}")
+        return
+    with engine.begin() as conn:
+        for col in ("date", "home_team", "away_team", "home", "away"):
+            if col in cols:
+                conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_matches_{col} ON matches ({col})"))
+
+def _get_meta(conn, name):
+    row = conn.execute(text("SELECT value FROM goal_matrix_meta WHERE name = :n"), {"n": name}).first()
+    return row[0] if row else None
+
+def _set_meta(conn, name, value):
+    conn.execute(text("""
+        INSERT INTO goal_matrix_meta (name, value) VALUES (:n, :v)
+        ON CONFLICT(name) DO UPDATE SET value = excluded.value
+    """), {"n": name, "v": value})
+
+
+# ------------------------------------------------
+# Vectorized υπολογισμός
+# ------------------------------------------------
+def compute_team_stats(matches: pd.DataFrame, window: int = GOALMATRIX_WINDOW) -> pd.DataFrame:
     """
-    Επιστρέφει λίστα λεξικών με στατιστικά ομάδων.
-    (προς το παρόν mock data – αργότερα θα έρθουν από API / DB)
+    matches: στήλες league, date, home, away, hg, ag (ένας αγώνας ανά γραμμή).
+    Επιστρέφει μία γραμμή ανά ομάδα με τα στατιστικά των τελευταίων `window`
+    αγώνων της (εντός/εκτός μαζί).
     """
-    data = [
-        {
-            "team": "Arsenal",
-            "league": "Premier League",
-            "avg_goals_for": 2.1,
-            "avg_goals_against": 0.8,
-            "btts": "68%",
-            "over25": "72%",
-            "smart_flag": "✅",
-        },
-        {
-            "team": "Chelsea",
-            "league": "Premier League",
-            "avg_goals_for": 1.4,
-            "avg_goals_against": 1.5,
-            "btts": "61%",
-            "over25": "59%",
-            "smart_flag": "⚠️",
-        },
-        {
-            "team": "Real Madrid",
-            "league": "La Liga",
-            "avg_goals_for": 2.3,
-            "avg_goals_against": 0.7,
-            "btts": "54%",
-            "over25": "70%",
-            "smart_flag": "✅",
-        },
-        {
-            "team": "Bayern Munich",
-            "league": "Bundesliga",
-            "avg_goals_for": 2.9,
-            "avg_goals_against": 1.1,
-            "btts": "73%",
-            "over25": "81%",
-            "smart_flag": "⚠️",
-        },
-    ]
-
-    return {
-        "timestamp": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),
-        "rows": data,
+    played = matches.dropna(subset=["hg", "ag"])
+    if played.empty:
+        return pd.DataFrame(columns=["team", "league", *STAT_COLUMNS, "window_start", "last_match"])
+    hg = played["hg"].astype("float64").to_numpy()
+    ag = played["ag"].astype("float64").to_numpy()
+    total = hg + ag
+    shared = {
+        "league": played["league"].to_numpy(),
+        "date": played["date"].to_numpy(),
+        "btts": (hg > 0) & (ag > 0),
+        "o15": total >= 2,
+        "o25": total >= 3,
+        "o35": total >= 4,
     }
+    # long μορφή: κάθε αγώνας δύο φορές, από την πλευρά κάθε ομάδας
+    long = pd.concat([
+        pd.DataFrame({"team": played["home"].to_numpy(), "gf": hg, "ga": ag, **shared}),
+        pd.DataFrame({"team": played["away"].to_numpy(), "gf": ag, "ga": hg, **shared}),
+    ], ignore_index=True)
+    # πλήρης σειρά (και στις ισοβαθμίες ημερομηνίας) → ίδιο αποτέλεσμα full / incremental
+    long = long.sort_values(["team", "date", "league", "gf", "ga"], kind="stable")
+    recent = long.groupby("team", sort=False).tail(window)
+    stats = recent.groupby("team", sort=True).agg(
+        league=("league", "last"),
+        matches=("gf", "size"),
+        avg_goals_for=("gf", "mean"),
+        avg_goals_against=("ga", "mean"),
+        btts_pct=("btts", "mean"),
+        over15_pct=("o15", "mean"),
+        over25_pct=("o25", "mean"),
+        over35_pct=("o35", "mean"),
+        window_start=("date", "first"),   # ταξινομημένα → first/last = min/max (cython)
+        last_match=("date", "last"),
+    ).reset_index()
+    stats[["avg_goals_for", "avg_goals_against"]] = stats[["avg_goals_for", "avg_goals_against"]].round(2)
+    pct = ["btts_pct", "over15_pct", "over25_pct", "over35_pct"]
+    stats[pct] = (stats[pct] * 100).round(1)
+    return stats
+
+
+# ------------------------------------------------
+# Πηγές αγώνων
+# ------------------------------------------------
+def _use_store():
+    if GOALMATRIX_SOURCE == "db":
+        return False
+    try:
+        from eurogoals_data import MATCH_STORE_DIR
+        return os.path.isdir(MATCH_STORE_DIR) and any(n.startswith("Season=") for n in os.listdir(MATCH_STORE_DIR))
+    except Exception:
+        if GOALMATRIX_SOURCE == "store":
+            raise
+        return False
+
+def _from_store(since=None, teams=None):
+    from eurogoals_data import MATCH_DTYPES, MATCH_STORE_DIR
+    from modules.match_store import MatchStore
+    store = MatchStore(MATCH_STORE_DIR, MATCH_DTYPES)
+    filters = [("Date", ">=", since)] if since else None
+    df = store.read(filters=filters, columns=["Date", "LeagueName", "HomeTeam", "AwayTeam", "HomeGoals", "AwayGoals"])
+    df = df.rename(columns={"Date": "date", "LeagueName": "league", "HomeTeam": "home", "AwayTeam": "away",
+                            "HomeGoals": "hg", "AwayGoals": "ag"})
+    if teams is not None:
+        df = df[df["home"].isin(teams) | df["away"].isin(teams)]
+    return df
+
+def _db_columns():
+    cols = {c["name"] for c in inspect(engine).get_columns("matches")}
+    home = "home_team" if "home_team" in cols else "home"
+    away = "away_team" if "away_team" in cols else "away"
+    for hg, ag in (("home_goals", "away_goals"), ("home_score", "away_score"), ("HomeGoals", "AwayGoals")):
+        if {hg, ag} <= cols:
+            goals = f"{hg} AS hg, {ag} AS ag"
+            break
+    else:
+        score = "score" if "score" in cols else "result"
+        goals = f"{score} AS score"
+    league = "league" if "league" in cols else "NULL"
+    return f"{league} AS league, date, {home} AS home, {away} AS away, {goals}", home, away
+
+def _parse_scores(df):
+    if "score" in df.columns:
+        goals = df["score"].astype("string").str.extract(r"(\d+)\s*[-:]\s*(\d+)")
+        df = df.drop(columns=["score"]).assign(hg=pd.to_numeric(goals[0]), ag=pd.to_numeric(goals[1]))
+    return df
+
+def _frame(result):
+    return pd.DataFrame.from_records(result.fetchall(), columns=list(result.keys()))
+
+def _from_db(since=None, teams=None):
+    select, home, away = _db_columns()
+    since_sql = "date >= :since" if since else "1 = 1"
+    with engine.connect() as conn:
+        if teams is None:
+            df = _frame(conn.execute(text(f"SELECT {select} FROM matches WHERE {since_sql}"), {"since": since}))
+        else:
+            stmt = text(f"SELECT {select} FROM matches WHERE ({home} IN :teams OR {away} IN :teams) AND {since_sql}") \
+                .bindparams(bindparam("teams", expanding=True))
+            teams = list(teams)
+            frames = [_frame(conn.execute(stmt, {"teams": teams[i:i + TEAM_CHUNK], "since": since}))
+                      for i in range(0, len(teams), TEAM_CHUNK)]
+            # ένας αγώνας μπορεί να ταιριάξει σε δύο chunks (home σε ένα, away σε άλλο)
+            df = pd.concat(frames, ignore_index=True).drop_duplicates()
+    return _parse_scores(df)
+
+def load_matches(since=None, teams=None) -> pd.DataFrame:
+    """Αγώνες (league, date, home, away, hg, ag) από store ή DB, προαιρετικά φιλτραρισμένοι."""
+    df = _from_store(since, teams) if _use_store() else _from_db(since, teams)
+    df["date"] = pd.to_datetime(df["date"], errors="coerce").dt.strftime("%Y-%m-%d")
+    return df.dropna(subset=["date", "home", "away"])
+
+
+def _window_starts(teams):
+    stmt = text("SELECT team, window_start FROM goal_matrix_cache WHERE team IN :teams") \
+        .bindparams(bindparam("teams", expanding=True))
+    out = {}
+    with engine.connect() as conn:
+        for i in range(0, len(teams), TEAM_CHUNK):
+            out.update((t, w) for t, w in conn.execute(stmt, {"teams": teams[i:i + TEAM_CHUNK]}) if w)
+    return out
+
+
+# ------------------------------------------------
+# Cache refresh (full / incremental)
+# ------------------------------------------------
+def refresh_cache(full: bool = False) -> dict:
+    """
+    Ενημερώνει το goal_matrix_cache. Incremental: βρίσκει τις ομάδες με αγώνες
+    από το watermark (μείον lookback για αποτελέσματα που ήρθαν αργότερα) και
+    ξαναϋπολογίζει μόνο αυτές από το ιστορικό τους.
+    """
+    t0 = time.perf_counter()
+    ensure_tables()
+    if not _use_store():
+        ensure_indexes()
+    with engine.connect() as conn:
+        high_water = None if full else _get_meta(conn, "high_water")
+
+    if high_water is None:
+        mode = "full"
+        matches = load_matches()
+        teams = None
+    else:
+        mode = "incremental"
+        since = (datetime.strptime(high_water, "%Y-%m-%d") - timedelta(days=GOALMATRIX_LOOKBACK_DAYS)).strftime("%Y-%m-%d")
+        recent = load_matches(since=since)
+        recent = recent.dropna(subset=["hg", "ag"])
+        teams = sorted(set(recent["home"]) | set(recent["away"]))
+        # το νέο παράθυρο κάθε ομάδας ⊆ (παλιό παράθυρο ∪ νεότεροι αγώνες) → αρκεί
+        # το ιστορικό από το παλιότερο window_start (νέες ομάδες: όλο το ιστορικό)
+        starts = _window_starts(teams)
+        window_from = min(starts.values()) if teams and len(starts) == len(teams) else None
+        matches = load_matches(since=window_from, teams=teams) if teams else recent.iloc[0:0]
+
+    stats = compute_team_stats(matches)
+    if teams is not None:
+        # οι αντίπαλοι εμφανίζονται με μερικό ιστορικό → μόνο οι affected ομάδες
+        stats = stats[stats["team"].isin(teams)]
+    ts = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+    rows = stats.astype(object).where(stats.notna(), None).to_dict("records")
+    for r in rows:
+        r["ts"] = ts
+    played = matches.dropna(subset=["hg", "ag"])["date"]
+    new_water = max(filter(None, [high_water, played.max() if len(played) else None]), default=None)
+
+    with engine.begin() as conn:
+        if mode == "full":
+            conn.execute(text("DELETE FROM goal_matrix_cache"))
+        if rows:
+            conn.execute(_UPSERT, rows)
+        if new_water:
+            _set_meta(conn, "high_water", new_water)
+
+    reload_served()
+    with _lock:
+        _served["refreshed_at"] = time.time()
+    return {"mode": mode, "teams": len(rows), "high_water": new_water,
+            "seconds": round(time.perf_counter() - t0, 3)}
+
+
+def _load_served():
+    with engine.connect() as conn:
+        result = conn.execute(text(f"""
+            SELECT team, league, {", ".join(STAT_COLUMNS)}, last_match, updated_at
+            FROM goal_matrix_cache ORDER BY league, team
+        """))
+        rows = []
+        for r in result.mappings():
+            rows.append({
+                "team": r["team"],
+                "league": r["league"],
+                "matches": r["matches"],
+                "avg_goals_for": r["avg_goals_for"],
+                "avg_goals_against": r["avg_goals_against"],
+                "btts": f"{r['btts_pct']:.0f}%",
+                "over15": f"{r['over15_pct']:.0f}%",
+                "over25": f"{r['over25_pct']:.0f}%",
+                "over35": f"{r['over35_pct']:.0f}%",
+                "last_match": r["last_match"],
+                "smart_flag": "✅" if r["over25_pct"] >= GOALMATRIX_FLAG_OVER25 else "⚠️",
+            })
+    return rows
+
+
+def reload_served():
+    """Διαβάζει τον goal_matrix_cache εκτός lock και κάνει swap τα served rows."""
+    rows = _load_served()
+    timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+    with _lock:
+        _served["rows"], _served["timestamp"], _served["loaded"] = rows, timestamp, True
+
+
+def _background_refresh():
+    try:
+        info = refresh_cache()
+        print(f"[GOALMATRIX] ♻️ {info['mode']} refresh: {info['teams']} teams in {info['seconds']}s")
+    except Exception as e:
+        print(f"[GOALMATRIX] ⚠️ Refresh failed: {e}")
+    finally:
+        with _lock:
+            _served["refreshing"] = False
+
+
+def refresh_in_background() -> bool:
+    """Ξεκινά refresh σε daemon thread (το πολύ ένα τη φορά)· False αν τρέχει ήδη."""
+    with _lock:
+        if _served["refreshing"]:
+            return False
+        _served["refreshing"] = True
+        _served["refreshed_at"] = time.time()
+    threading.Thread(target=_background_refresh, name="goalmatrix-refresh", daemon=True).start()
+    return True
+
+
+# ------------------------------------------------
+# Public API
+# ------------------------------------------------
+def get_goal_matrix_data(league: str = None, limit: int = None):
+    """
+    Επιστρέφει {"timestamp", "rows"} από το in-memory αντίγραφο του cache.
+    Όταν περάσουν GOALMATRIX_REFRESH δευτ. ξεκινά background refresh·
+    το request σερβίρει αμέσως τα τρέχοντα rows.
+    """
+    if limit is not None and int(limit) < 1:
+        raise ValueError("limit must be >= 1")
+    with _lock:
+        loaded = _served["loaded"]
+        due = time.time() - _served["refreshed_at"] > GOALMATRIX_REFRESH
+    if not loaded:
+        # πρώτο request του process: ό,τι υπάρχει ήδη στον πίνακα (απλό SELECT, όχι refresh)
+        try:
+            ensure_tables()
+            reload_served()
+        except Exception as e:
+            print(f"[GOALMATRIX] ⚠️ Cache read failed: {e}")
+            with _lock:
+                _served["loaded"] = True  # το background refresh θα φορτώσει τα rows
+    if due:
+        refresh_in_background()
+    with _lock:
+        rows = _served["rows"]
+        timestamp = _served["timestamp"]
+
+    if league:
+        rows = [r for r in rows if r["league"] == league]
+    if limit:
+        rows = rows[:int(limit)]
+    return {"timestamp": timestamp, "rows": rows}
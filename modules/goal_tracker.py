@@ -4,18 +4,26 @@
 import requests
 from datetime import datetime
 
+from modules.goal_hazard import GoalHazardEngine, shared_prior
+
+# In-play goal hazards: κρατά κατάσταση ανά αγώνα ανάμεσα στα polls,
+# με pre-match λ/μ από τα Dixon-Coles fits (GOALMATRIX_ALERT_THRESHOLD)
+hazard_engine = GoalHazardEngine(prior=shared_prior())
+
 def fetch_live_goals():
     """
     Ελέγχει για live αγώνες από το Sofascore API
-    και εντοπίζει νέα goals. Επιστρέφει λίστα με alerts.
+    και εντοπίζει νέα goals. Επιστρέφει λίστα με alerts
+    (goals + goal_hazard threshold crossings).
     """
     alerts = []
     try:
         url = "https://api.sofascore.com/api/v1/sport/football/events/live"
         res = requests.get(url, timeout=8)
         data = res.json()
+        events = data.get("events", [])
 
-        for event in data.get("events", []):
+        for event in events:
             home = event["homeTeam"]["name"]
             away = event["awayTeam"]["name"]
             score_home = event["homeScore"]["current"]
@@ -30,8 +38,13 @@ def fetch_live_goals():
                     "timestamp": datetime.now().isoformat()
                 })
 
+        # Όλοι οι live αγώνες σε ένα vectorized βήμα
+        for a in hazard_engine.poll_sofascore(events):
+            a["alert_type"] = a.pop("type")
+            alerts.append(a)
+
         if alerts:
-            print(f"[GOAL TRACKER] ✅ {len(alerts)} new goal(s) detected.")
+            print(f"[GOAL TRACKER] ✅ {len(alerts)} new alert(s) detected.")
         else:
             print("[GOAL TRACKER] No new goals right now.")
 
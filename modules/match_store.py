@@ -0,0 +1,282 @@
+# ============================================================
+# modules/match_store.py
+# Columnar match store: Parquet partitioned by Season / LeagueCode
+# (ή όποια partition_cols δοθούν, π.χ. Date για τα fixtures)
+# ============================================================
+# - append(): γράφει ένα νέο part file ανά partition που αγγίζει
+#   το batch (καμία επανεγγραφή των υπολοίπων)
+# - read(): pyarrow.dataset με hive partitions → τα filters σε
+#   Season/LeagueCode κλαδεύουν αρχεία, τα υπόλοιπα πάνε στα
+#   row-group statistics· dedupe στο key με "τελευταίο κερδίζει"
+# - Key index (_key_index.parquet): hash του uniqueness key →
+#   digest γραμμής + partition· το append γράφει μόνο inserts και
+#   πραγματικά updates και σημειώνει τα partitions ως dirty
+# - compact(): ενώνει τα parts των dirty partitions σε ένα (write + rename)·
+#   rows που το index δείχνει πλέον σε άλλο partition (π.χ. αναβολή
+#   αγώνα → άλλη Date) πετιούνται
+# - Excel: μόνο export on demand (όχι πλέον η βάση δεδομένων)
+# ============================================================
+
+import json
+import os
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+    ARROW_ENABLED = True
+except Exception:
+    ARROW_ENABLED = False
+
+PARTITION_COLS = ["Season", "LeagueCode"]
+DEFAULT_KEY = ["Date", "LeagueCode", "HomeTeam", "AwayTeam"]
+UNKNOWN = "unknown"
+_SEQ = "_ingested"
+_INDEX_FILE = "_key_index.parquet"  # '_' → δεν το βλέπει το dataset
+_DIRTY_FILE = "_dirty.json"
+
+
+class MatchStore:
+    def __init__(self, root, dtypes: dict, key=None, partition_cols=None):
+        if not ARROW_ENABLED:
+            raise RuntimeError("pyarrow is required for MatchStore (pip install pyarrow)")
+        self.root = str(root)
+        self.dtypes = dict(dtypes)
+        self.columns = list(self.dtypes)
+        self.key = list(key or DEFAULT_KEY)
+        self.partition_cols = list(partition_cols or PARTITION_COLS)
+        os.makedirs(self.root, exist_ok=True)
+        empty = pd.DataFrame({c: pd.Series(dtype=t) for c, t in self.dtypes.items()})
+        fields = [f for f in pa.Schema.from_pandas(empty, preserve_index=False) if f.name not in self.partition_cols]
+        self._file_schema = pa.schema(fields + [pa.field(_SEQ, pa.int64())])
+        self._partitioning = ds.partitioning(
+            pa.schema([(c, pa.string()) for c in self.partition_cols]), flavor="hive")
+        self.last_append = {"inserted": 0, "updated": 0, "unchanged": 0}
+        self._dirty = self._load_dirty()
+        self._index = self._load_index()
+
+    # -------- key index --------
+    def _hashes(self, df):
+        """(key hash, row digest) ως uint64 – ντετερμινιστικά ανάμεσα σε runs."""
+        keys = pd.util.hash_pandas_object(df[self.key], index=False).to_numpy(np.uint64)
+        digest = pd.util.hash_pandas_object(df[self.columns], index=False).to_numpy(np.uint64)
+        return keys, digest
+
+    def _load_index(self):
+        path = os.path.join(self.root, _INDEX_FILE)
+        if os.path.exists(path):
+            return pq.read_table(path).to_pandas()
+        index = pd.DataFrame({"key": np.array([], np.uint64), "digest": np.array([], np.uint64),
+                              **{c: pd.Series([], dtype="string") for c in self.partition_cols}})
+        if self.partitions():
+            # store πριν το index: ένα πλήρες πέρασμα για να χτιστεί (με dedupe)
+            self._dirty.update(self.partitions())
+            self._save_dirty()
+            existing = self.read()
+            keys, digest = self._hashes(existing)
+            index = pd.DataFrame({"key": keys, "digest": digest,
+                                  **{c: existing[c].astype("string").to_numpy() for c in self.partition_cols}})
+            self._save_index(index)
+        return index
+
+    def _save_index(self, index):
+        path = os.path.join(self.root, _INDEX_FILE)
+        tmp = os.path.join(self.root, f".{_INDEX_FILE}.tmp")
+        pq.write_table(pa.Table.from_pandas(index, preserve_index=False), tmp)
+        os.replace(tmp, path)
+
+    def _load_dirty(self):
+        try:
+            with open(os.path.join(self.root, _DIRTY_FILE), "r", encoding="utf-8") as f:
+                return {tuple(p) for p in json.load(f)}
+        except (FileNotFoundError, ValueError):
+            return set()
+
+    def _save_dirty(self):
+        path = os.path.join(self.root, _DIRTY_FILE)
+        with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+            json.dump(sorted(self._dirty), f)
+        os.replace(f"{path}.tmp", path)
+
+    @property
+    def dirty(self):
+        return sorted(self._dirty)
+
+    # -------- layout --------
+    def _partition_dir(self, *values):
+        return os.path.join(self.root, *(f"{c}={v}" for c, v in zip(self.partition_cols, values)))
+
+    def partitions(self):
+        out = [()]
+        for col in self.partition_cols:
+            level = []
+            for prefix in out:
+                base = self._partition_dir(*prefix)
+                for name in sorted(os.listdir(base)):
+                    if name.startswith(f"{col}=") and os.path.isdir(os.path.join(base, name)):
+                        level.append(prefix + (name.split("=", 1)[1],))
+            out = level
+        return out
+
+    @staticmethod
+    def _parts(path):
+        try:
+            return sorted(f for f in os.listdir(path) if f.endswith(".parquet") and not f.startswith("."))
+        except FileNotFoundError:
+            return []
+
+    def _write(self, path, frame):
+        """Atomic εγγραφή ενός part file (τα αρχεία με '.' αγνοούνται από το dataset)."""
+        os.makedirs(path, exist_ok=True)
+        name = f"part-{time.time_ns()}-{uuid.uuid4().hex[:8]}.parquet"
+        tmp = os.path.join(path, f".{name}.tmp")
+        table = pa.Table.from_pandas(frame, schema=self._file_schema, preserve_index=False)
+        pq.write_table(table, tmp)
+        os.replace(tmp, os.path.join(path, name))
+        return name
+
+    def _normalize(self, df):
+        df = df.copy()
+        for col in self.columns:
+            if col not in df.columns:
+                df[col] = None
+        df = df[self.columns].astype(self.dtypes)
+        for col in self.partition_cols:
+            df[col] = df[col].fillna(UNKNOWN)
+        return df
+
+    # -------- write --------
+    def append(self, df: pd.DataFrame):
+        """
+        Γράφει μόνο τα rows του batch που είναι νέα ή άλλαξαν (βάσει key index)·
+        επιστρέφει τα partitions (π.χ. (Season, LeagueCode)) που άγγιξε. Τα
+        partitions σημειώνονται dirty μέχρι το επόμενο compact(), μαζί με όσα
+        έχασαν ένα key που μετακινήθηκε.
+        """
+        self.last_append = {"inserted": 0, "updated": 0, "unchanged": 0}
+        if df is None or df.empty:
+            return []
+        df = self._normalize(df).drop_duplicates(subset=self.key, keep="last")
+        keys, digest = self._hashes(df)
+
+        pos = pd.Index(self._index["key"]).get_indexer(keys)
+        known = pos >= 0
+        old_digest = self._index["digest"].to_numpy(np.uint64)
+        changed = ~known
+        changed[known] = old_digest[pos[known]] != digest[known]
+        self.last_append = {"inserted": int((~known).sum()), "updated": int((known & changed).sum()),
+                            "unchanged": int((known & ~changed).sum())}
+        if not changed.any():
+            return []
+
+        delta = df[changed].copy()
+        delta[_SEQ] = time.time_ns()
+        touched = []
+        for values, part in delta.groupby(self.partition_cols, sort=False):
+            values = values if isinstance(values, tuple) else (values,)
+            self._write(self._partition_dir(*values), part.drop(columns=self.partition_cols))
+            touched.append(tuple(values))
+
+        # index: updates in place (μαζί με το partition), inserts στο τέλος
+        upd = known & changed
+        old_digest = old_digest.copy()
+        old_digest[pos[upd]] = digest[upd]
+        index = self._index.assign(digest=old_digest)
+        old_home = index[self.partition_cols].astype(object).to_numpy()[pos[upd]]
+        new_home = df[self.partition_cols].astype(object).to_numpy()[upd]
+        moved = {tuple(v) for v in old_home[(old_home != new_home).any(axis=1)]}
+        for i, col in enumerate(self.partition_cols):
+            values = index[col].to_numpy(dtype=object, copy=True)
+            values[pos[upd]] = new_home[:, i]
+            index[col] = pd.array(values, dtype="string")
+        ins = ~known
+        if ins.any():
+            index = pd.concat([index, pd.DataFrame({
+                "key": keys[ins], "digest": digest[ins],
+                **{c: pd.array(df[c].to_numpy(dtype=object)[ins], dtype="string") for c in self.partition_cols},
+            })], ignore_index=True)
+        self._index = index
+        self._save_index(index)
+        self._dirty.update(touched)
+        self._dirty.update(moved)
+        self._save_dirty()
+        return touched
+
+    def compact(self, partitions=None, min_files: int = 2):
+        """
+        Ενώνει (με dedupe) τα part files των partitions (default: τα dirty) σε ένα.
+        Rows με key που το index τοποθετεί σε άλλο partition αφαιρούνται.
+        """
+        compacted = 0
+        targets = self.dirty if partitions is None else [tuple(p) for p in partitions]
+        lookup = pd.Index(self._index["key"])
+        homes = self._index[self.partition_cols].astype(object).to_numpy()
+        for values in targets:
+            path = self._partition_dir(*values)
+            parts = self._parts(path)
+            if parts:
+                table = pq.ParquetDataset([os.path.join(path, p) for p in parts], schema=self._file_schema).read()
+                frame = table.to_pandas()
+                for col, value in zip(self.partition_cols, values):
+                    frame[col] = pd.array([value] * len(frame), dtype="string")
+                keys, _ = self._hashes(self._normalize(frame))
+                pos = lookup.get_indexer(keys)
+                home = pos >= 0
+                if home.any():
+                    home[home] = (homes[pos[home]] == np.array(values, dtype=object)).all(axis=1)
+                if len(parts) >= min_files or not home.all():
+                    # μέσα σε ένα partition οι partition στήλες είναι σταθερές
+                    frame = self._dedupe(frame[home], [c for c in self.key if c not in self.partition_cols])
+                    if len(frame):
+                        self._write(path, frame.drop(columns=self.partition_cols))
+                    for p in parts:
+                        os.remove(os.path.join(path, p))
+                    compacted += 1
+            self._dirty.discard(tuple(values))
+        self._save_dirty()
+        return compacted
+
+    # -------- read --------
+    def _dedupe(self, frame, key=None):
+        if frame.empty:
+            return frame
+        frame = frame.sort_values(_SEQ, kind="stable")
+        return frame.drop_duplicates(subset=key or self.key, keep="last")
+
+    def read(self, filters=None, columns=None) -> pd.DataFrame:
+        """
+        filters: pyarrow expression ή DNF λίστα όπως στο pd.read_parquet,
+        π.χ. [("Season", "=", "2025-26"), ("LeagueCode", "in", ["ENG1", "GRE1"])].
+        """
+        if not self.partitions():
+            return self._normalize(pd.DataFrame(columns=self.columns)).iloc[0:0]
+        dataset = ds.dataset(self.root, format="parquet", partitioning=self._partitioning,
+                             schema=pa.unify_schemas([self._file_schema, self._partitioning.schema]))
+        if filters is not None and not isinstance(filters, ds.Expression):
+            filters = pq.filters_to_expression(filters)
+        wanted = None
+        if columns is not None:
+            wanted = list(dict.fromkeys(list(columns) + self.key + [_SEQ]))
+        frame = dataset.to_table(filter=filters, columns=wanted).to_pandas()
+        if self._dirty:
+            frame = self._dedupe(frame)  # καθαρά partitions έχουν ήδη μοναδικά keys
+        cols = [c for c in (columns or self.columns) if c in frame.columns]
+        frame = frame[cols].reset_index(drop=True)
+        return frame.astype({c: t for c, t in self.dtypes.items() if c in frame.columns})
+
+    # -------- Excel (on demand) --------
+    def export_excel(self, excel_path, sheet_name="Matches", filters=None, sort_by=("Date", "LeagueCode")):
+        df = self.read(filters=filters)
+        df = df.sort_values([c for c in sort_by if c in df.columns], kind="stable")
+        try:
+            with pd.ExcelWriter(excel_path, engine="openpyxl", mode="a", if_sheet_exists="replace") as writer:
+                df.to_excel(writer, sheet_name=sheet_name, index=False)
+        except FileNotFoundError:
+            with pd.ExcelWriter(excel_path, engine="openpyxl") as writer:
+                df.to_excel(writer, sheet_name=sheet_name, index=False)
+        return len(df)
@@ -0,0 +1,151 @@
+# ============================================================
+# modules/moneyflow_engine.py
+# Batch (NumPy) Money-Flow engine – 1X2 start/current odds → MFI%
+# ============================================================
+# Ίδια λογική με τα scalar _dec_to_imp / _norm3 / _money_flow /
+# _movement_label του smartmoney_monitor, αλλά για όλο το slate
+# σε ένα πέρασμα. Οι αποδόσεις κρατιούνται σε πίνακες (n, 3)
+# με στήλες 1 / X / 2.
+# ============================================================
+
+import numpy as np
+
+OUTCOMES = ("1", "X", "2")
+DEFAULT_LABELS = ("Home", "Draw", "Away")
+
+
+def implied_probs(odds):
+    """Decimal odds (n, 3) → implied probabilities (0 για κενές ή <= 1.0)."""
+    odds = np.asarray(odds, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(odds > 1.0, 1.0 / odds, 0.0)
+
+
+def normalise(probs):
+    """Αφαιρεί το overround: κάθε γραμμή αθροίζει σε 1 (ή 0 αν δεν υπάρχει τιμή)."""
+    s = probs[:, 0] + probs[:, 1] + probs[:, 2]  # ίδια σειρά άθροισης με το _norm3
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = probs / s[:, None]
+    out[s <= 0] = 0.0
+    return out
+
+
+def money_flow_raw(start, current):
+    """MFI% χωρίς στρογγυλοποίηση (n,)."""
+    ps = normalise(implied_probs(start))
+    pc = normalise(implied_probs(current))
+    diff = np.abs(pc - ps)
+    d = (diff[:, 0] + diff[:, 1] + diff[:, 2]) / 3.0
+    return np.minimum(100.0, 100.0 * d * 3.5)
+
+
+def money_flow(start, current):
+    """MFI% στρογγυλεμένο σε 1 δεκαδικό, ακριβώς όπως το round() της Python."""
+    raw = money_flow_raw(start, current)
+    out = np.round(raw, 1).tolist()
+    # Το np.round μπορεί να διαφέρει από το round() μόνο κοντά στο .x5 – εκεί κάνουμε scalar round
+    frac = raw * 10.0 - np.floor(raw * 10.0)
+    for i in np.flatnonzero(np.abs(frac - 0.5) < 1e-6).tolist():
+        out[i] = round(float(raw[i]), 1)
+    return out
+
+
+def movement_labels(start, current, labels=DEFAULT_LABELS):
+    """Η έκβαση με τη μεγαλύτερη μεταβολή απόδοσης + ↑ (έπεσε η απόδοση) / ↓."""
+    deltas = np.asarray(start, dtype=np.float64) - np.asarray(current, dtype=np.float64)
+    idx = np.argmax(np.abs(deltas), axis=1)  # πρώτο μέγιστο, όπως το max() στα scalar
+    up = deltas[np.arange(len(deltas)), idx] > 0
+    table = np.array([[f"{l}↓", f"{l}↑"] for l in labels], dtype=object)
+    return table[idx, up.astype(np.intp)].tolist()
+
+
+def odds_matrix(rows):
+    """Λίστα από dicts {"1","X","2"} → πίνακας (n, 3)."""
+    # None → NaN μέσω του dtype=float64
+    return np.array([(o["1"], o["X"], o["2"]) for o in rows], dtype=np.float64).reshape(-1, 3)
+
+
+class MoneyFlowEngine:
+    """
+    Κρατά start / current 1X2 odds για κάθε match που παρακολουθούμε
+    και υπολογίζει MFI% + movement για όλο το slate μαζί.
+    """
+
+    def __init__(self, capacity: int = 256, labels=DEFAULT_LABELS):
+        self.labels = tuple(labels)
+        self._index = {}   # match key -> row
+        self._keys = []
+        self._start = np.full((capacity, 3), np.nan)
+        self._current = np.full((capacity, 3), np.nan)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, match_key):
+        return match_key in self._index
+
+    def _row(self, mk, odds):
+        row = self._index.get(mk)
+        if row is None:
+            row = len(self._keys)
+            if row >= len(self._start):
+                grow = max(256, len(self._start))
+                self._start = np.vstack([self._start, np.full((grow, 3), np.nan)])
+                self._current = np.vstack([self._current, np.full((grow, 3), np.nan)])
+            self._index[mk] = row
+            self._keys.append(mk)
+            self._start[row] = [odds[k] for k in OUTCOMES]
+        return row
+
+    def update(self, merged):
+        """merged: {match key: {"1","X","2"}} – το πρώτο snapshot μένει ως start."""
+        rows = np.fromiter((self._row(mk, o) for mk, o in merged.items()), dtype=np.intp, count=len(merged))
+        if len(rows):
+            self._current[rows] = odds_matrix(list(merged.values()))
+        return rows
+
+    def start_odds(self, match_key):
+        row = self._index.get(match_key)
+        if row is None:
+            return None
+        return dict(zip(OUTCOMES, self._start[row].tolist()))
+
+    def remove(self, match_keys):
+        """Αφαιρεί matches (π.χ. τελειωμένα) και συμπτύσσει τους πίνακες."""
+        drop = {self._index[mk] for mk in match_keys if mk in self._index}
+        if not drop:
+            return
+        keep = [r for r in range(len(self._keys)) if r not in drop]
+        n = len(keep)
+        self._start[:n] = self._start[keep]
+        self._current[:n] = self._current[keep]
+        self._start[n:] = np.nan
+        self._current[n:] = np.nan
+        self._keys = [self._keys[r] for r in keep]
+        self._index = {mk: i for i, mk in enumerate(self._keys)}
+
+    def compute(self, rows=None):
+        """Επιστρέφει (keys, start, current, mfi, movement) για τις δοσμένες γραμμές (ή όλες)."""
+        if rows is None:
+            rows = np.arange(len(self._keys))
+        start = self._start[rows]
+        cur = self._current[rows]
+        keys = [self._keys[r] for r in rows.tolist()]
+        return keys, start, cur, money_flow(start, cur), movement_labels(start, cur, self.labels)
+
+    def feed(self, merged, timestamp):
+        """update() + compute() → γραμμές feed στη μορφή του SmartMoney monitor."""
+        rows = self.update(merged)
+        keys, start, _, mfi, mov = self.compute(rows)
+        out = []
+        for mk, s, m, v in zip(keys, start.tolist(), mov, mfi):
+            out.append({
+                "match": mk,
+                "market": "1X2",
+                "start_odds": dict(zip(OUTCOMES, s)),
+                "current_odds": merged[mk],
+                "movement": m,
+                "money_flow": v,
+                "timestamp": timestamp
+            })
+        return out
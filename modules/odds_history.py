@@ -0,0 +1,226 @@
+# ============================================================
+# modules/odds_history.py
+# Bounded per-match odds history (ring buffer) + disk checkpoint
+# ============================================================
+# Για κάθε match κρατάμε:
+#   - opening 1X2 τιμές (δεν γράφονται ποτέ από πάνω)
+#   - τα τελευταία `depth` timestamped snapshots (μόνο όταν αλλάζει η τιμή)
+# Όλα είναι σε προ-δεσμευμένους NumPy πίνακες· τα slots των matches
+# που τελείωσαν ξαναχρησιμοποιούνται, άρα η μνήμη μένει σταθερή.
+# Το checkpoint γράφεται σε .npz (write + rename) ώστε ένα restart
+# να κρατά τις opening τιμές.
+# ============================================================
+
+import os
+import time
+
+import numpy as np
+
+from modules.moneyflow_engine import OUTCOMES, money_flow, odds_matrix
+
+DEFAULT_WINDOWS = (5, 15, 60)  # λεπτά
+
+
+class OddsHistory:
+    def __init__(self, depth: int = 120, capacity: int = 512):
+        self.depth = max(2, int(depth))
+        self._index = {}   # match key -> slot
+        self._keys = {}    # slot -> match key
+        self._free = []
+        self._alloc(max(1, int(capacity)))
+
+    # -------- storage --------
+    def _alloc(self, capacity):
+        self._ts = np.full((capacity, self.depth), np.nan)
+        self._px = np.full((capacity, self.depth, 3), np.nan)
+        self._open = np.full((capacity, 3), np.nan)
+        self._open_ts = np.full(capacity, np.nan)
+        self._last_seen = np.full(capacity, np.nan)
+        self._head = np.zeros(capacity, dtype=np.intp)
+        self._count = np.zeros(capacity, dtype=np.intp)
+        self._free = list(range(capacity - 1, -1, -1))
+
+    def _grow(self):
+        old = len(self._head)
+        pad = max(64, old)
+        self._ts = np.vstack([self._ts, np.full((pad, self.depth), np.nan)])
+        self._px = np.concatenate([self._px, np.full((pad, self.depth, 3), np.nan)])
+        self._open = np.vstack([self._open, np.full((pad, 3), np.nan)])
+        self._open_ts = np.concatenate([self._open_ts, np.full(pad, np.nan)])
+        self._last_seen = np.concatenate([self._last_seen, np.full(pad, np.nan)])
+        self._head = np.concatenate([self._head, np.zeros(pad, dtype=np.intp)])
+        self._count = np.concatenate([self._count, np.zeros(pad, dtype=np.intp)])
+        self._free.extend(range(old + pad - 1, old - 1, -1))
+
+    def _slot(self, mk):
+        slot = self._index.get(mk)
+        if slot is None:
+            if not self._free:
+                self._grow()
+            slot = self._free.pop()
+            self._index[mk] = slot
+            self._keys[slot] = mk
+        return slot
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, match_key):
+        return match_key in self._index
+
+    # -------- write --------
+    def record(self, merged, ts=None):
+        """merged: {match key: {"1","X","2"}}. Γράφει snapshot μόνο όπου άλλαξε η τιμή."""
+        if not merged:
+            return
+        ts = time.time() if ts is None else float(ts)
+        slots = np.array([self._slot(mk) for mk in merged], dtype=np.intp)
+        px = odds_matrix(list(merged.values()))
+
+        new = np.isnan(self._open_ts[slots])
+        self._open[slots[new]] = px[new]
+        self._open_ts[slots[new]] = ts
+        self._last_seen[slots] = ts
+
+        last = self._px[slots, (self._head[slots] - 1) % self.depth]
+        changed = new | (self._count[slots] == 0) | np.any(last != px, axis=1)
+        s, p = slots[changed], px[changed]
+        pos = self._head[s]
+        self._ts[s, pos] = ts
+        self._px[s, pos] = p
+        self._head[s] = (pos + 1) % self.depth
+        self._count[s] = np.minimum(self._count[s] + 1, self.depth)
+
+    def evict(self, match_keys):
+        """Αφαιρεί matches (π.χ. τελειωμένα) και ελευθερώνει τα slots τους."""
+        removed = []
+        for mk in match_keys:
+            slot = self._index.pop(mk, None)
+            if slot is None:
+                continue
+            del self._keys[slot]
+            self._ts[slot] = np.nan
+            self._px[slot] = np.nan
+            self._open[slot] = np.nan
+            self._open_ts[slot] = np.nan
+            self._last_seen[slot] = np.nan
+            self._head[slot] = 0
+            self._count[slot] = 0
+            self._free.append(slot)
+            removed.append(mk)
+        return removed
+
+    def evict_stale(self, max_age: float, now=None):
+        """Matches που δεν εμφανίστηκαν στο feed για `max_age` δευτ. θεωρούνται τελειωμένα."""
+        now = time.time() if now is None else now
+        stale = [mk for mk, slot in self._index.items() if now - self._last_seen[slot] > max_age]
+        return self.evict(stale)
+
+    # -------- read --------
+    def opening(self, match_key):
+        slot = self._index.get(match_key)
+        if slot is None:
+            return None
+        return dict(zip(OUTCOMES, self._open[slot].tolist()))
+
+    def openings(self):
+        return {mk: dict(zip(OUTCOMES, self._open[slot].tolist())) for mk, slot in self._index.items()}
+
+    def snapshots(self, match_key):
+        """[(ts, {"1","X","2"}), ...] από το παλαιότερο στο νεότερο."""
+        slot = self._index.get(match_key)
+        if slot is None:
+            return []
+        n, head = int(self._count[slot]), int(self._head[slot])
+        order = [(head - n + i) % self.depth for i in range(n)]
+        return [(float(self._ts[slot, i]), dict(zip(OUTCOMES, self._px[slot, i].tolist()))) for i in order]
+
+    def _latest(self, slots):
+        return self._px[slots, (self._head[slots] - 1) % self.depth]
+
+    def _as_of(self, slots, cutoff):
+        """Τιμή στο `cutoff` για κάθε slot (ή η παλαιότερη διαθέσιμη αν το ιστορικό είναι πιο κοντό)."""
+        ts = self._ts[slots]
+        before = np.where(ts <= cutoff, ts, -np.inf)
+        idx = np.argmax(before, axis=1)
+        has_before = np.isfinite(before[np.arange(len(slots)), idx])
+        oldest = np.argmin(np.where(np.isnan(ts), np.inf, ts), axis=1)
+        idx = np.where(has_before, idx, oldest)
+        return self._px[slots, idx]
+
+    def window_flow(self, match_keys, windows=DEFAULT_WINDOWS, now=None):
+        """
+        MFI% των τελευταίων N λεπτών για κάθε match.
+        Επιστρέφει {match key: {"flow_5m": .., "flow_15m": .., ...}}.
+        """
+        keys = [mk for mk in match_keys if mk in self._index]
+        if not keys:
+            return {}
+        now = time.time() if now is None else now
+        slots = np.array([self._index[mk] for mk in keys], dtype=np.intp)
+        cur = self._latest(slots)
+        out = {mk: {} for mk in keys}
+        for w in windows:
+            mfi = money_flow(self._as_of(slots, now - w * 60), cur)
+            for mk, v in zip(keys, mfi):
+                out[mk][f"flow_{w}m"] = v
+        return out
+
+    # -------- checkpoint --------
+    def save(self, path):
+        """Ατομικό checkpoint (γράφουμε σε .tmp και κάνουμε rename)."""
+        keys = list(self._index)
+        slots = np.array([self._index[mk] for mk in keys], dtype=np.intp)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez(
+                f,
+                depth=np.array(self.depth),
+                keys=np.array(keys, dtype=str),
+                ts=self._ts[slots], px=self._px[slots],
+                open=self._open[slots], open_ts=self._open_ts[slots],
+                last_seen=self._last_seen[slots],
+                head=self._head[slots], count=self._count[slots],
+            )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path, depth: int = 120, capacity: int = 512):
+        """Φορτώνει checkpoint· αν λείπει ή είναι χαλασμένο επιστρέφει άδειο history."""
+        hist = cls(depth=depth, capacity=capacity)
+        if not os.path.exists(path):
+            return hist
+        try:
+            with np.load(path) as z:
+                keys = z["keys"].tolist()
+                saved_depth = int(z["depth"])
+                ts, px, head, count = z["ts"], z["px"], z["head"], z["count"]
+                if saved_depth != hist.depth:
+                    ts, px, head, count = _resize(ts, px, head, count, saved_depth, hist.depth)
+                while len(hist._head) < len(keys):
+                    hist._grow()
+                slots = np.array([hist._slot(mk) for mk in keys], dtype=np.intp)
+                if len(slots):
+                    hist._ts[slots], hist._px[slots] = ts, px
+                    hist._open[slots], hist._open_ts[slots] = z["open"], z["open_ts"]
+                    hist._last_seen[slots] = z["last_seen"]
+                    hist._head[slots], hist._count[slots] = head, count
+        except Exception as e:
+            print(f"[SMARTMONEY] ⚠️ Odds history checkpoint ignored: {e}")
+            return cls(depth=depth, capacity=capacity)
+        return hist
+
+
+def _resize(ts, px, head, count, old_depth, new_depth):
+    """Ξαναστοιχίζει τα ring buffers σε νέο depth κρατώντας τα νεότερα snapshots."""
+    n = len(head)
+    new_ts = np.full((n, new_depth), np.nan)
+    new_px = np.full((n, new_depth, 3), np.nan)
+    keep = np.minimum(count, new_depth)
+    for i in range(n):
+        k = int(keep[i])
+        order = [(int(head[i]) - k + j) % old_depth for j in range(k)]
+        new_ts[i, :k] = ts[i, order]
+        new_px[i, :k] = px[i, order]
+    return new_ts, new_px, keep % new_depth, keep
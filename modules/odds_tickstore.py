@@ -0,0 +1,296 @@
+# ============================================================
+# modules/odds_tickstore.py
+# Date-sharded odds tick store (SQLite) + OHLC rollups + retention
+# ============================================================
+# - Raw ticks: ένα SQLite αρχείο ανά ημέρα (odds_YYYYMMDD.db)
+#   → το retention είναι απλό unlink ολόκληρου αρχείου
+# - Bars: 1-minute και 15-minute OHLC στο odds_bars.db
+#   (rollup incremental με watermark ανά shard)
+# - Queries ανοίγουν μόνο τα shards που καλύπτει το εύρος
+# ============================================================
+
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from itertools import islice
+from datetime import datetime, timedelta, timezone
+
+RESOLUTIONS = {"1m": 60, "15m": 900}
+_SHARD_RE = re.compile(r"^odds_(\d{8})\.db$")
+
+_TICKS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ticks (
+    id INTEGER PRIMARY KEY,
+    match_id INTEGER,
+    book TEXT,
+    market TEXT,
+    line REAL,
+    price REAL,
+    ts REAL
+);
+CREATE INDEX IF NOT EXISTS ix_ticks_ts ON ticks (ts);
+CREATE INDEX IF NOT EXISTS ix_ticks_match_ts ON ticks (match_id, ts);
+"""
+
+# Το line μπαίνει στο PRIMARY KEY ως TEXT ('' = χωρίς line) γιατί τα NULL δεν συγκρούονται
+_BARS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bars (
+    res INTEGER,
+    match_id INTEGER,
+    book TEXT,
+    market TEXT,
+    line TEXT,
+    bucket REAL,
+    open REAL, high REAL, low REAL, close REAL,
+    ticks INTEGER,
+    PRIMARY KEY (res, match_id, book, market, line, bucket)
+);
+CREATE INDEX IF NOT EXISTS ix_bars_res_bucket ON bars (res, bucket);
+CREATE TABLE IF NOT EXISTS rollup_state (
+    name TEXT PRIMARY KEY,
+    value REAL
+);
+"""
+
+
+def to_epoch(ts):
+    """Naive UTC datetime (όπως το Odds.ts) / epoch → epoch seconds."""
+    if ts is None:
+        return time.time()
+    if isinstance(ts, (int, float)):
+        return float(ts)
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.timestamp()
+
+
+def from_epoch(ts):
+    return datetime.fromtimestamp(ts, tz=timezone.utc).replace(tzinfo=None)
+
+
+def _line_key(line):
+    return "" if line is None else repr(float(line))
+
+
+def _line_val(key):
+    return None if key == "" else float(key)
+
+
+class OddsTickStore:
+    def __init__(self, root, raw_retention_days: int = 7, bar_retention_days=None):
+        self.root = str(root)
+        self.raw_retention_days = int(raw_retention_days)
+        # None = κρατάμε για πάντα
+        self.bar_retention_days = bar_retention_days if bar_retention_days is not None else {"1m": 30, "15m": None}
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+        with closing(self._bars()) as con, con:
+            con.executescript(_BARS_SCHEMA)
+
+    # -------- connections --------
+    def _shard_path(self, day):
+        return os.path.join(self.root, f"odds_{day.strftime('%Y%m%d')}.db")
+
+    def _shard(self, day, create=False):
+        path = self._shard_path(day)
+        if not create and not os.path.exists(path):
+            return None
+        con = sqlite3.connect(path)
+        if create:
+            con.executescript(_TICKS_SCHEMA)
+        return con
+
+    def _bars(self):
+        return sqlite3.connect(os.path.join(self.root, "odds_bars.db"))
+
+    def shard_days(self):
+        days = []
+        for name in os.listdir(self.root):
+            m = _SHARD_RE.match(name)
+            if m:
+                days.append(datetime.strptime(m.group(1), "%Y%m%d").date())
+        return sorted(days)
+
+    def _days_between(self, since, until):
+        d, end = from_epoch(since).date(), from_epoch(until).date()
+        out = []
+        while d <= end:
+            out.append(d)
+            d += timedelta(days=1)
+        return out
+
+    # -------- write --------
+    def append(self, rows):
+        """rows: dicts με match_id, book, market, line, price, ts (datetime ή epoch)."""
+        by_day = {}
+        for r in rows:
+            ts = to_epoch(r.get("ts"))
+            by_day.setdefault(from_epoch(ts).date(), []).append(
+                (r.get("match_id"), r.get("book"), r.get("market"), r.get("line"), r.get("price"), ts))
+        with self._lock:
+            for day, batch in by_day.items():
+                con = self._shard(day, create=True)
+                try:
+                    with con:
+                        con.executemany(
+                            "INSERT INTO ticks (match_id, book, market, line, price, ts) VALUES (?, ?, ?, ?, ?, ?)", batch)
+                finally:
+                    con.close()
+        return sum(len(b) for b in by_day.values())
+
+    # -------- state --------
+    def get_state(self, name, default=0.0):
+        with closing(self._bars()) as con:
+            row = con.execute("SELECT value FROM rollup_state WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else default
+
+    def set_state(self, name, value):
+        with closing(self._bars()) as con, con:
+            con.execute("INSERT INTO rollup_state (name, value) VALUES (?, ?) "
+                        "ON CONFLICT(name) DO UPDATE SET value = excluded.value", (name, value))
+
+    # -------- rollups --------
+    def rollup(self):
+        """Ενημερώνει τα 1m / 15m bars για ό,τι μπήκε μετά το τελευταίο rollup."""
+        written = 0
+        with self._lock:
+            bars = self._bars()
+            try:
+                for day in self.shard_days():
+                    con = self._shard(day)
+                    if con is None:
+                        continue
+                    try:
+                        written += self._rollup_shard(day, con, bars)
+                    finally:
+                        con.close()
+            finally:
+                bars.close()
+        return written
+
+    def _rollup_shard(self, day, con, bars):
+        key = f"shard:{day.isoformat()}"
+        row = bars.execute("SELECT value FROM rollup_state WHERE name = ?", (key,)).fetchone()
+        last_id = int(row[0]) if row else 0
+        new = con.execute("SELECT MAX(id), MIN(ts) FROM ticks WHERE id > ?", (last_id,)).fetchone()
+        if new[0] is None:
+            return 0
+
+        written = 0
+        for res in RESOLUTIONS.values():
+            # Ξαναϋπολογίζουμε ολόκληρα τα buckets που άγγιξαν τα νέα ticks (upsert)
+            start = (new[1] // res) * res
+            cur = con.execute(
+                "SELECT match_id, book, market, line, price, ts FROM ticks WHERE ts >= ? "
+                "ORDER BY match_id, book, market, line, ts, id", (start,))
+            out = []
+            bar = None
+            for match_id, book, market, line, price, ts in cur:
+                k = (match_id, book, market, _line_key(line), (ts // res) * res)
+                if bar is None or bar[0] != k:
+                    if bar is not None:
+                        out.append(bar)
+                    bar = [k, price, price, price, price, 0]
+                bar[2] = max(bar[2], price)
+                bar[3] = min(bar[3], price)
+                bar[4] = price
+                bar[5] += 1
+            if bar is not None:
+                out.append(bar)
+            bars.executemany(
+                "INSERT INTO bars (res, match_id, book, market, line, bucket, open, high, low, close, ticks) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(res, match_id, book, market, line, bucket) DO UPDATE SET "
+                "open = excluded.open, high = excluded.high, low = excluded.low, "
+                "close = excluded.close, ticks = excluded.ticks",
+                [(res, *b[0], b[1], b[2], b[3], b[4], b[5]) for b in out])
+            written += len(out)
+        bars.execute("INSERT INTO rollup_state (name, value) VALUES (?, ?) "
+                     "ON CONFLICT(name) DO UPDATE SET value = excluded.value", (key, new[0]))
+        bars.commit()
+        return written
+
+    # -------- retention --------
+    def apply_retention(self, now=None):
+        """Σβήνει raw shards παλαιότερα από raw_retention_days και παλιά bars ανά resolution."""
+        now = time.time() if now is None else now
+        cutoff_day = from_epoch(now).date() - timedelta(days=self.raw_retention_days)
+        dropped = []
+        with self._lock:
+            bars = self._bars()
+            try:
+                for day in self.shard_days():
+                    if day < cutoff_day:
+                        con = self._shard(day)
+                        if con is not None:
+                            self._rollup_shard(day, con, bars)  # να μη χαθούν ticks χωρίς bars
+                            con.close()
+                        os.remove(self._shard_path(day))
+                        bars.execute("DELETE FROM rollup_state WHERE name = ?", (f"shard:{day.isoformat()}",))
+                        dropped.append(day)
+                for name, days in self.bar_retention_days.items():
+                    if days is not None:
+                        bars.execute("DELETE FROM bars WHERE res = ? AND bucket < ?",
+                                     (RESOLUTIONS[name], now - days * 86400))
+                bars.commit()
+            finally:
+                bars.close()
+        return dropped
+
+    # -------- read --------
+    def iter_ticks(self, since, until=None, match_ids=None, before=None):
+        """
+        Raw ticks (νεότερα πρώτα) μόνο από τα shards του εύρους, ως (key, row).
+        key = (ts, id) για keyset pagination· before = key της τελευταίας γραμμής.
+        Διαβάζει lazily, άρα ένα πλήρες export μένει σε σταθερή μνήμη.
+        """
+        since, until = to_epoch(since), to_epoch(until)
+        where, params = "ts >= ? AND ts <= ?", [since, until]
+        if before is not None:
+            where += " AND (ts < ? OR (ts = ? AND id < ?))"
+            params += [before[0], before[0], before[1]]
+            until = min(until, before[0])
+        if match_ids:
+            where += f" AND match_id IN ({','.join('?' * len(match_ids))})"
+            params += list(match_ids)
+        for day in reversed(self._days_between(since, until)):
+            con = self._shard(day)
+            if con is None:
+                continue
+            try:
+                cur = con.execute(
+                    f"SELECT id, match_id, book, market, line, price, ts FROM ticks WHERE {where} "
+                    f"ORDER BY ts DESC, id DESC", params)
+                for r in cur:
+                    yield (r[6], r[0]), {"match_id": r[1], "book": r[2], "market": r[3], "line": r[4],
+                                         "price": r[5], "ts": from_epoch(r[6]).isoformat()}
+            finally:
+                con.close()
+
+    def iter_bars(self, resolution, since, until=None, match_ids=None, before=None):
+        """OHLC bars (νεότερα πρώτα) για resolution '1m' ή '15m', ως (key, row) με key = (bucket, rowid)."""
+        res = RESOLUTIONS[resolution]
+        where, params = "res = ? AND bucket >= ? AND bucket <= ?", [res, to_epoch(since), to_epoch(until)]
+        if before is not None:
+            where += " AND (bucket < ? OR (bucket = ? AND rowid < ?))"
+            params += [before[0], before[0], before[1]]
+        if match_ids:
+            where += f" AND match_id IN ({','.join('?' * len(match_ids))})"
+            params += list(match_ids)
+        with closing(self._bars()) as con:
+            cur = con.execute(
+                f"SELECT rowid, match_id, book, market, line, bucket, open, high, low, close, ticks FROM bars "
+                f"WHERE {where} ORDER BY bucket DESC, rowid DESC", params)
+            for r in cur:
+                yield (r[5], r[0]), {"match_id": r[1], "book": r[2], "market": r[3], "line": _line_val(r[4]),
+                                     "resolution": resolution, "ts": from_epoch(r[5]).isoformat(),
+                                     "open": r[6], "high": r[7], "low": r[8], "close": r[9], "ticks": r[10]}
+
+    def query_ticks(self, since, until=None, match_ids=None, limit=1000):
+        return [row for _, row in islice(self.iter_ticks(since, until, match_ids), limit)]
+
+    def query_bars(self, resolution, since, until=None, match_ids=None, limit=1000):
+        return [row for _, row in islice(self.iter_bars(resolution, since, until, match_ids), limit)]
@@ -1,15 +1,31 @@
 # ==============================================
 # OPENFOOTBALL IMPORTER v8.4 (auto-season finder)
 # ==============================================
+# - Conditional GET (If-None-Match / If-Modified-Since) τόσο στο
+#   contents API όσο και στο en.1.json → 304 = καμία λήψη
+# - Payloads αποθηκεύονται ως έχουν κάτω από objects/<sha256>.json
+#   (content-addressed)· ίδιο hash = καμία εγγραφή στο δίσκο
+# - _index.json: ETag / Last-Modified / hash / matches ανά URL και
+#   league → season + object
+# - Οι λίγκες τρέχουν παράλληλα (OPENFOOTBALL_WORKERS)
+# ==============================================
 import os
 import requests
 import json
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 
 DATA_DIR = os.path.join("data", "openfootball_cache")
 os.makedirs(DATA_DIR, exist_ok=True)
 
-GITHUB_API_BASE = "https://api.github.com/repos/openfootball"
-RAW_BASE = "https://raw.githubusercontent.com/openfootball"
+GITHUB_API_BASE = os.getenv("OPENFOOTBALL_API_BASE", "https://api.github.com/repos/openfootball")
+RAW_BASE = os.getenv("OPENFOOTBALL_RAW_BASE", "https://raw.githubusercontent.com/openfootball")
+OPENFOOTBALL_WORKERS = int(os.getenv("OPENFOOTBALL_WORKERS", 8))
+
+INDEX_FILE = "_index.json"
+OBJECTS_DIR = "objects"
 
 LEAGUES = {
     "england": "Premier League",
@@ -29,16 +45,124 @@ LEAGUES = {
     "scotland": "Premiership"
 }
 
-def get_latest_season_folder(league):
+
+# ----------------------------------------------
+# Metadata index + content-addressed objects
+# ----------------------------------------------
+class FetchCache:
+    def __init__(self, root=DATA_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+        self._dirty = False
+        os.makedirs(os.path.join(root, OBJECTS_DIR), exist_ok=True)
+        try:
+            with open(os.path.join(root, INDEX_FILE), "r", encoding="utf-8") as f:
+                self.index = json.load(f)
+        except (FileNotFoundError, ValueError):
+            self.index = {}
+        self.index.setdefault("urls", {})
+        self.index.setdefault("leagues", {})
+
+    def url_meta(self, url):
+        with self._lock:
+            return dict(self.index["urls"].get(url, {}))
+
+    def set_url_meta(self, url, meta):
+        with self._lock:
+            if self.index["urls"].get(url) != meta:
+                self.index["urls"][url] = meta
+                self._dirty = True
+
+    def league(self, league):
+        with self._lock:
+            return dict(self.index["leagues"].get(league, {}))
+
+    def set_league(self, league, entry):
+        with self._lock:
+            if self.index["leagues"].get(league) != entry:
+                self.index["leagues"][league] = entry
+                self._dirty = True
+
+    def object_path(self, digest):
+        return os.path.join(self.root, OBJECTS_DIR, f"{digest}.json")
+
+    def put(self, content: bytes):
+        """Αποθηκεύει τα bytes με όνομα το sha256· (digest, written)."""
+        digest = hashlib.sha256(content).hexdigest()
+        path = self.object_path(digest)
+        if os.path.exists(path):
+            return digest, False
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(content)
+        os.replace(tmp, path)
+        return digest, True
+
+    def get(self, digest):
+        with open(self.object_path(digest), "rb") as f:
+            return f.read()
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return False
+            path = os.path.join(self.root, INDEX_FILE)
+            with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+                json.dump(self.index, f, ensure_ascii=False, sort_keys=True)
+            os.replace(f"{path}.tmp", path)
+            self._dirty = False
+            return True
+
+
+def _make_http(workers):
+    http = requests.Session()
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=max(1, workers))
+    http.mount("https://", adapter)
+    http.mount("http://", adapter)
+    return http
+
+
+def conditional_get(http, cache, url, timeout=10):
+    """
+    GET με If-None-Match / If-Modified-Since από το index.
+    Επιστρέφει (status, digest, changed): 304 → το αποθηκευμένο digest.
+    """
+    meta = cache.url_meta(url)
+    headers = {}
+    if meta.get("sha256") and os.path.exists(cache.object_path(meta["sha256"])):
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    r = http.get(url, headers=headers, timeout=timeout)
+    if r.status_code == 304:
+        return 304, meta["sha256"], False
+    if r.status_code != 200:
+        return r.status_code, None, False
+
+    digest, _ = cache.put(r.content)
+    cache.set_url_meta(url, {
+        "etag": r.headers.get("ETag"),
+        "last_modified": r.headers.get("Last-Modified"),
+        "sha256": digest,
+    })
+    return 200, digest, digest != meta.get("sha256")
+
+
+def get_latest_season_folder(league, http=None, cache=None):
     """Αναζητά τον πιο πρόσφατο φάκελο season στο GitHub repo του OpenFootball"""
+    http = http or _make_http(1)
+    cache = cache or FetchCache()
     url = f"{GITHUB_API_BASE}/{league}/contents"
     try:
-        r = requests.get(url, timeout=10)
-        if r.status_code != 200:
-            print(f"⚠️  {league}: cannot fetch repo contents ({r.status_code})")
+        status, digest, _ = conditional_get(http, cache, url)
+        if digest is None:
+            print(f"⚠️  {league}: cannot fetch repo contents ({status})")
             return None
 
-        folders = [f["name"] for f in r.json() if f["type"] == "dir" and "-" in f["name"]]
+        listing = json.loads(cache.get(digest))
+        folders = [f["name"] for f in listing if f["type"] == "dir" and "-" in f["name"]]
         if not folders:
             print(f"⚠️  {league}: no season folders found")
             return None
@@ -52,27 +176,31 @@ def get_latest_season_folder(league):
         return None
 
 
-def import_league(league):
-    """Κατεβάζει δεδομένα για την πιο πρόσφατη σεζόν"""
-    latest = get_latest_season_folder(league)
+def import_league(league, http=None, cache=None):
+    """Κατεβάζει δεδομένα για την πιο πρόσφατη σεζόν (μόνο αν άλλαξαν)"""
+    http = http or _make_http(1)
+    cache = cache or FetchCache()
+    latest = get_latest_season_folder(league, http, cache)
     if not latest:
         print(f"❌ {league}: No season folder found")
         return 0
 
     url = f"{RAW_BASE}/{league}/master/{latest}/en.1.json"
-    print(f"[OPENFOOTBALL] ⚽ {league} ({latest}) -> {url}")
 
     try:
-        r = requests.get(url, timeout=10)
-        if r.status_code != 200:
-            print(f"⚠️  {league}: {r.status_code} not found")
+        status, digest, changed = conditional_get(http, cache, url)
+        if digest is None:
+            print(f"⚠️  {league}: {status} not found")
             return 0
 
-        data = r.json()
+        entry = cache.league(league)
+        if not changed and entry.get("sha256") == digest and "matches" in entry:
+            print(f"[OPENFOOTBALL] ♻️  {league} ({latest}): unchanged ({status})")
+            return entry["matches"]
+
+        data = json.loads(cache.get(digest))
         matches = data.get("matches", [])
-        filepath = os.path.join(DATA_DIR, f"{league}_{latest}.json")
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        cache.set_league(league, {"season": latest, "url": url, "sha256": digest, "matches": len(matches)})
         print(f"✅ {league}: Imported {len(matches)} matches from {latest}")
         return len(matches)
 
@@ -81,12 +209,21 @@ def import_league(league):
         return 0
 
 
-def main():
+def main(leagues=None, workers=None, cache_dir=DATA_DIR):
     print("[OPENFOOTBALL] 🚀 Auto-importing latest data...")
-    total = 0
-    for league in LEAGUES.keys():
-        total += import_league(league)
+    leagues = list(leagues or LEAGUES.keys())
+    workers = max(1, min(int(workers or OPENFOOTBALL_WORKERS), len(leagues)))
+    cache = FetchCache(cache_dir)
+    http = _make_http(workers)
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="openfootball") as pool:
+            total = sum(pool.map(lambda lg: import_league(lg, http, cache), leagues))
+    finally:
+        http.close()
+    if cache.save():
+        print("[OPENFOOTBALL] 🗂️  Cache index updated")
     print(f"\n[OPENFOOTBALL] ✅ Total matches imported: {total}")
+    return total
 
 
 if __name__ == "__main__":
@@ -0,0 +1,146 @@
+# ============================================================
+# modules/probe_scheduler.py
+# Health probes στο background (παράλληλα, δικό τους interval ο καθένας)
+# ============================================================
+# - ProbeScheduler.register(name, fn, interval): fn() → status string
+#   ("✅ OK", "❌ Offline", "⚠️ Missing key", ...)
+# - Ένα scheduler thread ξυπνά στο επόμενο due probe και το στέλνει
+#   σε ThreadPoolExecutor· probe που τρέχει ακόμα δεν ξαναστέλνεται
+# - Ανά probe: τελευταίο αποτέλεσμα + latency history (deque)
+# - snapshot(): έτοιμο dict που ξαναχτίζεται μόνο όταν έρθει νέο
+#   αποτέλεσμα → το endpoint απλώς το επιστρέφει (χωρίς I/O)
+# ============================================================
+
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+PROBE_INTERVAL = float(os.getenv("PROBE_INTERVAL", 60))    # default (sec)
+PROBE_HISTORY = int(os.getenv("PROBE_HISTORY", 60))        # latencies ανά probe
+PENDING = "⏳ Pending"
+
+
+def _interval(name: str, default: float) -> float:
+    """PROBE_INTERVAL_<NAME> από το env (π.χ. PROBE_INTERVAL_DB=30)."""
+    return float(os.getenv(f"PROBE_INTERVAL_{name.upper()}", default))
+
+
+class ProbeScheduler:
+    def __init__(self, history: int = PROBE_HISTORY, max_workers: int = None):
+        self.history = history
+        self.max_workers = max_workers
+        self._probes = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pool = None
+        self._snapshot = {"status": {}, "probes": {}}
+
+    # ------------------------------------------------------------
+    # Εγγραφή / έλεγχος
+    # ------------------------------------------------------------
+    def register(self, name: str, fn, interval: float = None):
+        self._probes[name] = {
+            "fn": fn,
+            "interval": _interval(name, PROBE_INTERVAL if interval is None else interval),
+            "status": PENDING,
+            "checked_at": None,
+            "latency": deque(maxlen=self.history),
+            "running": False,
+            "runs": 0,
+            "next": 0.0,                       # πρώτο run αμέσως στο start()
+        }
+        self._rebuild()
+        return self
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers or max(1, len(self._probes)),
+                                        thread_name_prefix="probe")
+        self._thread = threading.Thread(target=self._loop, name="probe-scheduler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        if self._pool:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+        self._thread = self._pool = None
+
+    def run_now(self, name: str = None):
+        """Εκτέλεση στο επόμενο tick (όλα ή ένα probe), χωρίς αναμονή."""
+        with self._lock:
+            for n in ([name] if name else self._probes):
+                self._probes[n]["next"] = 0.0
+        self._wake.set()
+
+    # ------------------------------------------------------------
+    # Scheduler loop
+    # ------------------------------------------------------------
+    def _loop(self):
+        while not self._stop.is_set():
+            self._wake.clear()
+            now = time.monotonic()
+            due = []
+            with self._lock:
+                for name, p in self._probes.items():
+                    if p["next"] <= now:
+                        p["next"] = now + p["interval"]
+                        if not p["running"]:          # δεν στοιβάζονται runs
+                            p["running"] = True
+                            due.append(name)
+                wait = min((p["next"] for p in self._probes.values()), default=now + PROBE_INTERVAL) - now
+            for name in due:
+                self._pool.submit(self._run, name)
+            self._wake.wait(max(0.0, wait))
+
+    def _run(self, name: str):
+        p = self._probes[name]
+        t0 = time.perf_counter()
+        try:
+            status = p["fn"]()
+        except Exception as e:
+            status = f"❌ Error: {e}"
+        latency = round((time.perf_counter() - t0) * 1000, 1)
+        with self._lock:
+            p["status"] = status
+            p["checked_at"] = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
+            p["latency"].append(latency)
+            p["runs"] += 1
+            p["running"] = False
+            self._rebuild()
+
+    # ------------------------------------------------------------
+    # Snapshot
+    # ------------------------------------------------------------
+    def _rebuild(self):
+        probes = {}
+        for name, p in self._probes.items():
+            lat = sorted(p["latency"])
+            probes[name] = {
+                "status": p["status"],
+                "checked_at": p["checked_at"],
+                "interval": p["interval"],
+                "runs": p["runs"],
+                "latency_ms": p["latency"][-1] if lat else None,
+                "latency_avg_ms": round(sum(lat) / len(lat), 1) if lat else None,
+                "latency_p95_ms": lat[min(len(lat) - 1, int(0.95 * len(lat)))] if lat else None,
+                "latency_history": list(p["latency"]),
+            }
+        # copy-on-write: οι readers βλέπουν πάντα ολοκληρωμένο snapshot
+        self._snapshot = {"status": {n: v["status"] for n, v in probes.items()}, "probes": probes}
+
+    def snapshot(self):
+        return self._snapshot
+
+    def status(self, name: str):
+        return self._snapshot["status"].get(name, PENDING)
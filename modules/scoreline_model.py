@@ -0,0 +1,294 @@
+# ============================================================
+# modules/scoreline_model.py
+# Poisson / Dixon-Coles scoreline model για το GoalMatrix
+# ============================================================
+# - fit_league(): attack / defence ανά ομάδα + home advantage με
+#   το fixed point της Poisson MLE (np.bincount, χρονικό βάρος
+#   exp(-xi · ημέρες)) και ρ του Dixon-Coles με grid search
+# - scoreline_matrices(): πλήρεις πίνακες 0–MAX_GOALS × 0–MAX_GOALS
+#   για όλα τα fixtures μαζί (NumPy broadcasting, (F, G, G))
+# - ScorelineCache: struct-of-arrays ανά fixture id· O/U, BTTS,
+#   1X2 και correct score είναι lookup, όχι υπολογισμός ανά request
+# ============================================================
+
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+MAX_GOALS = int(os.getenv("GOALMATRIX_MAX_GOALS", 10))
+GOALMATRIX_DECAY = float(os.getenv("GOALMATRIX_DECAY", 0.0019))  # ανά ημέρα (~1 χρόνο half-life)
+GOALMATRIX_MIN_MATCHES = int(os.getenv("GOALMATRIX_MIN_MATCHES", 30))
+OU_LINES = (0.5, 1.5, 2.5, 3.5, 4.5)
+RHO_GRID = np.linspace(-0.3, 0.3, 121)
+_PRIOR = 1.0  # pseudo-matches μέσου όρου λίγκας (ομάδες με λίγα παιχνίδια / 0 γκολ)
+
+
+# ------------------------------------------------------------
+# Fit
+# ------------------------------------------------------------
+def _dc_tau(hg, ag, lam, mu, rho):
+    """Διόρθωση Dixon-Coles για 0-0 / 0-1 / 1-0 / 1-1 (broadcast σε rho)."""
+    tau = np.ones(np.broadcast(hg, rho).shape)
+    tau = np.where((hg == 0) & (ag == 0), 1 - lam * mu * rho, tau)
+    tau = np.where((hg == 0) & (ag == 1), 1 + lam * rho, tau)
+    tau = np.where((hg == 1) & (ag == 0), 1 + mu * rho, tau)
+    tau = np.where((hg == 1) & (ag == 1), 1 - rho, tau)
+    return tau
+
+
+def fit_league(matches: pd.DataFrame, decay: float = GOALMATRIX_DECAY, max_iter: int = 200, tol: float = 1e-7):
+    """
+    matches: στήλες date, home, away, hg, ag μίας λίγκας (μόνο αγώνες με σκορ).
+    Επιστρέφει {"teams", "attack", "defence", "home", "rho", "matches"} ή None.
+    λ_home = attack[h] · defence[a] · home,  μ_away = attack[a] · defence[h]
+    """
+    played = matches.dropna(subset=["hg", "ag"])
+    if len(played) < GOALMATRIX_MIN_MATCHES:
+        return None
+    teams, codes = np.unique(np.concatenate([played["home"].to_numpy(str), played["away"].to_numpy(str)]),
+                             return_inverse=True)
+    n = len(played)
+    h, a = codes[:n], codes[n:]
+    hg = played["hg"].to_numpy(np.float64)
+    ag = played["ag"].to_numpy(np.float64)
+    dates = pd.to_datetime(played["date"], errors="coerce")
+    age = (dates.max() - dates).dt.days.fillna(0).to_numpy(np.float64)
+    w = np.exp(-decay * age)
+    T = len(teams)
+
+    att, dfn, home = np.ones(T), np.ones(T), 1.0
+    scored = np.bincount(h, w * hg, T) + np.bincount(a, w * ag, T)
+    conceded = np.bincount(a, w * hg, T) + np.bincount(h, w * ag, T)
+    rate = (np.sum(w * hg) + np.sum(w * ag)) / (2 * np.sum(w))
+    for _ in range(max_iter):
+        exp_att = np.bincount(h, w * dfn[a] * home, T) + np.bincount(a, w * dfn[h], T)
+        new_att = (scored + _PRIOR * rate) / (exp_att + _PRIOR * rate)  # prior → attack 1
+        exp_dfn = np.bincount(a, w * new_att[h] * home, T) + np.bincount(h, w * new_att[a], T)
+        new_dfn = (conceded + _PRIOR * rate) / (exp_dfn + _PRIOR)         # prior → μέσος όρος λίγκας
+        home = np.sum(w * hg) / np.sum(w * new_att[h] * new_dfn[a])
+        scale = np.mean(new_att)
+        new_att, new_dfn = new_att / scale, new_dfn * scale
+        delta = max(np.max(np.abs(new_att - att)), np.max(np.abs(new_dfn - dfn)))
+        att, dfn = new_att, new_dfn
+        if delta < tol:
+            break
+
+    # ρ: μεγιστοποίηση του (βεβαρημένου) log τ στους αγώνες με χαμηλό σκορ
+    lam, mu = att[h] * dfn[a] * home, att[a] * dfn[h]
+    low = (hg <= 1) & (ag <= 1)
+    tau = _dc_tau(hg[low], ag[low], lam[low], mu[low], RHO_GRID[:, None])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ll = np.where(tau > 0, np.log(np.where(tau > 0, tau, 1.0)), -np.inf) @ w[low]
+    rho = float(RHO_GRID[int(np.argmax(ll))]) if low.any() else 0.0
+
+    return {"teams": teams, "attack": att, "defence": dfn, "home": float(home), "rho": rho, "matches": n,
+            "index": {t: i for i, t in enumerate(teams)}}
+
+
+def fit_leagues(matches: pd.DataFrame, decay: float = GOALMATRIX_DECAY) -> dict:
+    """Ένα fit ανά league (στήλες league, date, home, away, hg, ag)."""
+    fits = {}
+    for league, part in matches.dropna(subset=["league"]).groupby("league", sort=True):
+        fit = fit_league(part, decay)
+        if fit is not None:
+            fits[league] = fit
+    return fits
+
+
+def fixture_rates(fits: dict, fixtures: pd.DataFrame):
+    """
+    fixtures: στήλες fixture_id, home, away και προαιρετικά league.
+    Επιστρέφει (ids, λ, μ, ρ) για όσα fixtures έχουν και τις δύο ομάδες σε ένα fit.
+    Άγνωστη league: η πρώτη λίγκα (αλφαβητικά) όπου υπάρχουν και οι δύο ομάδες.
+    """
+    ids, lam, mu, rho = [], [], [], []
+    leagues = fixtures["league"] if "league" in fixtures.columns else pd.Series([None] * len(fixtures))
+    for fid, home, away, league in zip(fixtures["fixture_id"], fixtures["home"], fixtures["away"], leagues):
+        candidates = [league] if league in fits else list(fits)
+        for lg in candidates:
+            fit = fits[lg]
+            i, j = fit["index"].get(home), fit["index"].get(away)
+            if i is None or j is None:
+                continue
+            ids.append(fid)
+            lam.append(fit["attack"][i] * fit["defence"][j] * fit["home"])
+            mu.append(fit["attack"][j] * fit["defence"][i])
+            rho.append(fit["rho"])
+            break
+    return ids, np.array(lam, np.float64), np.array(mu, np.float64), np.array(rho, np.float64)
+
+
+# ------------------------------------------------------------
+# Batch πίνακες σκορ
+# ------------------------------------------------------------
+_K = np.arange(MAX_GOALS + 1)
+_LOG_FACT = np.concatenate([[0.0], np.cumsum(np.log(np.arange(1, MAX_GOALS + 1)))])
+
+
+def poisson_pmf(rate, max_goals: int = MAX_GOALS):
+    """(F,) rates → (F, max_goals+1) πιθανότητες 0..max_goals γκολ."""
+    k = _K[:max_goals + 1]
+    rate = np.maximum(np.asarray(rate, np.float64), 1e-9)[:, None]
+    return np.exp(k * np.log(rate) - rate - _LOG_FACT[:max_goals + 1])
+
+
+def scoreline_matrices(lam, mu, rho=None, max_goals: int = MAX_GOALS):
+    """
+    (F,) λ, μ, ρ → (F, G, G) με M[f, i, j] = P(home i, away j), κανονικοποιημένοι
+    (η ουρά > max_goals μοιράζεται αναλογικά).
+    """
+    lam, mu = np.asarray(lam, np.float64), np.asarray(mu, np.float64)
+    m = poisson_pmf(lam, max_goals)[:, :, None] * poisson_pmf(mu, max_goals)[:, None, :]
+    if rho is not None:
+        rho = np.asarray(rho, np.float64)
+        m[:, 0, 0] *= 1 - lam * mu * rho
+        m[:, 0, 1] *= 1 + lam * rho
+        m[:, 1, 0] *= 1 + mu * rho
+        m[:, 1, 1] *= 1 - rho
+        np.maximum(m, 0.0, out=m)
+    m /= m.sum(axis=(1, 2), keepdims=True)
+    return m
+
+
+def _market_masks(max_goals: int = MAX_GOALS):
+    i, j = np.meshgrid(np.arange(max_goals + 1), np.arange(max_goals + 1), indexing="ij")
+    masks = {f"over_{line}": (i + j) > line for line in OU_LINES}
+    masks.update({"home": i > j, "draw": i == j, "away": i < j, "btts": (i > 0) & (j > 0)})
+    return masks
+
+
+def market_probabilities(matrices):
+    """(F, G, G) → {market: (F,)} με ένα tensordot για όλες τις αγορές."""
+    masks = _market_masks(matrices.shape[1] - 1)
+    names = list(masks)
+    stack = np.stack([masks[n] for n in names]).astype(np.float64)
+    probs = np.tensordot(matrices, stack, axes=([1, 2], [1, 2]))
+    out = {n: probs[:, k] for k, n in enumerate(names)}
+    for line in OU_LINES:
+        out[f"under_{line}"] = 1.0 - out[f"over_{line}"]
+    return out
+
+
+def upcoming_fixtures(days: int = 7) -> pd.DataFrame:
+    """Προγραμματισμένα fixtures των επόμενων `days` ημερών από το fixtures dataset."""
+    from modules.api_aggregator import read_fixtures
+    today = datetime.utcnow().date()
+    df = read_fixtures(today.isoformat(), (today + timedelta(days=days)).isoformat(),
+                       columns=["source", "fixture_id", "league_name", "home_team", "away_team", "status"])
+    df = df[df["status"] == "SCHEDULED"]
+    return pd.DataFrame({
+        "fixture_id": (df["source"] + ":" + df["fixture_id"].astype("string")).to_numpy(object),
+        "league": df["league_name"].to_numpy(object),
+        "home": df["home_team"].to_numpy(object),
+        "away": df["away_team"].to_numpy(object),
+    })
+
+
+# ------------------------------------------------------------
+# Cache ανά fixture id
+# ------------------------------------------------------------
+class ScorelineCache:
+    """
+    Struct-of-arrays: matrices (F, G, G), λ/μ (F,) και οι αγορές (F,) με
+    id → γραμμή. Νέο fit (version) → ο cache αδειάζει και ξαναχτίζεται.
+    """
+
+    def __init__(self, max_goals: int = MAX_GOALS):
+        self.max_goals = max_goals
+        self._lock = threading.Lock()
+        self._clear()
+        self.fits = {}
+        self.version = 0
+        self.fitted_at = None
+
+    def _clear(self):
+        g = self.max_goals + 1
+        self._row = {}
+        self.ids = []
+        self.matrices = np.empty((0, g, g))
+        self.lam = np.empty(0)
+        self.mu = np.empty(0)
+        self.markets = {}
+
+    def refit(self, matches: pd.DataFrame, decay: float = GOALMATRIX_DECAY):
+        fits = fit_leagues(matches, decay)
+        with self._lock:
+            self.fits = fits
+            self.version += 1
+            self.fitted_at = time.time()
+            self._clear()
+        return {"leagues": len(fits), "teams": sum(len(f["teams"]) for f in fits.values()), "version": self.version}
+
+    def precompute(self, fixtures: pd.DataFrame):
+        """Υπολογίζει (batch) μόνο τα fixtures που λείπουν από τον cache· επιστρέφει πόσα."""
+        with self._lock:
+            fits = self.fits
+            missing = fixtures[~fixtures["fixture_id"].isin(self._row)].drop_duplicates("fixture_id")
+        if missing.empty or not fits:
+            return 0
+        ids, lam, mu, rho = fixture_rates(fits, missing)
+        if not ids:
+            return 0
+        mats = scoreline_matrices(lam, mu, rho, self.max_goals)
+        markets = market_probabilities(mats)
+        with self._lock:
+            if fits is not self.fits:
+                return 0  # refit στο μεταξύ – το επόμενο precompute θα τα πάρει
+            start = len(self.ids)
+            self.ids.extend(ids)
+            self._row.update((fid, start + k) for k, fid in enumerate(ids))
+            self.matrices = np.concatenate([self.matrices, mats])
+            self.lam = np.concatenate([self.lam, lam])
+            self.mu = np.concatenate([self.mu, mu])
+            self.markets = {n: np.concatenate([self.markets.get(n, np.empty(0)), v]) for n, v in markets.items()}
+        return len(ids)
+
+    def retain(self, keep_ids):
+        """Κρατά μόνο τα δοσμένα fixtures (π.χ. αγώνες που έληξαν φεύγουν)."""
+        with self._lock:
+            rows = [self._row[f] for f in keep_ids if f in self._row]
+            self.ids = [self.ids[r] for r in rows]
+            self._row = {fid: k for k, fid in enumerate(self.ids)}
+            self.matrices, self.lam, self.mu = self.matrices[rows], self.lam[rows], self.mu[rows]
+            self.markets = {n: v[rows] for n, v in self.markets.items()}
+        return len(rows)
+
+    # -------- lookups --------
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, fixture_id):
+        return fixture_id in self._row
+
+    def matrix(self, fixture_id):
+        with self._lock:
+            r = self._row.get(fixture_id)
+            return None if r is None else self.matrices[r].copy()
+
+    def correct_score(self, fixture_id, home_goals: int, away_goals: int):
+        with self._lock:
+            r = self._row.get(fixture_id)
+            if r is None or home_goals > self.max_goals or away_goals > self.max_goals:
+                return None
+            return float(self.matrices[r, home_goals, away_goals])
+
+    def probabilities(self, fixture_id, top: int = 5):
+        """Όλες οι αγορές + τα `top` πιθανότερα σκορ ενός fixture (ή None)."""
+        with self._lock:
+            r = self._row.get(fixture_id)
+            if r is None:
+                return None
+            flat = self.matrices[r].ravel()
+            best = np.argsort(flat)[::-1][:top]
+            g = self.max_goals + 1
+            return {
+                "fixture_id": fixture_id,
+                "exp_home_goals": round(float(self.lam[r]), 3),
+                "exp_away_goals": round(float(self.mu[r]), 3),
+                **{n: round(float(v[r]), 4) for n, v in self.markets.items()},
+                "correct_score": [{"score": f"{k // g}-{k % g}", "p": round(float(flat[k]), 4)} for k in best],
+            }
@@ -3,11 +3,29 @@
 # Real-time SmartMoney odds loop (API-Football 1X2) + MFI%
 # ============================================================
 
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime
 import time
 import requests
+from requests.adapters import HTTPAdapter
 import random
 
+from modules.moneyflow_engine import MoneyFlowEngine
+from modules.odds_history import OddsHistory
+
+APIFOOTBALL_BASE = "https://v3.football.api-sports.io"
+
+# Πόσα leagues τραβάμε ταυτόχρονα από τον ίδιο provider
+APIFOOTBALL_MAX_CONCURRENCY = 8
+# Ανώτατος χρόνος για ολόκληρο τον κύκλο fetch (δευτ.)
+APIFOOTBALL_CYCLE_DEADLINE = 25
+
+# Ιστορικό αποδόσεων (ring buffer ανά match) + checkpoint στο δίσκο
+ODDS_HISTORY_FILE = "data/smartmoney_odds_history.npz"
+ODDS_HISTORY_DEPTH = 120          # snapshots ανά match
+ODDS_HISTORY_EVICT_AFTER = 6 * 3600   # match εκτός feed για 6 ώρες → τελειωμένο
+ODDS_HISTORY_CHECKPOINT_EVERY = 300   # δευτ.
+
 # Target league IDs (API-Football — Ευρώπη 1-2 + Γερμανία 3 + Ελλάδα 1-2)
 TARGET_LEAGUES = [
     # England
@@ -84,14 +102,59 @@ def _movement_label(start_odds, current_odds):
 def _match_key(home, away):
     return f"{(home or '').strip()} - {(away or '').strip()}"
 
+def _parse_odds_response(payload):
+    """Μετατρέπει ένα API-Football /odds response σε λίστα {match, odds} (1X2)."""
+    out = []
+    for it in (payload or {}).get("response") or []:
+        teams = it.get("teams") or {}
+        home = (teams.get("home") or {}).get("name") or ""
+        away = (teams.get("away") or {}).get("name") or ""
+        mk = _match_key(home, away)
+
+        odds = it.get("odds") or []
+        o1 = oX = o2 = None
+        for book in odds:
+            for m in (book.get("markets") or []):
+                if "1x2" in (m.get("name") or "").lower():
+                    for s in (m.get("outcomes") or []):
+                        nm = (s.get("name") or "").strip().lower()
+                        pr = _safe_float(s.get("price"))
+                        if pr:
+                            if nm in ["home", "1", home.lower()]: o1 = pr
+                            elif nm in ["draw", "x"]: oX = pr
+                            elif nm in ["away", "2", away.lower()]: o2 = pr
+        if o1 and oX and o2:
+            out.append({"match": mk, "odds": {"1": round(o1,2), "X": round(oX,2), "2": round(o2,2)}})
+    return out
+
 class SmartMoneyMonitor:
-    def __init__(self, refresh_interval: int, apifootball_key: str, sportmonks_key: str = ""):
+    def __init__(self, refresh_interval: int, apifootball_key: str, sportmonks_key: str = "",
+                 max_concurrency: int = APIFOOTBALL_MAX_CONCURRENCY,
+                 cycle_deadline: float = APIFOOTBALL_CYCLE_DEADLINE,
+                 leagues=None, base_url: str = APIFOOTBALL_BASE,
+                 history_path: str = ODDS_HISTORY_FILE, history_depth: int = ODDS_HISTORY_DEPTH,
+                 evict_after: float = ODDS_HISTORY_EVICT_AFTER,
+                 checkpoint_every: float = ODDS_HISTORY_CHECKPOINT_EVERY):
         self.refresh_interval = max(15, int(refresh_interval))
         self.apifootball_key = apifootball_key
         self.sportmonks_key = sportmonks_key
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.cycle_deadline = cycle_deadline
+        self.leagues = list(leagues) if leagues is not None else list(TARGET_LEAGUES)
+        self.base_url = base_url.rstrip("/")
         self._feed_cache = []
-        self._start_odds = {}  # αρχικό snapshot ανά match
+        self.history_path = history_path
+        self.evict_after = evict_after
+        self.checkpoint_every = checkpoint_every
+        self._history = OddsHistory.load(history_path, depth=history_depth) if history_path else OddsHistory(depth=history_depth)
+        self._flow = MoneyFlowEngine()  # start/current odds ανά match (NumPy)
+        self._flow.update(self._history.openings())  # opening τιμές επιβιώνουν το restart
+        self._last_checkpoint = time.monotonic()
+        self._history_dirty = False
         self._last_refresh = None
+        self._league_latency = {}  # league id -> {"seconds", "status", "matches"}
+        self._session = None
+        self._pool = None
 
     # -------- public --------
     def run_forever(self):
@@ -116,53 +179,99 @@ class SmartMoneyMonitor:
     def last_refresh_str(self):
         return self._last_refresh.strftime("%Y-%m-%d %H:%M:%S") if self._last_refresh else "—"
 
+    def league_latency(self):
+        """Latency/κατάσταση του τελευταίου fetch ανά league."""
+        return dict(self._league_latency)
+
+    def checkpoint(self):
+        if not self.history_path or not self._history_dirty:
+            return
+        try:
+            self._history.save(self.history_path)
+            self._last_checkpoint = time.monotonic()
+            self._history_dirty = False
+        except Exception as e:
+            print("[SMARTMONEY] ⚠️ Odds history checkpoint failed:", e)
+
+    def close(self):
+        self.checkpoint()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
     # -------- internal --------
     def _refresh_once(self):
         items = self._fetch_apifootball()
+        live = bool(items)
         if not items:
             items = self._simulate(8)
             print("[SMARTMONEY] 🟡 Simulation mode")
-        self._feed_cache = self._enrich(items)
+        # Στο simulation mode δεν γράφουμε στο odds history ούτε checkpoint
+        self._feed_cache = self._enrich(items, record=live)
+        if live and time.monotonic() - self._last_checkpoint >= self.checkpoint_every:
+            self.checkpoint()
+
+    def _get_session(self):
+        # Κοινό keep-alive session, με pool όσο το concurrency cap
+        if self._session is None:
+            sess = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_concurrency)
+            sess.mount("http://", adapter)
+            sess.mount("https://", adapter)
+            sess.headers.update({"x-apisports-key": self.apifootball_key})
+            self._session = sess
+        return self._session
+
+    def _get_pool(self):
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="smartmoney-fetch")
+        return self._pool
+
+    def _fetch_league(self, lid, season):
+        t0 = time.perf_counter()
+        r = self._get_session().get(
+            f"{self.base_url}/odds",
+            params={"league": lid, "season": season, "bookmaker": 8},  # 8: Pinnacle
+            timeout=10
+        )
+        if r.status_code != 200:
+            return [], r.status_code, time.perf_counter() - t0
+        return _parse_odds_response(r.json()), r.status_code, time.perf_counter() - t0
 
     def _fetch_apifootball(self):
         if not self.apifootball_key:
             return []
-        headers = {"x-apisports-key": self.apifootball_key}
         season = datetime.now().year
+        pool = self._get_pool()
+        t0 = time.perf_counter()
+        futures = {pool.submit(self._fetch_league, lid, season): lid for lid in self.leagues}
+        done, pending = wait(futures, timeout=self.cycle_deadline)
+
         out = []
-        for lid in TARGET_LEAGUES:
+        latency = {}
+        for fut, lid in futures.items():  # σειρά TARGET_LEAGUES, όχι σειρά ολοκλήρωσης
+            if fut not in done:
+                continue
             try:
-                r = requests.get(
-                    "https://v3.football.api-sports.io/odds",
-                    headers=headers,
-                    params={"league": lid, "season": season, "bookmaker": 8},  # 8: Pinnacle
-                    timeout=10
-                )
-                if r.status_code != 200:
-                    continue
-                for it in r.json().get("response") or []:
-                    teams = it.get("teams") or {}
-                    home = (teams.get("home") or {}).get("name") or ""
-                    away = (teams.get("away") or {}).get("name") or ""
-                    mk = _match_key(home, away)
-
-                    odds = it.get("odds") or []
-                    o1 = oX = o2 = None
-                    for book in odds:
-                        for m in (book.get("markets") or []):
-                            if "1x2" in (m.get("name") or "").lower():
-                                for s in (m.get("outcomes") or []):
-                                    nm = (s.get("name") or "").strip().lower()
-                                    pr = _safe_float(s.get("price"))
-                                    if pr:
-                                        if nm in ["home", "1", home.lower()]: o1 = pr
-                                        elif nm in ["draw", "x"]: oX = pr
-                                        elif nm in ["away", "2", away.lower()]: o2 = pr
-                    if o1 and oX and o2:
-                        out.append({"match": mk, "odds": {"1": round(o1,2), "X": round(oX,2), "2": round(o2,2)}})
+                items, status, secs = fut.result()
+                out.extend(items)
+                latency[lid] = {"seconds": round(secs, 3), "status": status, "matches": len(items)}
             except Exception as e:
+                latency[lid] = {"seconds": None, "status": "error", "matches": 0}
                 print(f"[SMARTMONEY] ⚠️ League {lid} skipped: {e}")
-        print(f"[SMARTMONEY] 📡 API-Football fetched {len(out)} matches")
+        for fut in pending:
+            # Το αργό league δεν κρατάει τον κύκλο· τα δεδομένα του χάνονται μόνο γι' αυτό το refresh
+            fut.cancel()
+            latency[futures[fut]] = {"seconds": None, "status": "timeout", "matches": 0}
+        if pending:
+            print(f"[SMARTMONEY] ⏱️ {len(pending)} league(s) exceeded {self.cycle_deadline}s deadline")
+        self._league_latency = latency
+
+        print(f"[SMARTMONEY] 📡 API-Football fetched {len(out)} matches "
+              f"({len(self.leagues)} leagues, x{self.max_concurrency}, {time.perf_counter() - t0:.2f}s)")
         return out
 
     def _simulate(self, n=10):
@@ -174,7 +283,7 @@ class SmartMoneyMonitor:
             out.append({"match": m, "odds": {"1": o1, "X": oX, "2": o2}})
         return out
 
-    def _enrich(self, items):
+    def _enrich(self, items, record=True):
         now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         merged = {}
         for it in items:
@@ -184,20 +293,16 @@ class SmartMoneyMonitor:
                 continue
             merged[mk] = o
 
-        out = []
-        for mk, cur in merged.items():
-            if mk not in self._start_odds:
-                self._start_odds[mk] = cur.copy()
-            start = self._start_odds[mk]
-            mfi = _money_flow(start, cur)
-            mov = _movement_label(start, cur)
-            out.append({
-                "match": mk,
-                "market": "1X2",
-                "start_odds": start,
-                "current_odds": cur,
-                "movement": mov,
-                "money_flow": mfi,
-                "timestamp": now
-            })
+        if record:
+            self._history.record(merged)
+            self._history_dirty = True
+        finished = self._history.evict_stale(self.evict_after)
+        if finished:
+            self._flow.remove(finished)
+            self._history_dirty = True
+
+        out = self._flow.feed(merged, now)
+        windows = self._history.window_flow(merged)
+        for row in out:
+            row.update(windows.get(row["match"], {}))
         return out
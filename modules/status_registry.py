@@ -0,0 +1,96 @@
+# ============================================================
+# modules/status_registry.py
+# In-process system status registry + periodic atomic snapshot
+# ============================================================
+# Οι engines γράφουν την κατάστασή τους στη μνήμη (set) και τα
+# endpoints τη διαβάζουν απευθείας (snapshot). Ένας flusher
+# thread γράφει το system_status.json το πολύ κάθε flush_interval
+# δευτ. και μόνο όταν άλλαξε κάτι, με write + rename ώστε κανείς
+# να μη διαβάσει μισογραμμένο αρχείο.
+# ============================================================
+
+import copy
+import json
+import os
+import threading
+from datetime import datetime
+
+
+class StatusRegistry:
+    def __init__(self, path, flush_interval: float = 5.0):
+        self.path = str(path)
+        self.flush_interval = float(flush_interval)
+        self._lock = threading.Lock()
+        self._data = self._load()
+        self._dirty = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except Exception:
+            return {}
+
+    # -------- write / read --------
+    def set(self, name: str, state: str, **extra):
+        entry = {"status": state, "last_update": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), **extra}
+        with self._lock:
+            self._data[name] = entry
+            self._dirty = True
+        return entry
+
+    def get(self, name: str, default=None):
+        with self._lock:
+            entry = self._data.get(name)
+            return dict(entry) if entry is not None else default
+
+    def snapshot(self):
+        with self._lock:
+            return copy.deepcopy(self._data)
+
+    def __bool__(self):
+        with self._lock:
+            return bool(self._data)
+
+    # -------- disk --------
+    def flush(self, force: bool = False):
+        """Γράφει snapshot στο δίσκο (tmp + os.replace) αν υπάρχουν αλλαγές."""
+        with self._lock:
+            if not (self._dirty or force):
+                return False
+            data = copy.deepcopy(self._data)
+            self._dirty = False
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=4, ensure_ascii=False)
+            os.replace(tmp, self.path)
+        except Exception:
+            with self._lock:
+                self._dirty = True  # ξαναδοκιμάζουμε στο επόμενο flush
+            raise
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                print("[STATUS] ⚠️ Snapshot flush failed:", e)
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="StatusFlusher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        try:
+            self.flush()
+        except Exception as e:
+            print("[STATUS] ⚠️ Final snapshot flush failed:", e)
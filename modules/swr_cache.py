@@ -0,0 +1,118 @@
+# ============================================================
+# modules/swr_cache.py
+# Thread-safe LRU cache με single-flight + stale-while-revalidate
+# ============================================================
+# - Ταυτόχρονα misses για το ίδιο key → ένα μόνο loader call,
+#   οι υπόλοιποι περιμένουν το ίδιο αποτέλεσμα (coalesced)
+# - Ληγμένο entry μέσα στο stale παράθυρο → επιστρέφεται αμέσως
+#   και γίνεται refresh στο background
+# - TTL ανά key (αριθμός ή callable(value) → δευτ.)
+# - LRU όριο maxsize entries
+# ============================================================
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class _Entry:
+    __slots__ = ("value", "stored", "ttl")
+
+    def __init__(self, value, stored, ttl):
+        self.value = value
+        self.stored = stored
+        self.ttl = ttl
+
+
+class SWRCache:
+    def __init__(self, maxsize: int = 256, ttl: float = 300, stale_ttl: float = 300,
+                 refresh_workers: int = 4, clock=time.monotonic):
+        self.maxsize = max(1, int(maxsize))
+        self.ttl = ttl
+        self.stale_ttl = float(stale_ttl)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._data = OrderedDict()
+        self._inflight = {}
+        self._pool = ThreadPoolExecutor(max_workers=max(1, int(refresh_workers)), thread_name_prefix="swr-refresh")
+        self._stats = {"hits": 0, "stale_hits": 0, "misses": 0, "coalesced": 0,
+                       "refreshes": 0, "errors": 0, "evictions": 0}
+
+    # -------- read --------
+    def get(self, key, loader, ttl=None):
+        """
+        Τιμή για το key· καλεί loader() μόνο σε miss (μία φορά ανά key)
+        ή σε background refresh. Exceptions του loader περνούν στους
+        callers που περίμεναν (δεν αποθηκεύονται).
+        """
+        now = self._clock()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                age = now - entry.stored
+                if age <= entry.ttl:
+                    self._stats["hits"] += 1
+                    self._data.move_to_end(key)
+                    return entry.value
+                if age <= entry.ttl + self.stale_ttl:
+                    self._stats["stale_hits"] += 1
+                    self._data.move_to_end(key)
+                    if key not in self._inflight:
+                        fut = self._inflight[key] = Future()
+                        self._stats["refreshes"] += 1
+                        self._pool.submit(self._load, key, loader, ttl, fut)
+                    return entry.value
+
+            fut = self._inflight.get(key)
+            owner = fut is None
+            if owner:
+                fut = self._inflight[key] = Future()
+                self._stats["misses"] += 1
+            else:
+                self._stats["coalesced"] += 1
+
+        if owner:
+            self._load(key, loader, ttl, fut)
+        return fut.result()
+
+    def _load(self, key, loader, ttl, fut):
+        try:
+            value = loader()
+        except BaseException as e:
+            with self._lock:
+                self._stats["errors"] += 1
+                self._inflight.pop(key, None)
+            fut.set_exception(e)  # το stale entry (αν υπάρχει) μένει ως έχει
+            return
+        ttl = self.ttl if ttl is None else ttl
+        if callable(ttl):
+            ttl = ttl(value)
+        with self._lock:
+            self._data[key] = _Entry(value, self._clock(), float(ttl))
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self._stats["evictions"] += 1
+            self._inflight.pop(key, None)
+        fut.set_result(value)
+
+    # -------- maintenance --------
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return {**self._stats, "size": len(self._data), "inflight": len(self._inflight)}
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
@@ -7,7 +7,10 @@ import os
 import time
 import json
 import requests
-from datetime import datetime, timedelta
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+
+from modules.swr_cache import SWRCache
 
 # ==============================================================
 # Βασικές ρυθμίσεις API
@@ -20,21 +23,23 @@ MARKETS = "h2h"
 ODDS_FMT = "decimal"
 
 # ==============================================================
-# Simple in-memory cache (ώστε να μην γίνονται πολλά API calls)
+# Cache (single-flight + stale-while-revalidate, LRU)
 # ==============================================================
-CACHE = {}
-TTL = timedelta(minutes=5)  # 5 λεπτά caching
+# Ταυτόχρονα requests για το ίδιο sport_key κάνουν ένα μόνο API call·
+# ληγμένα entries σερβίρονται αμέσως όσο γίνεται refresh στο background.
+ODDS_CACHE_TTL = int(os.environ.get("ODDS_CACHE_TTL", 300))          # 5 λεπτά caching
+ODDS_CACHE_STALE = int(os.environ.get("ODDS_CACHE_STALE", 600))      # stale παράθυρο
+ODDS_EMPTY_TTL = int(os.environ.get("ODDS_EMPTY_TTL", 1800))         # λίγκες χωρίς αγώνες (off-season)
+ODDS_CACHE_MAX = int(os.environ.get("ODDS_CACHE_MAX", 256))
+
+CACHE = SWRCache(maxsize=ODDS_CACHE_MAX, ttl=ODDS_CACHE_TTL, stale_ttl=ODDS_CACHE_STALE)
 
-def _cache_get(key):
-    ent = CACHE.get(key)
-    if not ent:
-        return None
-    if datetime.utcnow() - ent["ts"] > TTL:
-        return None
-    return ent["data"]
+def _odds_ttl(out):
+    return ODDS_EMPTY_TTL if not out.get("count") else ODDS_CACHE_TTL
 
-def _cache_set(key, data):
-    CACHE[key] = {"data": data, "ts": datetime.utcnow()}
+def cache_stats():
+    """Μετρητές hits / misses / coalesced κ.λπ. για monitoring του quota."""
+    return CACHE.stats()
 
 # ==============================================================
 # Λειτουργία απλού fetch για 1 πρωτάθλημα
@@ -47,10 +52,14 @@ def get_odds(sport_key: str, mode: str = "simple"):
       /odds/soccer_epl
       /odds/soccer_greece_super_league
     """
-    cached = _cache_get(sport_key)
-    if cached:
-        return cached
+    try:
+        return CACHE.get(sport_key, lambda: _fetch_odds(sport_key), ttl=_odds_ttl)
+    except Exception as e:
+        print(f"[get_odds] Error fetching {sport_key}: {e}")
+        return {"count": 0, "events": []}
 
+def _fetch_odds(sport_key: str):
+    """Ένα API call στο TheOddsAPI· σφάλματα γίνονται raise ώστε να μην αποθηκευτούν."""
     url = f"{BASE}/sports/{sport_key}/odds/"
     params = {
         "apiKey": THEODDS_KEY,
@@ -59,13 +68,9 @@ def get_odds(sport_key: str, mode: str = "simple"):
         "oddsFormat": ODDS_FMT,
     }
 
-    try:
-        res = requests.get(url, params=params, timeout=10)
-        res.raise_for_status()
-        data = res.json()
-    except Exception as e:
-        print(f"[get_odds] Error fetching {sport_key}: {e}")
-        return {"count": 0, "events": []}
+    res = requests.get(url, params=params, timeout=10)
+    res.raise_for_status()
+    data = res.json()
 
     events = []
     for match in data:
@@ -82,65 +87,118 @@ def get_odds(sport_key: str, mode: str = "simple"):
         except Exception:
             continue
 
-    out = {"sport_key": sport_key, "count": len(events), "events": events}
-    _cache_set(sport_key, out)
-    return out
+    return {"sport_key": sport_key, "count": len(events), "events": events}
 
 # ==============================================================
-# Bundle odds fetcher (multiple leagues)
+# Bundle odds fetcher (multiple leagues, παράλληλα)
 # ==============================================================
 
-def get_odds_bundle(bundle: str):
+BUNDLES = {
+    "england_all": [
+        "soccer_epl",
+        "soccer_england_championship",
+        "soccer_england_league1",
+        "soccer_england_league2"
+    ],
+    "greece_1_2_3": [
+        "soccer_greece_super_league",
+        "soccer_greece_super_league_2"   # ✅ Διορθωμένο (υπάρχει αυτό)
+    ],
+    "germany_1_2_3": [
+        "soccer_germany_bundesliga",
+        "soccer_germany_bundesliga2"     # ✅ Αυτές μόνο υπάρχουν
+    ],
+    "europe_1_2": [
+        "soccer_france_ligue_one",
+        "soccer_france_ligue_two",
+        "soccer_italy_serie_a",
+        "soccer_italy_serie_b",
+        "soccer_spain_la_liga",
+        "soccer_spain_segunda_division",
+        "soccer_portugal_primeira_liga",
+        "soccer_netherlands_eredivisie",
+        "soccer_turkey_super_league",
+        "soccer_switzerland_superleague",
+        "soccer_austria_bundesliga",
+        "soccer_belgium_first_div",
+        "soccer_norway_eliteserien",
+        "soccer_sweden_allsvenskan",
+        "soccer_denmark_superliga"
+    ]
+}
+
+BUNDLE_MAX_CONCURRENCY = int(os.environ.get("ODDS_BUNDLE_CONCURRENCY", 6))
+BUNDLE_DEADLINE = float(os.environ.get("ODDS_BUNDLE_DEADLINE", 12))
+
+def iter_odds_bundle(bundle: str, max_concurrency: int | None = None, deadline: float | None = None):
+    """
+    Yields (sport_key, data) με τη σειρά που ολοκληρώνονται τα fetch,
+    το πολύ max_concurrency ταυτόχρονα. Μετά το deadline σταματά· όσα
+    fetch τρέχουν ή περιμένουν ακόμη στην ουρά ολοκληρώνονται στο background
+    και γεμίζουν το SWR cache για το επόμενο request.
+    """
+    leagues = BUNDLES.get(bundle, [])
+    if not leagues:
+        return
+    cap = max(1, int(max_concurrency or BUNDLE_MAX_CONCURRENCY))
+    end = time.monotonic() + (BUNDLE_DEADLINE if deadline is None else deadline)
+
+    pool = ThreadPoolExecutor(max_workers=min(cap, len(leagues)), thread_name_prefix="odds-bundle")
+    futures = {pool.submit(get_odds, key): key for key in leagues}
+    pending = set(futures)
+    try:
+        while pending:
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for fut in done:
+                key = futures[fut]
+                try:
+                    yield key, fut.result()
+                except Exception as e:
+                    print(f"[get_odds_bundle] ⚠️ Skipped {key} ({e})")
+    finally:
+        # χωρίς cancel_futures: και τα queued leagues τελειώνουν στο cache
+        pool.shutdown(wait=False)
+
+def get_odds_bundle(bundle: str, max_concurrency: int | None = None, deadline: float | None = None):
     """
     Επιστρέφει ενωμένα δεδομένα αποδόσεων για ομάδες διοργανώσεων.
     Π.χ. england_all, greece_1_2_3, germany_1_2_3, europe_1_2
+    Αν λήξει το deadline επιστρέφει ό,τι ήρθε (partial=True, missing=[...]).
     """
+    leagues = BUNDLES.get(bundle, [])
+    results = dict(iter_odds_bundle(bundle, max_concurrency, deadline))
 
-    bundles = {
-        "england_all": [
-            "soccer_epl",
-            "soccer_england_championship",
-            "soccer_england_league1",
-            "soccer_england_league2"
-        ],
-        "greece_1_2_3": [
-            "soccer_greece_super_league",
-            "soccer_greece_super_league_2"   # ✅ Διορθωμένο (υπάρχει αυτό)
-        ],
-        "germany_1_2_3": [
-            "soccer_germany_bundesliga",
-            "soccer_germany_bundesliga2"     # ✅ Αυτές μόνο υπάρχουν
-        ],
-        "europe_1_2": [
-            "soccer_france_ligue_one",
-            "soccer_france_ligue_two",
-            "soccer_italy_serie_a",
-            "soccer_italy_serie_b",
-            "soccer_spain_la_liga",
-            "soccer_spain_segunda_division",
-            "soccer_portugal_primeira_liga",
-            "soccer_netherlands_eredivisie",
-            "soccer_turkey_super_league",
-            "soccer_switzerland_superleague",
-            "soccer_austria_bundesliga",
-            "soccer_belgium_first_div",
-            "soccer_norway_eliteserien",
-            "soccer_sweden_allsvenskan",
-            "soccer_denmark_superliga"
-        ]
-    }
-
-    leagues = bundles.get(bundle, [])
     combined = {"count": 0, "events": []}
+    for key in leagues:  # σταθερή σειρά όπως στο bundle
+        data = results.get(key)
+        if not data:
+            continue
+        combined["events"].extend(data.get("events", []))
+        combined["count"] += data.get("count", 0)
 
-    for key in leagues:
-        try:
-            data = get_odds(key)
-            if not data:
-                continue
-            combined["events"].extend(data.get("events", []))
-            combined["count"] += data.get("count", 0)
-        except Exception as e:
-            print(f"[get_odds_bundle] ⚠️ Skipped {key} ({e})")
-
+    combined["missing"] = [key for key in leagues if key not in results]
+    combined["partial"] = bool(combined["missing"])
     return combined
+
+def stream_odds_bundle(bundle: str, max_concurrency: int | None = None, deadline: float | None = None):
+    """
+    NDJSON events για progressive rendering του /odds_bundle/{bundle}?stream=1:
+    μία γραμμή "league" ανά πρωτάθλημα μόλις έρθει και μία τελική "done".
+    """
+    leagues = BUNDLES.get(bundle, [])
+    t0 = time.monotonic()
+    yield json.dumps({"type": "start", "bundle": bundle, "leagues": leagues}) + "\n"
+
+    seen, count = set(), 0
+    for key, data in iter_odds_bundle(bundle, max_concurrency, deadline):
+        seen.add(key)
+        count += data.get("count", 0)
+        yield json.dumps({"type": "league", "sport_key": key, "count": data.get("count", 0),
+                          "events": data.get("events", [])}, ensure_ascii=False) + "\n"
+
+    missing = [key for key in leagues if key not in seen]
+    yield json.dumps({"type": "done", "count": count, "missing": missing, "partial": bool(missing),
+                      "elapsed": round(time.monotonic() - t0, 3)}) + "\n"
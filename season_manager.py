@@ -4,7 +4,7 @@
 import requests
 from datetime import datetime
 from bs4 import BeautifulSoup
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, inspect, text
 import os
 
 # --- Ρύθμιση βάσης --------------------------------
@@ -51,6 +51,67 @@ def fetch_matches(league_url, season):
         print(f"[SEASON MANAGER] ❌ Σφάλμα λήψης δεδομένων: {e}")
         return []
 
+# --- Unique index (league, date, home_team, away_team) ---------------
+UNIQUE_INDEX = "ux_matches_league_date_teams"
+_unique_ready = None   # None: δεν έχει ελεγχθεί ακόμη σε αυτό το process
+
+def count_duplicate_keys(conn):
+    """Πόσα φυσικά keys (league, date, home, away) εμφανίζονται πάνω από μία φορά."""
+    return conn.execute(text("""
+        SELECT COUNT(*) FROM (
+            SELECT 1 FROM matches GROUP BY league, date, home_team, away_team HAVING COUNT(*) > 1
+        ) d
+    """)).scalar()
+
+def ensure_unique_index():
+    """
+    Δημιουργεί (μία φορά) το composite unique index του φυσικού key,
+    μόνο αν ο πίνακας δεν έχει ήδη διπλότυπα. Αλλιώς καταγράφει το πλήθος
+    και το insert_into_db μένει στον έλεγχο με existing_keys·
+    ο καθαρισμός γίνεται ρητά με `python season_manager.py --dedupe`.
+    """
+    global _unique_ready
+    if _unique_ready is not None:
+        return _unique_ready
+    _unique_ready = False
+    try:
+        if "matches" not in inspect(engine).get_table_names():
+            _unique_ready = None  # ξαναδοκιμάζει όταν δημιουργηθεί ο πίνακας
+            return False
+        with engine.begin() as conn:
+            dupes = count_duplicate_keys(conn)
+            if dupes:
+                print(f"[SEASON MANAGER] ⚠️ {dupes} διπλότυπα keys στο matches – χωρίς {UNIQUE_INDEX} "
+                      f"(τρέξε: python season_manager.py --dedupe)")
+                return False
+            conn.execute(text(f"""
+                CREATE UNIQUE INDEX IF NOT EXISTS {UNIQUE_INDEX}
+                ON matches (league, date, home_team, away_team)
+            """))
+        _unique_ready = True
+    except Exception as e:
+        print(f"[SEASON MANAGER] ⚠️ Αδυναμία δημιουργίας unique index: {e}")
+    return _unique_ready
+
+def dedupe_matches():
+    """
+    Opt-in migration: σβήνει τα διπλότυπα keys κρατώντας την πρώτη εγγραφή
+    και δημιουργεί το unique index. Στο SQLite χρησιμοποιεί το rowid
+    (πίνακες από το setup_matches_table.py έχουν `id SERIAL` = NULL).
+    """
+    global _unique_ready
+    row_id = "rowid" if engine.dialect.name == "sqlite" else "id"
+    with engine.begin() as conn:
+        removed = conn.execute(text(f"""
+            DELETE FROM matches WHERE {row_id} NOT IN (
+                SELECT MIN({row_id}) FROM matches GROUP BY league, date, home_team, away_team
+            )
+        """)).rowcount
+    print(f"[SEASON MANAGER] 🧹 Αφαιρέθηκαν {removed} διπλότυποι αγώνες")
+    _unique_ready = None
+    ensure_unique_index()
+    return removed
+
 # --- Έλεγχος αν υπάρχουν ήδη στη βάση -------------------------------
 def match_exists(conn, league, date, home, away):
     res = conn.execute(text("""
@@ -60,20 +121,46 @@ def match_exists(conn, league, date, home, away):
     """), {"league": league, "date": date, "home": home, "away": away}).fetchone()
     return res is not None
 
+def existing_keys(conn, league, dates):
+    """
+    Όλα τα (date, home, away) της λίγκας στο εύρος ημερομηνιών του batch
+    με ένα query (range scan στο unique index) αντί για ένα SELECT ανά αγώνα.
+    """
+    known = [d for d in dates if d]
+    if not known:
+        clause, params = "date IS NULL", {"league": league}
+    else:
+        clause, params = "date BETWEEN :lo AND :hi OR date IS NULL", {"league": league, "lo": min(known), "hi": max(known)}
+    rows = conn.execute(text(f"""
+        SELECT date, home_team, away_team FROM matches
+        WHERE league=:league AND ({clause})
+    """), params)
+    return {(r[0], r[1], r[2]) for r in rows}
+
 # --- Εισαγωγή στη βάση ------------------------------------------
 def insert_into_db(matches, league, season):
     if not matches:
-        return
+        return 0
+    guarded = ensure_unique_index()
     with engine.begin() as conn:
-        new_count = 0
+        seen = existing_keys(conn, league, {m["date"] for m in matches})
+        batch = []
         for m in matches:
-            if not match_exists(conn, league, m["date"], m["home"], m["away"]):
-                conn.execute(text("""
-                    INSERT INTO matches (league, season, date, home_team, away_team, score)
-                    VALUES (:league, :season, :date, :home, :away, :score)
-                """), {"league": league, "season": season, "date": m["date"], "home": m["home"], "away": m["away"], "score": m["score"]})
-                new_count += 1
-        print(f"[SEASON MANAGER] 💾 Εισαγωγή {new_count} νέων αγώνων για {league} ({season})")
+            key = (m["date"], m["home"], m["away"])
+            if key in seen:
+                continue
+            seen.add(key)  # και διπλότυπα μέσα στο ίδιο scrape
+            batch.append({"league": league, "season": season, "date": m["date"],
+                          "home": m["home"], "away": m["away"], "score": m["score"]})
+        if batch:
+            # ένα executemany· με το index, ταυτόχρονος importer δεν δημιουργεί διπλότυπα
+            conflict = " ON CONFLICT (league, date, home_team, away_team) DO NOTHING" if guarded else ""
+            conn.execute(text(f"""
+                INSERT INTO matches (league, season, date, home_team, away_team, score)
+                VALUES (:league, :season, :date, :home, :away, :score){conflict}
+            """), batch)
+        print(f"[SEASON MANAGER] 💾 Εισαγωγή {len(batch)} νέων αγώνων για {league} ({season})")
+        return len(batch)
 
 # --- Κύρια εκτέλεση ---------------------------------------------
 def update_all_leagues(current_only=False):
@@ -86,4 +173,8 @@ def update_all_leagues(current_only=False):
     print("[SEASON MANAGER] ✅ Ολοκλήρωση ενημέρωσης.")
 
 if __name__ == "__main__":
-    update_all_leagues(current_only=False)
+    import sys
+    if "--dedupe" in sys.argv:
+        dedupe_matches()
+    else:
+        update_all_leagues(current_only=False)
@@ -10,6 +10,14 @@ import time
 import random
 from datetime import datetime
 
+try:
+    from modules.goal_hazard import GoalHazardEngine, shared_prior
+    HAZARD_ENABLED = True
+except ImportError:
+    HAZARD_ENABLED = False
+
+hazard_engine = GoalHazardEngine(prior=shared_prior()) if HAZARD_ENABLED else None
+
 # ------------------------------------------------
 # Εσωτερικός buffer τελευταίων καταστάσεων
 # ------------------------------------------------
@@ -28,9 +36,12 @@ def detect_live_alerts():
 
     # Προσωρινά mock δεδομένα (προσομοίωση Flashscore/Sofascore)
     sample_matches = [
-        {"match": "Real Madrid vs Barcelona", "minute": 64, "home": 2, "away": 1, "status": "LIVE"},
-        {"match": "Juventus vs Milan", "minute": 72, "home": 1, "away": 1, "status": "LIVE"},
-        {"match": "PAOK vs Olympiacos", "minute": 80, "home": 3, "away": 2, "status": "LIVE"},
+        {"match": "Real Madrid vs Barcelona", "minute": 64, "home": 2, "away": 1, "status": "LIVE",
+         "home_red": 0, "away_red": 0},
+        {"match": "Juventus vs Milan", "minute": 72, "home": 1, "away": 1, "status": "LIVE",
+         "home_red": 0, "away_red": 0},
+        {"match": "PAOK vs Olympiacos", "minute": 80, "home": 3, "away": 2, "status": "LIVE",
+         "home_red": 0, "away_red": 0},
     ]
 
     # Ελέγχει για αλλαγές έναντι της προηγούμενης κατάστασης
@@ -63,6 +74,7 @@ def detect_live_alerts():
 
         # Τυχαίο γεγονός Red Card (demo)
         if random.random() < 0.1:
+            m["away_red"] = (prev or m).get("away_red", 0) + 1
             alerts.append({
                 "type": "card",
                 "message": f"🟥 Red Card – {m['match']} (minute {m['minute']})",
@@ -72,6 +84,16 @@ def detect_live_alerts():
         # Ενημερώνει την τρέχουσα κατάσταση
         last_state[match_id] = m
 
+    # In-play goal hazards για όλους τους live αγώνες μαζί
+    if HAZARD_ENABLED:
+        live = [m for m in sample_matches if m["status"] == "LIVE"]
+        alerts.extend(hazard_engine.poll(
+            [m["match"] for m in live], [m["match"] for m in live],
+            [m["minute"] for m in live], [m["home"] for m in live], [m["away"] for m in live],
+            [m["home_red"] for m in live], [m["away_red"] for m in live],
+            teams=[tuple(m["match"].split(" vs ", 1)) for m in live],
+        ))
+
     print(f"[LIVE FEEDS] ✅ {len(alerts)} new alerts detected.")
     return {"status": "ok", "count": len(alerts), "alerts": alerts}
 